@@ -1,9 +1,26 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 from services.player_service import PlayerService
 from services.match_service import MatchService
+from services.league_service import LeagueService
 from pages.user_management import show_user_management
 from pages.match_history import show_match_history
-from config.settings import DEFAULT_COURT_COUNT, MAX_COURTS, MIN_MATCHES_PER_GENERATION, MAX_MATCHES_PER_GENERATION
+from pages.constraint_settings import show_constraint_settings
+from utils.schedule_metrics import compute_schedule_metrics
+from utils.match_table import build_match_table_html, build_table_html
+from utils.pagination import paginate
+from utils.widget_state import persistent_key, store_widget_value
+from utils.data_manager import DataManager
+from utils import cache
+from utils.lookahead import get_lookahead
+from utils.scheduler_strategies import SCHEDULER_STRATEGIES
+from utils.format_schedulers import FORMAT_SCHEDULERS
+from config.settings import (
+    DEFAULT_COURT_COUNT, MAX_COURTS, MIN_MATCHES_PER_GENERATION, MAX_MATCHES_PER_GENERATION,
+    LARGE_EVENT_MAX_COURTS, LARGE_EVENT_MAX_MATCHES_PER_GENERATION, COMPACT_MATCH_LIST_THRESHOLD,
+    LOOKAHEAD_ENABLED, SCHEDULE_ALTERNATIVES_COUNT, MATCH_FORMATS, DEFAULT_SCHEDULER_STRATEGY,
+    SCHEDULER_TIME_BUDGET_MS, STALE_VIEW_REFRESH_DELAY_SEC, LAZY_TAB_RENDERING
+)
 
 # ページの設定（スマートフォン最適化）
 st.set_page_config(
@@ -208,11 +225,9 @@ custom_css = """
 </style>
 """
 
+@st.fragment
 def show_score_input_section(match, player_service):
-    """スコア入力セクション（同じ画面内）"""
-    # プレイヤー情報の取得
-    all_players = player_service.get_all_players()
-    
+    """スコア入力セクション（同じ画面内。入力中はこの部分だけを再実行する）"""
     # 2列でスコア入力のみを表示
     col1, col2 = st.columns(2)
     
@@ -233,17 +248,28 @@ def show_score_input_section(match, player_service):
                 st.error("❌ スコアは0以上の数値を入力してください")
                 return
             
+            # 記録時点のプレイヤー情報を読む（フラグメントの再実行では描画時の表示用データが古い場合がある）
+            all_players = cache.get_all_players()
             match_service = MatchService()
             success = match_service.record_match_result(
                 match.id, team1_score_int, team2_score_int, all_players
             )
             
             if success:
-                # プレイヤー情報も更新
-                for player in all_players:
-                    player_service.update_player(player)
+                # 連続進行モード: 空いたコートに次の試合を入れる（そのコートに次の試合が残っていれば何もしない）
+                # （キング・オブ・ザ・コート中は結果の記録と同時に次の対戦が追加されている）
+                if st.session_state.get("continuous_mode", False) and not match_service.is_king_of_court_active():
+                    next_match = match_service.generate_next_match(
+                        cache.get_active_players(),
+                        match.court_number,
+                        st.session_state.get("skill_matching", True)
+                    )
+                    if next_match:
+                        match_service.save_match(next_match)
+                
+                # 試合が完了済みに移るため画面全体を描画し直す
                 st.success("🎉 試合結果を記録しました！")
-                st.rerun()
+                st.rerun(scope="app")
             else:
                 st.error("❌ 記録に失敗しました")
         except ValueError:
@@ -278,12 +304,12 @@ def show_incomplete_match_delete_confirmation(match, player_service):
             st.session_state[f"deleting_incomplete_{match.id}"] = False
             st.rerun()
 
-def show_match_edit_form(match, player_service):
+def show_match_edit_form(match, player_service, view):
     """試合編集フォームを表示"""
     st.divider()
     
     # プレイヤー名の取得
-    all_players = player_service.get_all_players()
+    all_players = view.players
     
     # 2列でスコア入力のみを表示
     col1, col2 = st.columns(2)
@@ -317,10 +343,6 @@ def show_match_edit_form(match, player_service):
                 )
                 
                 if success:
-                    # プレイヤー情報も更新
-                    for player in all_players:
-                        player_service.update_player(player)
-                    
                     # 編集モードを終了
                     st.session_state[f"editing_match_{match.id}"] = False
                     st.success("試合結果を更新しました！")
@@ -349,7 +371,7 @@ def show_delete_confirmation(match, player_service):
         if st.button("🗑️", key=f"confirm_delete_{match.id}", use_container_width=True, type="primary", help="削除する"):
             # 試合結果を削除
             match_service = MatchService()
-            all_players = player_service.get_all_players()
+            all_players = cache.get_all_players()
             
             # スキルポイントを元に戻す
             match_service.revert_match_result(match, all_players)
@@ -360,12 +382,8 @@ def show_delete_confirmation(match, player_service):
             match.is_completed = False
             match.completed_at = None
             
-            # 保存
-            if match_service.save_match(match):
-                # プレイヤー情報も更新
-                for player in all_players:
-                    player_service.update_player(player)
-                
+            # 試合と変更のあったプレイヤーを保存
+            if match_service.save_match(match, all_players):
                 st.success("試合結果を削除しました！")
                 st.rerun()
             else:
@@ -376,6 +394,22 @@ def show_delete_confirmation(match, player_service):
         if st.button("❌", key=f"cancel_delete_{match.id}", use_container_width=True, help="キャンセル"):
             st.rerun()
 
+def rerun_fragment():
+    """フラグメント内の操作の後、その部分だけを再実行（画面全体の実行中に呼ばれた場合は全体を再実行）"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment(run_every=STALE_VIEW_REFRESH_DELAY_SEC)
+def refresh_stale_views():
+    """フラグメント内や他の端末での保存で古くなった表示を、保存が落ち着いてからまとめて描画し直す
+
+    データファイルのバージョンが描画時から変わっていなければ何もしない。
+    """
+    if cache.views_outdated(STALE_VIEW_REFRESH_DELAY_SEC):
+        st.rerun(scope="app")
+
 def main():
     """メインアプリケーション"""
     try:
@@ -390,25 +424,40 @@ def main():
         player_service = PlayerService()
         match_service = MatchService()
         
+        # 画面全体を描画し直すので、描画に使うデータのバージョンを記録（読み込みより先に記録し、
+        # 間に保存が入った場合は次の確認でもう一度描画し直す）
+        cache.remember_rendered_version()
+        refresh_stale_views()
+        
+        # 表示用データは描画ごとに1回だけ作成し、各タブ・カードで共有する
+        view = cache.get_session_view()
+        
         # タブ設定（アイコン付き）
+        # 遅延描画では選択中のタブ（st.session_state["main_tab"] に保持）だけを実行し、
+        # タブを切り替えたときに再実行する
         tab1, tab2, tab3, tab4 = st.tabs([
             "🏆 試合進行", 
             "👥 参加者", 
             "📊 ランキング", 
             "⚙️ 管理"
-        ])
+        ], key="main_tab", on_change="rerun" if LAZY_TAB_RENDERING else "ignore")
         
-        with tab1:
-            show_match_progress_tab(player_service, match_service)
+        # 選択状態を持たない場合（遅延描画しない場合）、open は None になりすべてのタブを描画する
+        if tab1.open is not False:
+            with tab1:
+                show_match_progress_tab(player_service, match_service, view)
         
-        with tab2:
-            show_participants_tab(player_service)
+        if tab2.open is not False:
+            with tab2:
+                show_participants_tab(player_service)
         
-        with tab3:
-            show_ranking_tab(player_service)
+        if tab3.open is not False:
+            with tab3:
+                show_ranking_tab(player_service, view)
         
-        with tab4:
-            show_management_tab()
+        if tab4.open is not False:
+            with tab4:
+                show_management_tab()
             
     except Exception as e:
         st.error("🚨 アプリケーションの初期化中にエラーが発生しました")
@@ -423,14 +472,14 @@ def main():
             import traceback
             st.code(traceback.format_exc())
 
-def show_match_progress_tab(player_service, match_service):
-    """試合進行タブ"""
-    st.markdown("# 🏆 試合進行")
-    
-    # プレイヤー状況を大きく表示
-    active_players = player_service.get_active_players()
-    participating_players = player_service.get_participating_players()
-    resting_count = len(participating_players) - len(active_players)
+@st.fragment
+def show_participant_status_section(player_service):
+    """参加者の状況・一覧（休憩の切り替え）と詳細統計"""
+    # プレイヤー状況を大きく表示（再実行のたびに最新のデータを読む）
+    view = cache.get_session_view()
+    active_players = view.active_players
+    participating_players = view.participating_players
+    resting_count = view.resting_count
     
     # 状況メトリクス（大きなフォント）
     col1, col2, col3 = st.columns(3)
@@ -448,114 +497,35 @@ def show_match_progress_tab(player_service, match_service):
     if participating_players:
         st.markdown("## 📋 参加者一覧")
         
-        # 参加者を番号順で表示（テーブル形式）
+        # 参加者を番号順で表示（1ページ分を1つの表にまとめる）
         sorted_participants = sorted(participating_players, key=lambda p: p.player_number or 999)
+        page_players = paginate(sorted_participants, key="progress_participants_page")
         
-        # テーブルヘッダー
-        st.markdown("""
-        <div style="
-            background-color: #f0f2f6; 
-            padding: 8px; 
-            border-radius: 8px 8px 0 0; 
-            border: 1px solid #ddd;
-            font-weight: bold;
-            display: grid;
-            grid-template-columns: 60px 1fr 80px 80px 80px 80px 80px 80px;
-            gap: 8px;
-            align-items: center;
-        ">
-            <div style="text-align: center;">番号</div>
-            <div>プレイヤー名</div>
-            <div style="text-align: center;">レベル</div>
-            <div style="text-align: center;">試合数</div>
-            <div style="text-align: center;">勝数</div>
-            <div style="text-align: center;">勝率</div>
-            <div style="text-align: center;">状態</div>
-            <div style="text-align: center;">休憩</div>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # 各参加者の行
-        for i, player in enumerate(sorted_participants):
+        rows = []
+        for player in page_players:
             number_display = str(player.player_number) if player.player_number else "未"
             level_emoji = ["🔸", "🔹", "🟡", "🟠", "🔴"][player.level - 1]
-            
-            # 行の背景色（交互）
-            bg_color = "#ffffff" if i % 2 == 0 else "#f8f9fa"
-            
-            # 休憩状態の表示
-            status_icon = "💤" if player.is_resting else "⚡"
-            status_text = "休憩中" if player.is_resting else "待機中"
-            status_color = "#ff9800" if player.is_resting else "#4caf50"
-            
-            # 勝率の計算
+            status_display = "💤 休憩中" if player.is_resting else "⚡ 待機中"
             win_rate = (player.wins / player.matches_played * 100) if player.matches_played > 0 else 0
+            rows.append([
+                number_display, player.name, level_emoji, str(player.matches_played),
+                str(player.wins), f"{win_rate:.0f}%", status_display
+            ])
+        st.markdown(build_table_html(
+            ["番号", "プレイヤー名", "レベル", "試合数", "勝数", "勝率", "状態"], rows
+        ), unsafe_allow_html=True)
+        
+        # 休憩ボタン（表示中のページの分だけ）
+        st.markdown("#### 💤 休憩・復帰")
+        cols = st.columns(4)
+        for i, player in enumerate(page_players):
+            number_display = str(player.player_number) if player.player_number else "未"
+            rest_button_icon = "⚡" if player.is_resting else "💤"
+            rest_button_help = f"{player.name}を{'待機中に復帰' if player.is_resting else '休憩中に設定'}"
             
-            # テーブル行
-            st.markdown(f"""
-            <div style="
-                background-color: {bg_color}; 
-                padding: 8px; 
-                border-left: 1px solid #ddd;
-                border-right: 1px solid #ddd;
-                border-bottom: 1px solid #ddd;
-                display: grid;
-                grid-template-columns: 60px 1fr 80px 80px 80px 80px 80px 80px;
-                gap: 8px;
-                align-items: center;
-                min-height: 40px;
-            ">
-                <div style="
-                    text-align: center; 
-                    background-color: #4285f4; 
-                    color: white; 
-                    border-radius: 50%; 
-                    width: 30px; 
-                    height: 30px; 
-                    display: flex; 
-                    align-items: center; 
-                    justify-content: center; 
-                    font-weight: bold; 
-                    margin: 0 auto;
-                ">
-                    {number_display}
-                </div>
-                <div style="font-weight: bold; padding-left: 8px;">
-                    {player.name}
-                </div>
-                <div style="text-align: center;">
-                    {level_emoji}
-                </div>
-                <div style="text-align: center; font-weight: bold;">
-                    {player.matches_played}
-                </div>
-                <div style="text-align: center; font-weight: bold;">
-                    {player.wins}
-                </div>
-                <div style="text-align: center; font-weight: bold;">
-                    {win_rate:.0f}%
-                </div>
-                <div style="text-align: center;">
-                    <span style="color: {status_color}; font-weight: bold;">
-                        {status_icon} {status_text}
-                    </span>
-                </div>
-                <div style="text-align: center;" id="rest_btn_progress_{player.id}">
-                    <!-- 休憩ボタンプレースホルダー -->
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # ボタン用の列を作成
-            cols = st.columns([1, 1, 1, 1, 1, 1, 1, 1])
-            
-            with cols[7]:  # 休憩ボタン列
-                rest_button_text = "復帰" if player.is_resting else "休憩"
-                rest_button_icon = "⚡" if player.is_resting else "💤"
-                rest_button_help = f"{player.name}を{'待機中に復帰' if player.is_resting else '休憩中に設定'}"
-                
+            with cols[i % 4]:
                 if st.button(
-                    f"{rest_button_icon}",
+                    f"{rest_button_icon} {number_display} {player.name}",
                     key=f"rest_progress_{player.id}",
                     help=rest_button_help,
                     use_container_width=True
@@ -564,16 +534,7 @@ def show_match_progress_tab(player_service, match_service):
                     player_service.set_resting_status(player.id, new_resting)
                     action_text = "復帰" if not new_resting else "休憩"
                     st.success(f"✅ {player.name}を{action_text}させました")
-                    st.rerun()
-        
-        # テーブルの下線
-        st.markdown("""
-        <div style="
-            border-bottom: 1px solid #ddd;
-            border-radius: 0 0 8px 8px;
-            height: 1px;
-        "></div>
-        """, unsafe_allow_html=True)
+                    rerun_fragment()
         
         st.markdown("")  # 余白
         
@@ -628,36 +589,133 @@ def show_match_progress_tab(player_service, match_service):
                     count = level_counts.get(level, 0)
                     emoji = level_emojis[level - 1]
                     st.metric(f"{emoji} Lv.{level}", f"{count}人")
+
+def show_match_progress_tab(player_service, match_service, view):
+    """試合進行タブ"""
+    st.markdown("# 🏆 試合進行")
+    
+    active_players = view.active_players
+    
+    # 参加者の状況と休憩の切り替え（切り替えてもこの部分だけを再実行する）
+    show_participant_status_section(player_service)
     
     st.divider()
     
     # 設定セクション（簡素化）
     st.markdown("## ⚙️ 試合設定")
     
+    # 設定値は他のタブを表示している間も保つ（utils/widget_state.py）
+    large_event_mode = st.checkbox(
+        "🏟️ 大規模イベントモード",
+        help=f"最大{LARGE_EVENT_MAX_COURTS}コート・1回{LARGE_EVENT_MAX_MATCHES_PER_GENERATION}試合まで生成し、試合を一覧表で表示します",
+        key=persistent_key("large_event_mode", False),
+        on_change=store_widget_value, args=("large_event_mode",)
+    )
+    max_courts = LARGE_EVENT_MAX_COURTS if large_event_mode else MAX_COURTS
+    max_matches = LARGE_EVENT_MAX_MATCHES_PER_GENERATION if large_event_mode else MAX_MATCHES_PER_GENERATION
+    
+    # モード切り替えで上限が下がった場合は入力値を初期値に戻す
+    if st.session_state.get("num_courts", 0) > max_courts:
+        st.session_state["num_courts"] = DEFAULT_COURT_COUNT
+    if st.session_state.get("num_matches", 0) > max_matches:
+        st.session_state["num_matches"] = 3
+    
     col_courts, col_matches, col_skill = st.columns(3)
     with col_courts:
         num_courts = st.number_input(
             "🏓 コート数", 
             min_value=1, 
-            max_value=MAX_COURTS, 
-            value=DEFAULT_COURT_COUNT,
-            key="num_courts"
+            max_value=max_courts, 
+            key=persistent_key("num_courts", DEFAULT_COURT_COUNT),
+            on_change=store_widget_value, args=("num_courts",)
         )
     
     with col_matches:
         num_matches = st.number_input(
             "🎾 試合数", 
             min_value=MIN_MATCHES_PER_GENERATION, 
-            max_value=MAX_MATCHES_PER_GENERATION, 
-            value=3,
-            key="num_matches"
+            max_value=max_matches, 
+            key=persistent_key("num_matches", 3),
+            on_change=store_widget_value, args=("num_matches",)
         )
     
     with col_skill:
         skill_matching = st.checkbox(
             "⚖️ スキルマッチング", 
-            value=True,
-            help="スキルバランスを考慮"
+            help="スキルバランスを考慮",
+            key=persistent_key("skill_matching", True),
+            on_change=store_widget_value, args=("skill_matching",)
+        )
+    
+    match_format = st.selectbox(
+        "🎲 試合形式",
+        list(MATCH_FORMATS.keys()),
+        format_func=lambda key: MATCH_FORMATS[key],
+        help="アメリカーノ: 全員と1回ずつペアを組むローテーション / メキシカーノ: 個人ポイントの順位で毎ラウンド組み合わせ（1回の生成は1ラウンド） / キング・オブ・ザ・コート: 勝ったペアはコートに残り、負けたペアは待機列の最後尾へ（結果を記録するたびに次の対戦が入ります）",
+        key=persistent_key("match_format", "open"),
+        on_change=store_widget_value, args=("match_format",)
+    )
+    scheduler_class = FORMAT_SCHEDULERS.get(match_format)
+    if scheduler_class is not None and not scheduler_class.SUPPORTS_CONSTRAINTS and view.constraints_set:
+        st.warning(f"⚠️ {MATCH_FORMATS[match_format]}はペアがローテーションで決まるため、組み合わせ条件の設定中は生成できません。"
+                   "条件を解除するか、他の試合形式を選んでください。")
+    king_of_court = match_format == "king_of_court"
+    if king_of_court:
+        st.checkbox(
+            "⬆️ 勝ったペアは上のコートへ",
+            help="コート1が最上位。コート2以下で勝ったペアは1つ上のコートの挑戦者になります",
+            key=persistent_key("king_move_up", True),
+            on_change=store_widget_value, args=("king_move_up",)
+        )
+        scheduler_strategy = DEFAULT_SCHEDULER_STRATEGY
+    else:
+        strategy_names = list(SCHEDULER_STRATEGIES.keys())
+        scheduler_strategy = st.selectbox(
+            "🧠 生成方式",
+            strategy_names,
+            format_func=lambda name: SCHEDULER_STRATEGIES[name].label,
+            help=f"複数回試行: {SCHEDULER_TIME_BUDGET_MS}ミリ秒以内で生成を繰り返し、最も評価の良い組み合わせを使います",
+            key=persistent_key("scheduler_strategy", DEFAULT_SCHEDULER_STRATEGY),
+            on_change=store_widget_value, args=("scheduler_strategy",)
+        )
+    
+    st.checkbox(
+        "🔁 連続進行モード",
+        help="結果を記録するたびに、空いたコートへ次の試合を自動で追加します",
+        key=persistent_key("continuous_mode", False),
+        on_change=store_widget_value, args=("continuous_mode",)
+    )
+    
+    st.checkbox(
+        "🔀 複数案から選ぶ",
+        help=f"評価の良い組み合わせ案を{SCHEDULE_ALTERNATIVES_COUNT}つ生成し、見比べて選んだ案だけを保存します",
+        key=persistent_key("choose_alternatives", False),
+        on_change=store_widget_value, args=("choose_alternatives",)
+    )
+    
+    # リーグモードはデータファイルに保存し、次回以降のセッションにも引き継ぐ
+    league_service = LeagueService()
+    league_enabled = view.league_enabled
+    league_mode = st.checkbox(
+        "🏆 リーグモード",
+        value=league_enabled,
+        help="試合をクリアするたびにペア・対戦履歴をリーグ履歴に加え、次回以降のセッションでも同じペアが続かないようにします（古いセッションほど影響は小さくなります）"
+    )
+    if league_mode != league_enabled:
+        league_service.set_enabled(league_mode)
+    
+    # データが更新されるたびに（結果記録・休憩の切り替えなど）、次の生成をバックグラウンドで先読みする
+    # 生成ボタンで試合のクリア・番号の振り直し・キング・オブ・ザ・コートの終了を保存する場合は、
+    # 保存でバージョンが変わり先読み結果が使えないため先読みしない
+    writes_before_generation = (st.session_state.get("clear_previous_matches", True)
+                                or not view.numbers_assigned or view.king_of_court_saved)
+    if (LOOKAHEAD_ENABLED and len(active_players) >= 4 and not king_of_court
+            and not writes_before_generation):
+        get_lookahead().request(
+            (DataManager.get_version(), num_matches, num_courts, skill_matching, match_format,
+             scheduler_strategy),
+            lambda: generate_matches_for_lookahead(num_matches, num_courts, skill_matching, match_format,
+                                                   scheduler_strategy)
         )
     
     st.divider()
@@ -677,23 +735,106 @@ def show_match_progress_tab(player_service, match_service):
             player_service.assign_player_numbers()
             
             # 最新のプレイヤーデータを取得
-            updated_active_players = player_service.get_active_players()
+            updated_active_players = cache.get_active_players()
             
-            matches = match_service.generate_matches(
-                updated_active_players, num_matches, num_courts, skill_matching
-            )
+            # 他の形式で生成する場合、進行中のキング・オブ・ザ・コートは終了する
+            if not king_of_court:
+                match_service.stop_king_of_court()
+            
+            matches = None
+            if king_of_court:
+                # 開始時の各コートの試合は開始処理の中で保存される
+                started = match_service.start_king_of_court(
+                    updated_active_players, num_courts, st.session_state.get("king_move_up", True)
+                )
+                if started:
+                    st.session_state["last_generation_metrics"] = None
+                    st.success(f"🎉 キング・オブ・ザ・コートを開始しました（{len(started)}コート）")
+                    st.rerun()
+                else:
+                    st.error("❌ 開始できませんでした。進行中の試合がある場合は先に結果を記録してください。")
+            elif st.session_state.get("choose_alternatives", False):
+                # 複数案を1回の探索で生成し、選ばれるまで保存しない
+                alternatives = match_service.generate_alternatives(
+                    updated_active_players, num_matches, num_courts, skill_matching,
+                    SCHEDULE_ALTERNATIVES_COUNT, match_format=match_format
+                )
+                if alternatives:
+                    st.session_state["schedule_alternatives"] = {
+                        "version": DataManager.get_version(),
+                        "options": alternatives,
+                        "index": 0,
+                        "match_format": match_format,
+                    }
+                    st.rerun()
+                else:
+                    st.error("❌ 試合の生成に失敗しました。")
+            else:
+                # データが先読み時点から変わっていなければ先読み結果をそのまま使う
+                schedule = None
+                if LOOKAHEAD_ENABLED and not writes_before_generation:
+                    schedule = get_lookahead().take(
+                        (DataManager.get_version(), num_matches, num_courts, skill_matching, match_format,
+                         scheduler_strategy)
+                    )
+                if not schedule or not schedule[0]:
+                    schedule = match_service.generate_schedule(
+                        updated_active_players, num_matches, num_courts, skill_matching,
+                        match_format=match_format, strategy=scheduler_strategy
+                    )
+                matches, generation_metrics = schedule
+                if not matches:
+                    st.error("❌ 試合の生成に失敗しました。")
             
             if matches:
-                match_service.save_matches(matches)
+                match_service.save_matches(matches, match_format)
+                st.session_state["last_generation_metrics"] = generation_metrics
                 st.success(f"🎉 {len(matches)}試合を生成しました！")
                 st.rerun()
+    
+    # メキシカーノは順位で次のラウンドが決まるため順位表を表示
+    if match_format == "mexicano":
+        with st.expander("📋 個人ポイント順位", expanded=False):
+            show_standings(match_service, view)
+    
+    # 保存前の組み合わせ案
+    if st.session_state.get("schedule_alternatives"):
+        show_schedule_alternatives(match_service, player_service, view)
+    
+    # 空きコートへの試合追加（既存の試合はクリアしない）
+    if st.button("➕ 空きコートに次の試合を入れる", use_container_width=True):
+        if len(active_players) < 4:
+            st.error("⚠️ 試合を生成するには、待機中のプレイヤーが4人以上必要です。")
+        else:
+            player_service.assign_player_numbers()
+            if match_service.is_king_of_court_active():
+                # 待機列から空きコートを埋める（保存まで行われる）
+                matches = match_service.fill_king_of_court_open_courts(cache.get_active_players())
+            else:
+                matches = match_service.fill_open_courts(
+                    cache.get_active_players(), num_courts, skill_matching
+                )
+                if matches:
+                    match_service.save_matches(matches)
+            
+            if matches:
+                st.session_state["last_generation_metrics"] = compute_schedule_metrics(
+                    matches, cache.get_active_players(), num_courts
+                )
+                st.success(f"🎉 {len(matches)}試合を追加しました！")
+                st.rerun()
             else:
-                st.error("❌ 試合の生成に失敗しました。")
+                st.info("ℹ️ 空いているコートがないか、待機中のプレイヤーが足りません。")
+    
+    # 直近に生成した試合の品質サマリー
+    if st.session_state.get("last_generation_metrics"):
+        show_schedule_metrics_summary(st.session_state["last_generation_metrics"])
     
     # 新規試合のクリアボタン
     if st.button("🗑️ すべての試合をクリア", use_container_width=True, type="secondary"):
         if match_service.clear_session_matches():
             player_service.reset_session_stats()
+            st.session_state["last_generation_metrics"] = None
             st.success("🗑️ すべての試合をクリアしました")
             st.rerun()
     
@@ -706,35 +847,36 @@ def show_match_progress_tab(player_service, match_service):
         st.rerun()
     
     # 現在の試合を表示
-    current_matches = match_service.get_current_session_matches()
+    current_matches = view.matches
     
     if current_matches:        
         # 未完了試合
-        incomplete_matches = [m for m in current_matches if not m.is_completed]
-        completed_matches = [m for m in current_matches if m.is_completed]
+        incomplete_matches = view.incomplete_matches
+        completed_matches = view.completed_matches
+        
+        # 大規模イベントや試合数が多い場合は一覧表で表示し、操作する試合だけを展開する
+        compact_list = large_event_mode or len(current_matches) > COMPACT_MATCH_LIST_THRESHOLD
         
         if incomplete_matches:
             st.markdown("## ⏳ 進行中の試合")
-            for match in incomplete_matches:
-                show_match_card(match, player_service, is_completed=False)
+            if compact_list:
+                show_compact_match_list(incomplete_matches, player_service, view, is_completed=False)
+            else:
+                for match in incomplete_matches:
+                    show_match_card(match, player_service, view, is_completed=False)
         
         # 完了済み試合を表示
-        if completed_matches:
+        if completed_matches and compact_list:
+            st.markdown("## ✅ 完了済み試合")
+            show_compact_match_list(completed_matches, player_service, view, is_completed=True)
+        elif completed_matches:
             st.markdown("## ✅ 完了済み試合")
             
             # リスト形式で表示
             for match in completed_matches:
                 with st.container():
-                    # プレイヤー番号の取得
-                    all_players = player_service.get_all_players()
-                    player_number_map = {p.id: p.player_number for p in all_players}
-                    
-                    def get_player_number_display(player_id):
-                        number = player_number_map.get(player_id)
-                        return str(number) if number is not None else "未"
-                    
-                    team1_numbers = [get_player_number_display(pid) for pid in match.team1_player_ids]
-                    team2_numbers = [get_player_number_display(pid) for pid in match.team2_player_ids]
+                    team1_numbers = [view.number_display(pid) for pid in match.team1_player_ids]
+                    team2_numbers = [view.number_display(pid) for pid in match.team2_player_ids]
                     
                     # 勝者アイコン
                     winner_icon = "🏆" if match.winner_team == 1 else ("🏆" if match.winner_team == 2 else "🤝")
@@ -790,24 +932,114 @@ def show_match_progress_tab(player_service, match_service):
                     
                     # 編集モードの表示
                     if st.session_state.get(f"editing_match_{match.id}", False):
-                        show_match_edit_form(match, player_service)
+                        show_match_edit_form(match, player_service, view)
     else:
         st.info("📋 まだ試合が生成されていません。上のボタンから試合を生成してください。")
 
-def show_match_card(match, player_service, is_completed=False):
+def show_schedule_alternatives(match_service, player_service, view):
+    """生成した組み合わせ案の切り替えと確定（案の切り替えでは再計算・保存しない）"""
+    state = st.session_state["schedule_alternatives"]
+    options = state["options"]
+    index = state["index"]
+    matches, metrics = options[index]
+    
+    st.markdown(f"### 🔀 組み合わせ案 {index + 1} / {len(options)}")
+    show_schedule_metrics_summary(metrics)
+    
+    st.markdown(build_match_table_html(matches, view.number_by_id), unsafe_allow_html=True)
+    
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if st.button("◀ 前の案", key="previous_alternative", use_container_width=True,
+                     disabled=len(options) < 2):
+            state["index"] = (index - 1) % len(options)
+            st.rerun()
+    with col_next:
+        if st.button("次の案 ▶", key="next_alternative", use_container_width=True,
+                     disabled=len(options) < 2):
+            state["index"] = (index + 1) % len(options)
+            st.rerun()
+    
+    col_confirm, col_cancel = st.columns(2)
+    with col_confirm:
+        if st.button("✅ この案で確定", key="confirm_alternative", use_container_width=True, type="primary"):
+            if DataManager.get_version() != state["version"]:
+                # 案の生成後に結果記録や休憩の変更があった
+                st.session_state["schedule_alternatives"] = None
+                st.warning("⚠️ 案の生成後にデータが更新されました。もう一度生成してください。")
+            elif match_service.save_matches(matches, state.get("match_format", "open")):
+                st.session_state["schedule_alternatives"] = None
+                st.session_state["last_generation_metrics"] = metrics
+                st.success(f"🎉 {len(matches)}試合を保存しました！")
+                st.rerun()
+            else:
+                st.error("❌ 保存に失敗しました")
+    with col_cancel:
+        if st.button("✖️ 取り消す", key="cancel_alternative", use_container_width=True):
+            st.session_state["schedule_alternatives"] = None
+            st.rerun()
+
+def generate_matches_for_lookahead(num_matches, num_courts, skill_matching, match_format, scheduler_strategy):
+    """先読み用の試合生成（バックグラウンドスレッドで実行、データは書き換えない）"""
+    return MatchService().generate_schedule(
+        PlayerService().get_active_players(), num_matches, num_courts, skill_matching,
+        match_format=match_format, strategy=scheduler_strategy
+    )
+
+def show_standings(match_service, view):
+    """メキシカーノの個人ポイント順位表"""
+    standings = match_service.get_standings()
+    if not len(standings):
+        st.caption("結果が記録されると、個人ポイントの順位がここに表示されます。")
+        return
+    
+    players_by_id = view.player_by_id
+    rows = []
+    for player_id in standings.ranked_ids():
+        player = players_by_id.get(player_id)
+        if player:
+            rows.append(f"{standings.rank_of(player_id)}位 {player.player_number or '-'}番 "
+                        f"{player.name} — {standings.points[player_id]:.0f}pt")
+    st.markdown("  \n".join(rows))
+
+def show_compact_match_list(matches, player_service, view, is_completed=False):
+    """試合一覧を1つの表で表示し、選択した試合のカードだけを描画"""
+    st.markdown(build_match_table_html(matches, view.number_by_id, show_scores=is_completed), unsafe_allow_html=True)
+    
+    # 試合番号は重複しうるため、選択肢は試合IDで持つ
+    match_by_id = {m.id: m for m in matches}
+    selected_id = st.selectbox(
+        "結果を編集する試合" if is_completed else "スコアを入力する試合",
+        options=list(match_by_id.keys()),
+        format_func=lambda match_id: (f"第{match_by_id[match_id].match_index}試合"
+                                      f"（コート{match_by_id[match_id].court_number}）"),
+        key=f"compact_select_{'completed' if is_completed else 'incomplete'}"
+    )
+    
+    if selected_id is not None:
+        show_match_card(match_by_id[selected_id], player_service, view, is_completed=is_completed)
+
+def show_schedule_metrics_summary(metrics):
+    """生成した試合の品質サマリー（コンパクト表示）"""
+    st.markdown("#### 📐 生成結果の品質")
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("試合数の差", f"{metrics['games_spread']}試合", help=f"ジニ係数: {metrics['games_gini']:.2f}")
+    with col2:
+        st.metric("ペア重複", f"{metrics['partner_repeats']}回", help=f"対戦相手の重複: {metrics['opponent_repeats']}回")
+    with col3:
+        st.metric("平均スキル差", f"{metrics['skill_gap_mean']:.1f}", help=f"最大: {metrics['skill_gap_max']:.1f} / 90%: {metrics['skill_gap_p90']:.1f}")
+    with col4:
+        st.metric("最大連続休み", f"{metrics['max_consecutive_sit_outs']}回")
+    with col5:
+        st.metric("コート稼働率", f"{metrics['court_utilization']:.0%}")
+
+def show_match_card(match, player_service, view, is_completed=False):
     """試合カードを表示"""
     with st.container():
-        # プレイヤー情報の取得
-        all_players = player_service.get_all_players()
-        player_number_map = {p.id: p.player_number for p in all_players}
-        
         # 番号がNoneの場合は"未"と表示
-        def get_player_number_display(player_id):
-            number = player_number_map.get(player_id)
-            return str(number) if number is not None else "未"
-        
-        team1_numbers = [get_player_number_display(pid) for pid in match.team1_player_ids]
-        team2_numbers = [get_player_number_display(pid) for pid in match.team2_player_ids]
+        team1_numbers = [view.number_display(pid) for pid in match.team1_player_ids]
+        team2_numbers = [view.number_display(pid) for pid in match.team2_player_ids]
         
         # ヘッダー（試合番号とコート）
         col_header1, col_header2 = st.columns(2)
@@ -924,13 +1156,16 @@ def show_match_card(match, player_service, is_completed=False):
         
         # 編集モードの表示
         if st.session_state.get(f"editing_match_{match.id}", False):
-            show_match_edit_form(match, player_service)
+            show_match_edit_form(match, player_service, view)
 
+@st.fragment
 def show_participants_tab(player_service):
-    """参加者タブ"""
+    """参加者タブ（追加・除外してもこのタブだけを再実行する）"""
     st.markdown("# 👥 参加者選択")
     
-    players = player_service.get_all_players()
+    # 再実行のたびに最新のデータを読む
+    view = cache.get_session_view()
+    players = view.players
     
     if not players:
         st.info("まだプレイヤーが登録されていません。「⚙️管理」タブからプレイヤーを追加してください。")
@@ -945,14 +1180,16 @@ def show_participants_tab(player_service):
     
     # 検索候補を表示
     if search_query:
-        # 検索にマッチするプレイヤー（参加者ではないもののみ）
-        search_results = [p for p in players if search_query.lower() in p.name.lower() and not p.is_participating_today]
-        # あいうえお順でソート
-        search_results.sort(key=lambda p: p.name)
+        # 検索にマッチするプレイヤー（参加者ではないもののみ、前方一致を優先して上位5件まで）
+        player_by_id = view.player_by_id
+        search_results = [player_by_id[pid] for pid in player_service.search_players(
+            search_query, limit=5,
+            include=lambda pid: pid in player_by_id and not player_by_id[pid].is_participating_today
+        )]
         
         if search_results:
             st.markdown("### 📋 検索結果（タップして追加）")
-            for player in search_results[:5]:  # 上位5件まで表示
+            for player in search_results:
                 level_emoji = ["🔸", "🔹", "🟡", "🟠", "🔴"][player.level - 1]
                 if st.button(
                     f"{level_emoji} {player.name} (Lv.{player.level})",
@@ -960,14 +1197,12 @@ def show_participants_tab(player_service):
                     use_container_width=True,
                     help="タップして参加者に追加"
                 ):
-                    # プレイヤーを参加者に追加
-                    player_service.set_participation_status(player.id, True)
-                    # 番号を自動割り振り
-                    player_service.assign_player_numbers()
+                    # プレイヤーを参加者に追加し、番号を自動割り振り
+                    player_service.set_participation_bulk([player.id], True)
                     st.success(f"✅ {player.name}を参加者に追加しました！")
                     # 検索クエリをクリア
                     st.session_state[search_key] = ""
-                    st.rerun()
+                    rerun_fragment()
         else:
             if len(search_query) >= 1:
                 st.info("🤷‍♂️ 該当するプレイヤーが見つからないか、既に参加者に追加済みです")
@@ -976,24 +1211,21 @@ def show_participants_tab(player_service):
     if search_query:
         if st.button("🧹 検索をクリア", help="検索結果をクリアします", key="clear_participants_search"):
             st.session_state[search_key] = ""
-            st.rerun()
+            rerun_fragment()
     
     # 便利ボタン
     col_all, col_clear = st.columns(2)
     with col_all:
         if st.button("👥 全員を参加者に追加", use_container_width=True, key="add_all_participants_tab"):
-            for player in players:
-                player_service.set_participation_status(player.id, True)
-            player_service.assign_player_numbers()
+            player_service.set_participation_bulk([p.id for p in players], True)
             st.success(f"✅ {len(players)}人全員を参加者に追加しました！")
-            st.rerun()
+            rerun_fragment()
     
     with col_clear:
         if st.button("🧹 全参加者をクリア", use_container_width=True, key="clear_all_participants_tab"):
-            for player in players:
-                player_service.set_participation_status(player.id, False)
+            player_service.set_participation_bulk([p.id for p in players], False)
             st.success("🧹 全参加者をクリアしました")
-            st.rerun()
+            rerun_fragment()
     
     # プレイヤー一覧からの選択
     non_participating_players = [p for p in players if not p.is_participating_today]
@@ -1010,9 +1242,9 @@ def show_participants_tab(player_service):
             # メッセージを一度表示したら削除
             del st.session_state["recently_added_player_tab"]
         
-        # 3列でプレイヤーボタンを表示
+        # 3列でプレイヤーボタンを表示（表示中のページの分だけ）
         cols = st.columns(3)
-        for i, player in enumerate(non_participating_players):
+        for i, player in enumerate(paginate(non_participating_players, key="non_participants_page")):
             level_emoji = ["🔸", "🔹", "🟡", "🟠", "🔴"][player.level - 1]
             col_index = i % 3
             
@@ -1023,113 +1255,48 @@ def show_participants_tab(player_service):
                     use_container_width=True,
                     help=f"Lv.{player.level} | SP:{player.skill_points:.0f}"
                 ):
-                    player_service.set_participation_status(player.id, True)
-                    player_service.assign_player_numbers()
+                    player_service.set_participation_bulk([player.id], True)
                     # 成功メッセージをセッション状態に保存
                     st.session_state["recently_added_player_tab"] = player.name
-                    st.rerun()
+                    rerun_fragment()
     else:
         st.info("👏 すべてのプレイヤーが参加者に追加されています！")
     
     st.divider()
     
     # 現在の参加者リスト（テーブル形式）
-    participating_players = player_service.get_participating_players()
+    participating_players = view.participating_players
     
     if participating_players:
         st.markdown(f"## 👥 参加者一覧 ({len(participating_players)}人)")
         
-        # 参加者を番号順で表示（テーブル形式）
+        # 参加者を番号順で表示（1ページ分を1つの表にまとめる）
         sorted_participants = sorted(participating_players, key=lambda p: p.player_number or 999)
+        page_players = paginate(sorted_participants, key="participants_tab_page")
         
-        # テーブルヘッダー
-        st.markdown("""
-        <div style="
-            background-color: #f0f2f6; 
-            padding: 8px; 
-            border-radius: 8px 8px 0 0; 
-            border: 1px solid #ddd;
-            font-weight: bold;
-            display: grid;
-            grid-template-columns: 80px 1fr 80px;
-            gap: 8px;
-            align-items: center;
-        ">
-            <div style="text-align: center;">番号</div>
-            <div>プレイヤー名</div>
-            <div style="text-align: center;">除外</div>
-        </div>
-        """, unsafe_allow_html=True)
+        rows = [
+            [str(player.player_number) if player.player_number else "未", player.name]
+            for player in page_players
+        ]
+        st.markdown(build_table_html(["番号", "プレイヤー名"], rows), unsafe_allow_html=True)
         
-        # 各参加者の行
-        for i, player in enumerate(sorted_participants):
+        # 除外ボタン（表示中のページの分だけ）
+        st.markdown("#### ❌ 参加者から除外")
+        cols = st.columns(4)
+        for i, player in enumerate(page_players):
             number_display = str(player.player_number) if player.player_number else "未"
             
-            # 行の背景色（交互）
-            bg_color = "#ffffff" if i % 2 == 0 else "#f8f9fa"
-            
-            # テーブル行
-            st.markdown(f"""
-            <div style="
-                background-color: {bg_color}; 
-                padding: 8px; 
-                border-left: 1px solid #ddd;
-                border-right: 1px solid #ddd;
-                border-bottom: 1px solid #ddd;
-                display: grid;
-                grid-template-columns: 80px 1fr 80px;
-                gap: 8px;
-                align-items: center;
-                min-height: 40px;
-            ">
-                <div style="
-                    text-align: center; 
-                    background-color: #4285f4; 
-                    color: white; 
-                    border-radius: 50%; 
-                    width: 30px; 
-                    height: 30px; 
-                    display: flex; 
-                    align-items: center; 
-                    justify-content: center; 
-                    font-weight: bold; 
-                    margin: 0 auto;
-                ">
-                    {number_display}
-                </div>
-                <div style="font-weight: bold; padding-left: 8px;">
-                    {player.name}
-                </div>
-                <div style="text-align: center;" id="remove_btn_tab_{player.id}">
-                    <!-- 除外ボタンプレースホルダー -->
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # ボタン用の列を作成
-            cols = st.columns([1, 1, 1])
-            
-            with cols[2]:  # 除外ボタン列
+            with cols[i % 4]:
                 if st.button(
-                    "❌",
+                    f"❌ {number_display} {player.name}",
                     key=f"remove_tab_{player.id}",
                     help=f"{player.name}を参加者から除外",
                     use_container_width=True
                 ):
-                    player_service.set_participation_status(player.id, False)
-                    # 番号を再割り振り
-                    player_service.assign_player_numbers()
+                    # 参加者から除外し、番号を再割り振り
+                    player_service.set_participation_bulk([player.id], False)
                     st.success(f"🚪 {player.name}を参加者から除外しました")
-                    st.rerun()
-        
-        # テーブルの下線
-        st.markdown("""
-        <div style="
-            border-bottom: 1px solid #ddd;
-            border-radius: 0 0 8px 8px;
-            height: 1px;
-        "></div>
-        """, unsafe_allow_html=True)
+                    rerun_fragment()
         
         st.markdown("")  # 余白
         
@@ -1148,13 +1315,21 @@ def show_participants_tab(player_service):
     else:
         st.info("参加者が選択されていません。上記から参加者を選択してください。")
 
-def show_ranking_tab(player_service):
+def show_ranking_tab(player_service, view):
     """ランキングタブ"""
     st.markdown("# 📊 ランキング")
     
-    participating_players = player_service.get_participating_players()
+    # 対象の選択（本日の参加者 / 全登録者の通算成績）
+    scope_label = st.radio(
+        "対象",
+        ["👥 本日の参加者", "📚 全登録者（通算）"],
+        key=persistent_key("ranking_scope", "👥 本日の参加者"),
+        on_change=store_widget_value, args=("ranking_scope",),
+        horizontal=True
+    )
+    scope = "today" if "本日" in scope_label else "all"
     
-    if not participating_players:
+    if scope == "today" and not view.participating_players:
         st.info("🤷‍♂️ 参加者がいません。「👥参加者」タブでプレイヤーを選択してください。")
         return
     
@@ -1163,79 +1338,73 @@ def show_ranking_tab(player_service):
     ranking_type = st.selectbox(
         "ランキング基準",
         ["🏆 勝率ランキング", "⭐ スキルポイントランキング"],
-        key="ranking_type",
+        key=persistent_key("ranking_type", "🏆 勝率ランキング"),
+        on_change=store_widget_value, args=("ranking_type",),
         label_visibility="collapsed"
     )
     
     if "勝率" in ranking_type:
-        ranked_players = player_service.get_ranking_by_winrate()
+        kind = "winrate"
         main_metric = "勝率"
         main_icon = "🏆"
     else:
-        ranked_players = player_service.get_ranking_by_skill()
+        kind = "skill"
         main_metric = "スキルポイント"
         main_icon = "⭐"
     
+    # 順位表は結果の記録ごとに差分更新されるため、ここでは並べ替えない
+    ranking_count = player_service.get_ranking_count(kind, scope)
+    
+    # 自分の順位
+    ranked_ids = [p.id for p in (view.participating_players if scope == "today" else view.players)]
+    selected_id = st.selectbox(
+        "🙋 順位を調べる",
+        options=[None] + sorted(ranked_ids, key=lambda pid: view.name_by_id[pid]),
+        format_func=lambda pid: "選択してください" if pid is None else view.name_by_id[pid],
+        key="ranking_lookup"
+    )
+    if selected_id is not None:
+        rank = player_service.get_rank(selected_id, kind, scope)
+        if rank is not None:
+            st.metric(f"{view.name_by_id[selected_id]}の{main_metric}順位", f"{rank}位 / {ranking_count}人")
+    
     st.divider()
     
     # ランキング表示（大きなフォント）
     st.markdown(f"## {main_icon} {main_metric}ランキング")
     
-    for i, player in enumerate(ranked_players, 1):
+    # 1ページ分（上位から LIST_PAGE_SIZE 件ずつ）だけを順位表から取り出し、1つの表にまとめて表示
+    positions = paginate(range(ranking_count), key="ranking_page")
+    if not positions:
+        return
+    page_players = player_service.get_ranking(kind, scope, positions[0], positions[-1] + 1)
+    
+    rows = []
+    for i, player in enumerate(page_players, positions[0] + 1):
         # 順位のメダル・アイコン表示
-        if i == 1:
-            rank_display = "🥇 1位"
-            card_color = "#FFD700"
-        elif i == 2:
-            rank_display = "🥈 2位"  
-            card_color = "#C0C0C0"
-        elif i == 3:
-            rank_display = "🥉 3位"
-            card_color = "#CD7F32"
+        if i <= 3:
+            rank_display = f"{['🥇', '🥈', '🥉'][i - 1]} {i}位"
         else:
             rank_display = f"🔸 {i}位"
-            card_color = "#f8f9fa"
         
-        # プレイヤーカード
-        with st.container():
-            st.markdown(f"""
-            <div style="
-                background: {card_color}; 
-                border: 2px solid #dee2e6; 
-                border-radius: 12px; 
-                padding: 16px; 
-                margin: 12px 0;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            ">
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # プレイヤー情報（大きなフォント）
-            level_emoji = ["🔸", "🔹", "🟡", "🟠", "🔴"][player.level - 1]
-            status_icon = "💤" if player.is_resting else "⚡"
-            
-            st.markdown(f"## {rank_display} {player.player_number}番 {level_emoji} {player.name} {status_icon}")
-            
-            # 統計情報を2列で表示
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown(f"""
-                ### 🎯 試合成績
-                - **試合数**: {player.matches_played}試合
-                - **勝数**: {player.wins}勝
-                - **勝率**: {player.win_rate:.1%}
-                """)
-            
-            with col2:
-                st.markdown(f"""
-                ### ⭐ スキル情報
-                - **レベル**: Lv.{player.level}
-                - **ポイント**: {player.skill_points:.0f}pt
-                - **状態**: {"休憩中" if player.is_resting else "待機中"}
-                """)
-            
-            st.divider()
+        level_emoji = ["🔸", "🔹", "🟡", "🟠", "🔴"][player.level - 1]
+        if scope == "today":
+            number_display = f"{player.player_number}番"
+            matches_played, wins, win_rate = player.matches_played, player.wins, player.win_rate
+            status_display = "💤 休憩中" if player.is_resting else "⚡ 待機中"
+        else:
+            number_display = f"{player.player_number}番" if player.is_participating_today and player.player_number else "-"
+            matches_played, wins, win_rate = player.total_matches, player.total_wins, player.total_win_rate
+            status_display = "👥 参加中" if player.is_participating_today else "-"
+        rows.append([
+            rank_display, number_display, player.name, f"{level_emoji} Lv.{player.level}",
+            f"{matches_played}試合", f"{wins}勝", f"{win_rate:.1%}",
+            f"{player.skill_points:.0f}pt", status_display
+        ])
+    
+    st.markdown(build_table_html(
+        ["順位", "番号", "プレイヤー名", "レベル", "試合数", "勝数", "勝率", "ポイント", "状態"], rows
+    ), unsafe_allow_html=True)
 
 def show_management_tab():
     """管理タブ"""
@@ -1244,12 +1413,15 @@ def show_management_tab():
     # サブページの選択
     management_option = st.selectbox(
         "管理項目",
-        ["プレイヤー管理", "試合履歴", "データ管理"],
-        key="management_option"
+        ["プレイヤー管理", "組み合わせ条件", "試合履歴", "データ管理"],
+        key=persistent_key("management_option", "プレイヤー管理"),
+        on_change=store_widget_value, args=("management_option",)
     )
     
     if management_option == "プレイヤー管理":
         show_user_management()
+    elif management_option == "組み合わせ条件":
+        show_constraint_settings()
     elif management_option == "試合履歴":
         show_match_history()
     elif management_option == "データ管理":
@@ -1263,8 +1435,8 @@ def show_data_management():
     match_service = MatchService()
     
     # 統計情報
-    players = player_service.get_all_players()
-    matches = match_service.get_all_matches()
+    players = cache.get_all_players()
+    matches = cache.get_all_matches()
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -1277,6 +1449,18 @@ def show_data_management():
     
     st.divider()
     
+    # リーグ履歴
+    league_service = LeagueService()
+    st.subheader("🏆 リーグ履歴")
+    history = league_service.get_history()
+    st.write(f"記録済みセッション数: {history.sessions} / 履歴のあるプレイヤー: {len(history.player_ids)}人")
+    if st.button("🔄 リーグ履歴をリセット（新シーズン開始）", use_container_width=True):
+        league_service.reset_history()
+        st.success("リーグ履歴をリセットしました")
+        st.rerun()
+    
+    st.divider()
+    
     # データリセット
     st.subheader("🗑️ データリセット")
     st.warning("⚠️ 以下の操作は取り消しできません。慎重に実行してください。")
@@ -0,0 +1,119 @@
+"""大規模イベントモードのレイテンシ検証
+
+250人・30コートの地域イベントを想定し、試合生成・保存・読み込み・一覧表示の
+各処理が config.settings.LARGE_EVENT_LATENCY_BUDGET_MS に収まるかを計測する。
+一時ファイルをデータファイルとして使うため、実データには影響しない。
+
+    python -m benchmarks.large_event_benchmark
+    python -m benchmarks.large_event_benchmark --players 400 --courts 50 --matches 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any, Optional
+
+# データファイルを一時ディレクトリに切り替えてからアプリのモジュールを読み込む
+_TEMP_DIR = tempfile.mkdtemp(prefix="picklepair_bench_")
+os.environ["PICKLEPAIR_DATA_FILE"] = os.path.join(_TEMP_DIR, "pickle_pair_data.json")
+
+from config.settings import LARGE_EVENT_LATENCY_BUDGET_MS
+from services.match_service import MatchService
+from services.player_service import PlayerService
+from utils.data_manager import DataManager
+from utils.match_table import build_match_table_html
+from benchmarks.scheduler_benchmark import make_players, percentile
+
+def setup_roster(num_players: int, seed: int):
+    """参加者全員を登録した初期データを1回の書き込みで作成"""
+    players = make_players(num_players, "normal", random.Random(seed))
+    for i, player in enumerate(players, 1):
+        player.player_number = i
+    DataManager.save_data({
+        "players": [p.to_dict() for p in players],
+        "matches": [],
+        "session_data": {"current_match_index": 0, "participating_players": []},
+    })
+
+def run(num_players: int, num_courts: int, num_matches: int, repeats: int, seed: int) -> Dict[str, Any]:
+    """各処理のレイテンシを計測"""
+    setup_roster(num_players, seed)
+    player_service = PlayerService()
+    match_service = MatchService()
+    
+    timings: Dict[str, List[float]] = {key: [] for key in LARGE_EVENT_LATENCY_BUDGET_MS}
+    generated = 0
+    
+    for repeat in range(repeats):
+        match_service.clear_session_matches()
+        active_players = player_service.get_active_players()
+        
+        start = time.perf_counter()
+        matches = match_service.generate_matches(active_players, num_matches, num_courts, True,
+                                                 seed=seed + repeat)
+        timings["generate"].append((time.perf_counter() - start) * 1000)
+        generated = len(matches)
+        
+        start = time.perf_counter()
+        match_service.save_matches(matches)
+        timings["save"].append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        loaded = match_service.get_current_session_matches()
+        timings["load"].append((time.perf_counter() - start) * 1000)
+        
+        start = time.perf_counter()
+        player_number_map = {p.id: p.player_number for p in player_service.get_all_players()}
+        build_match_table_html(loaded, player_number_map)
+        timings["render"].append((time.perf_counter() - start) * 1000)
+    
+    results = {}
+    for key, values in timings.items():
+        results[key] = {
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "max": max(values),
+            "budget": LARGE_EVENT_LATENCY_BUDGET_MS[key],
+            "within_budget": percentile(values, 90) <= LARGE_EVENT_LATENCY_BUDGET_MS[key],
+        }
+    
+    return {
+        "players": num_players,
+        "courts": num_courts,
+        "requested_matches": num_matches,
+        "generated_matches": generated,
+        "repeats": repeats,
+        "latency_ms": results,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="大規模イベントモードのレイテンシ検証")
+    parser.add_argument("--players", type=int, default=250)
+    parser.add_argument("--courts", type=int, default=30)
+    parser.add_argument("--matches", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="結果を書き出す JSON ファイル")
+    args = parser.parse_args(argv)
+    
+    report = run(args.players, args.courts, args.matches, args.repeats, args.seed)
+    
+    print(f"{report['players']}人 / {report['courts']}コート / {report['generated_matches']}試合")
+    print(f"{'処理':<10} {'p50ms':>8} {'p90ms':>8} {'maxms':>8} {'目標ms':>8}  判定")
+    for key, result in report["latency_ms"].items():
+        verdict = "OK" if result["within_budget"] else "NG"
+        print(f"{key:<10} {result['p50']:>8.1f} {result['p90']:>8.1f} {result['max']:>8.1f} "
+              f"{result['budget']:>8}  {verdict}")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    all_within_budget = all(r["within_budget"] for r in report["latency_ms"].values())
+    return 0 if all_within_budget else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""試合生成のベンチマーク
+
+プレイヤー数・コート数・スキル分布を変えながら TournamentScheduler を実行し、
+生成レイテンシのパーセンタイルと組み合わせの品質指標を JSON で出力する。
+--strategies で登録済みの生成方式を並べて比較でき、--time-budget-ms で時間の上限を与える。
+
+    python -m benchmarks.scheduler_benchmark --output before.json
+    python -m benchmarks.scheduler_benchmark --output after.json --compare before.json
+    python -m benchmarks.scheduler_benchmark --players 32 64 --strategies greedy multi_start --time-budget-ms 50
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from models.player import Player
+from utils.match_generator import TournamentScheduler
+from utils.scheduler_strategies import SCHEDULER_STRATEGIES, get_strategy
+from config.settings import DEFAULT_SCHEDULER_STRATEGY, SCHEDULER_TIME_BUDGET_MS
+
+DEFAULT_PLAYER_COUNTS = [8, 16, 32, 64, 128, 256, 400]
+DEFAULT_COURT_COUNTS = [1, 2, 5, 10, 20, 50]
+SKILL_DISTRIBUTIONS = ["uniform", "normal", "bimodal"]
+
+def make_players(num_players: int, distribution: str, rng: random.Random) -> List[Player]:
+    """ベンチマーク用の参加プレイヤーを作成（IDも決定的）"""
+    players = []
+    for i in range(num_players):
+        if distribution == "uniform":
+            skill = rng.uniform(10, 90)
+        elif distribution == "normal":
+            skill = rng.gauss(50, 15)
+        elif distribution == "bimodal":
+            skill = rng.gauss(30, 8) if i % 2 == 0 else rng.gauss(70, 8)
+        else:
+            raise ValueError(f"未対応のスキル分布です: {distribution}")
+        
+        players.append(Player(
+            id=f"bench-{i:04d}",
+            name=f"Player {i + 1}",
+            skill_points=max(0.0, skill),
+            created_at="2024-01-01T00:00:00",
+            is_participating_today=True
+        ))
+    return players
+
+def percentile(values: List[float], pct: float) -> float:
+    """線形補間によるパーセンタイル"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def run_scenario(num_players: int, num_courts: int, distribution: str, rounds: int,
+                 repeats: int, seed: int, skill_matching_enabled: bool,
+                 strategy: str = DEFAULT_SCHEDULER_STRATEGY,
+                 time_budget_ms: Optional[float] = None) -> Dict[str, Any]:
+    """1つの条件で試合生成を繰り返し、レイテンシと品質を集計"""
+    latencies_ms = []
+    qualities = []
+    num_matches = num_courts * rounds
+    
+    for repeat in range(repeats):
+        rng = random.Random(seed + repeat)
+        players = make_players(num_players, distribution, rng)
+        scheduler = TournamentScheduler(players, skill_matching_enabled, seed=seed + repeat)
+        
+        start = time.perf_counter()
+        _, metrics = get_strategy(strategy).generate(scheduler, num_matches, num_courts, time_budget_ms)
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        
+        qualities.append(metrics)
+    
+    quality_keys = qualities[0].keys() if qualities else []
+    return {
+        "players": num_players,
+        "courts": num_courts,
+        "distribution": distribution,
+        "strategy": strategy,
+        "time_budget_ms": time_budget_ms,
+        "requested_matches": num_matches,
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 50),
+            "p90": percentile(latencies_ms, 90),
+            "p99": percentile(latencies_ms, 99),
+            "max": max(latencies_ms),
+        },
+        "quality": {key: statistics.mean(q[key] for q in qualities) for key in quality_keys},
+    }
+
+def run_benchmark(player_counts: List[int], court_counts: List[int], distributions: List[str],
+                  rounds: int, repeats: int, seed: int,
+                  skill_matching_enabled: bool, strategies: Optional[List[str]] = None,
+                  time_budget_ms: Optional[float] = None) -> Dict[str, Any]:
+    """全条件のスイープを実行"""
+    strategies = strategies or [DEFAULT_SCHEDULER_STRATEGY]
+    results = []
+    for num_players in player_counts:
+        for num_courts in court_counts:
+            # 全コートを埋められない組み合わせは対象外
+            if num_courts * 4 > num_players:
+                continue
+            for distribution in distributions:
+                for strategy in strategies:
+                    results.append(run_scenario(num_players, num_courts, distribution,
+                                                rounds, repeats, seed, skill_matching_enabled,
+                                                strategy, time_budget_ms))
+    
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "seed": seed,
+            "rounds": rounds,
+            "repeats": repeats,
+            "skill_matching_enabled": skill_matching_enabled,
+            "strategies": strategies,
+            "time_budget_ms": time_budget_ms,
+        },
+        "results": results,
+    }
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """ベースラインとの差分（p90レイテンシと平均スキル差）を行単位で返す"""
+    def key(result):
+        return (result["players"], result["courts"], result["distribution"],
+                result.get("strategy", DEFAULT_SCHEDULER_STRATEGY))
+    
+    baseline_map = {key(r): r for r in baseline.get("results", [])}
+    lines = []
+    for result in current["results"]:
+        before = baseline_map.get(key(result))
+        if not before:
+            continue
+        p90_before = before["latency_ms"]["p90"]
+        p90_after = result["latency_ms"]["p90"]
+        ratio = p90_after / p90_before if p90_before else float("inf")
+        gap_before = before["quality"].get("skill_gap_mean", 0.0)
+        gap_after = result["quality"].get("skill_gap_mean", 0.0)
+        lines.append(
+            f"{result['players']:>4}人 {result['courts']:>3}コート {result['distribution']:<8} "
+            f"{result.get('strategy', DEFAULT_SCHEDULER_STRATEGY):<12} "
+            f"p90 {p90_before:8.2f} -> {p90_after:8.2f} ms (x{ratio:.2f})  "
+            f"スキル差 {gap_before:6.2f} -> {gap_after:6.2f}"
+        )
+    return lines
+
+def print_results(report: Dict[str, Any]):
+    """結果を表形式で表示"""
+    print(f"{'人数':>4} {'コート':>5} {'分布':<8} {'方式':<12} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} "
+          f"{'試合':>5} {'試合数差':>7} {'ペア重複':>7} {'平均スキル差':>10} {'最大連続休み':>10} {'稼働率':>6}")
+    for result in report["results"]:
+        latency = result["latency_ms"]
+        quality = result["quality"]
+        print(f"{result['players']:>4} {result['courts']:>5} {result['distribution']:<8} "
+              f"{result.get('strategy', DEFAULT_SCHEDULER_STRATEGY):<12} "
+              f"{latency['p50']:>8.2f} {latency['p90']:>8.2f} {latency['p99']:>8.2f} "
+              f"{quality['matches']:>5.0f} {quality['games_spread']:>7.1f} "
+              f"{quality['partner_repeats']:>7.1f} {quality['skill_gap_mean']:>10.2f} "
+              f"{quality['max_consecutive_sit_outs']:>10.1f} {quality['court_utilization']:>6.0%}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="試合生成のベンチマーク")
+    parser.add_argument("--players", type=int, nargs="+", default=DEFAULT_PLAYER_COUNTS)
+    parser.add_argument("--courts", type=int, nargs="+", default=DEFAULT_COURT_COUNTS)
+    parser.add_argument("--distributions", nargs="+", default=SKILL_DISTRIBUTIONS,
+                        choices=SKILL_DISTRIBUTIONS)
+    parser.add_argument("--rounds", type=int, default=5, help="1回の生成で作るラウンド数")
+    parser.add_argument("--repeats", type=int, default=20, help="条件ごとの繰り返し回数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-skill-matching", action="store_true")
+    parser.add_argument("--strategies", nargs="+", default=[DEFAULT_SCHEDULER_STRATEGY],
+                        choices=list(SCHEDULER_STRATEGIES.keys()), help="比較する生成方式")
+    parser.add_argument("--time-budget-ms", type=float, default=SCHEDULER_TIME_BUDGET_MS,
+                        help="1回の生成にかける時間の上限（ミリ秒）")
+    parser.add_argument("--output", help="結果を書き出す JSON ファイル")
+    parser.add_argument("--compare", help="比較対象（変更前）の JSON ファイル")
+    args = parser.parse_args(argv)
+    
+    report = run_benchmark(args.players, args.courts, args.distributions, args.rounds,
+                           args.repeats, args.seed, not args.no_skill_matching,
+                           args.strategies, args.time_budget_ms)
+    print_results(report)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n結果を保存しました: {args.output}")
+    
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n変更前との比較:")
+        for line in compare_results(report, baseline):
+            print(line)
+
+if __name__ == "__main__":
+    main()
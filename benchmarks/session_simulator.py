@@ -0,0 +1,260 @@
+"""練習会の離散イベントシミュレーション
+
+仮想プレイヤー（隠れた実力を持つ）と試合時間の乱数から1回の練習会を再現し、
+MatchService と TournamentScheduler を実際の保存処理ごと動かして
+1時間あたりの試合数・コートの空き時間・プレイヤーの待ち時間・レーティングの収束を集計する。
+コート数や設定を変えて比較し、当日の運営規模を事前に見積もるために使う。
+一時ファイルをデータファイルとして使うため、実データには影響しない。
+
+    python -m benchmarks.session_simulator --players 24 --courts 3 4 5 --minutes 120
+    python -m benchmarks.session_simulator --players 40 --courts 6 --modes continuous rounds --no-skill-matching
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# データファイルを一時ディレクトリに切り替えてからアプリのモジュールを読み込む
+_TEMP_DIR = tempfile.mkdtemp(prefix="picklepair_sim_")
+os.environ["PICKLEPAIR_DATA_FILE"] = os.path.join(_TEMP_DIR, "pickle_pair_data.json")
+
+from config.settings import INITIAL_SKILL_POINTS
+from models.match import Match
+from models.player import Player
+from services.match_service import MatchService
+from services.player_service import PlayerService
+from utils.data_manager import DataManager
+from benchmarks.scheduler_benchmark import percentile
+
+SIMULATION_MODES = ["continuous", "rounds"]
+WINNING_SCORE = 11
+
+def setup_roster(num_players: int, skill_spread: float, rng: random.Random) -> Dict[str, float]:
+    """全員が初期スキルの参加者を登録し、プレイヤーID -> 隠れた実力 を返す"""
+    players = []
+    true_skills = {}
+    for i in range(num_players):
+        player = Player(
+            id=f"sim-{i:04d}",
+            name=f"Player {i + 1}",
+            skill_points=INITIAL_SKILL_POINTS,
+            created_at="2024-01-01T00:00:00",
+            is_participating_today=True,
+            player_number=i + 1
+        )
+        players.append(player)
+        true_skills[player.id] = INITIAL_SKILL_POINTS + rng.gauss(0, skill_spread)
+    
+    DataManager.save_data({
+        "players": [p.to_dict() for p in players],
+        "matches": [],
+        "session_data": {"current_match_index": 0, "participating_players": []},
+    })
+    return true_skills
+
+def rank_correlation(values_a: List[float], values_b: List[float]) -> float:
+    """スピアマンの順位相関（同順位は考慮しない簡易版）"""
+    if len(values_a) < 2:
+        return 0.0
+    ranks_a = np.argsort(np.argsort(values_a)).astype(float)
+    ranks_b = np.argsort(np.argsort(values_b)).astype(float)
+    if ranks_a.std() == 0 or ranks_b.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+def play_match(match: Match, true_skills: Dict[str, float], rng: random.Random) -> Tuple[int, int]:
+    """隠れた実力から勝敗を決め、スコアを返す"""
+    team1_skill = statistics.mean(true_skills[pid] for pid in match.team1_player_ids)
+    team2_skill = statistics.mean(true_skills[pid] for pid in match.team2_player_ids)
+    loser_score = rng.randint(0, WINNING_SCORE - 2)
+    if rng.random() < MatchService.expected_win_probability(team1_skill, team2_skill):
+        return WINNING_SCORE, loser_score
+    return loser_score, WINNING_SCORE
+
+def simulate_session(num_players: int, num_courts: int, mode: str, session_minutes: float,
+                     game_minutes: float, game_sd: float, skill_spread: float,
+                     skill_matching_enabled: bool, seed: int) -> Dict[str, Any]:
+    """1回の練習会をシミュレーション"""
+    rng = random.Random(seed)
+    true_skills = setup_roster(num_players, skill_spread, rng)
+    player_service = PlayerService()
+    match_service = MatchService()
+    
+    events: List[Tuple[float, int, Match]] = []  # (終了時刻, コート番号, 試合)
+    court_busy_minutes = {court: 0.0 for court in range(1, num_courts + 1)}
+    free_since = {pid: 0.0 for pid in true_skills}  # 待ち始めた時刻
+    waits: List[float] = []
+    persistence_ms: List[float] = []
+    convergence: List[Dict[str, float]] = []
+    next_checkpoint = 60.0
+    completed = 0
+
+    def start(matches: List[Match], now: float):
+        for match in matches:
+            duration = max(game_minutes / 3, rng.gauss(game_minutes, game_sd))
+            heapq.heappush(events, (now + duration, match.court_number, match))
+            court_busy_minutes[match.court_number] += duration
+            for pid in match.team1_player_ids + match.team2_player_ids:
+                waits.append(now - free_since[pid])
+
+    def record_convergence(now: float):
+        players = player_service.get_all_players()
+        convergence.append({
+            "minute": now,
+            "rank_correlation": rank_correlation([p.skill_points for p in players],
+                                                 [true_skills[p.id] for p in players]),
+        })
+    
+    # 開始時に全コートを埋める
+    matches = match_service.fill_open_courts(player_service.get_active_players(), num_courts,
+                                             skill_matching_enabled, seed=seed)
+    match_service.save_matches(matches)
+    start(matches, 0.0)
+    
+    now = 0.0
+    while events:
+        now, court_number, match = heapq.heappop(events)
+        while now >= next_checkpoint:
+            record_convergence(next_checkpoint)
+            next_checkpoint += 60.0
+        
+        # 結果記録（アプリのスコア入力と同じ処理）
+        team1_score, team2_score = play_match(match, true_skills, rng)
+        started = time.perf_counter()
+        players = player_service.get_all_players()
+        match_service.record_match_result(match.id, team1_score, team2_score, players)
+        persistence_ms.append((time.perf_counter() - started) * 1000)
+        completed += 1
+        for pid in match.team1_player_ids + match.team2_player_ids:
+            free_since[pid] = now
+        
+        if now >= session_minutes:
+            continue  # 終了時刻を過ぎたら新しい試合は始めない
+        
+        started = time.perf_counter()
+        if mode == "continuous":
+            # 空いたコートにすぐ次の試合を入れる
+            next_match = match_service.generate_next_match(
+                player_service.get_active_players(), court_number, skill_matching_enabled,
+                seed=seed + completed
+            )
+            new_matches = [next_match] if next_match else []
+        elif not events:
+            # 全コートの試合が終わってから次のラウンドを生成する
+            new_matches = match_service.fill_open_courts(
+                player_service.get_active_players(), num_courts, skill_matching_enabled,
+                seed=seed + completed
+            )
+        else:
+            new_matches = []
+        if new_matches:
+            match_service.save_matches(new_matches)
+            persistence_ms.append((time.perf_counter() - started) * 1000)
+        start(new_matches, now)
+    
+    session_end = max(now, session_minutes)
+    record_convergence(session_end)
+    
+    games_by_player = {pid: 0 for pid in true_skills}
+    for match in match_service.get_completed_matches():
+        for pid in match.team1_player_ids + match.team2_player_ids:
+            games_by_player[pid] += 1
+    games = list(games_by_player.values())
+    court_minutes = num_courts * session_end
+    
+    return {
+        "players": num_players,
+        "courts": num_courts,
+        "mode": mode,
+        "skill_matching_enabled": skill_matching_enabled,
+        "session_minutes": session_end,
+        "games": completed,
+        "games_per_hour": completed / (session_end / 60) if session_end else 0.0,
+        "court_idle_ratio": 1 - sum(court_busy_minutes.values()) / court_minutes if court_minutes else 0.0,
+        "games_per_player_min": min(games) if games else 0,
+        "games_per_player_max": max(games) if games else 0,
+        "wait_minutes_mean": statistics.mean(waits) if waits else 0.0,
+        "wait_minutes_p90": percentile(waits, 90),
+        "wait_minutes_max": max(waits) if waits else 0.0,
+        "rank_correlation": convergence[-1]["rank_correlation"],
+        "convergence": convergence,
+        "persistence_ms_p50": percentile(persistence_ms, 50),
+        "persistence_ms_p90": percentile(persistence_ms, 90),
+    }
+
+def run_simulations(num_players: int, court_counts: List[int], modes: List[str],
+                    session_minutes: float, game_minutes: float, game_sd: float,
+                    skill_spread: float, skill_matching_enabled: bool,
+                    repeats: int, seed: int) -> List[Dict[str, Any]]:
+    """条件ごとにシミュレーションを繰り返し、数値指標を平均する"""
+    results = []
+    for num_courts in court_counts:
+        if num_courts * 4 > num_players:
+            continue  # 全コートを埋められない組み合わせは対象外
+        for mode in modes:
+            runs = [simulate_session(num_players, num_courts, mode, session_minutes, game_minutes,
+                                     game_sd, skill_spread, skill_matching_enabled, seed + repeat)
+                    for repeat in range(repeats)]
+            summary = dict(runs[0])
+            for key, value in runs[0].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    summary[key] = statistics.mean(run[key] for run in runs)
+            summary["players"] = num_players
+            summary["courts"] = num_courts
+            summary["convergence"] = [
+                {"minute": checkpoint["minute"],
+                 "rank_correlation": statistics.mean(run["convergence"][i]["rank_correlation"]
+                                                     for run in runs
+                                                     if i < len(run["convergence"]))}
+                for i, checkpoint in enumerate(runs[0]["convergence"])
+            ]
+            results.append(summary)
+    return results
+
+def print_results(results: List[Dict[str, Any]]):
+    """結果を表形式で表示"""
+    print(f"{'コート':>5} {'方式':<10} {'試合/時':>7} {'空き率':>6} {'試合数/人':>9} "
+          f"{'平均待ち分':>9} {'p90待ち分':>9} {'最大待ち分':>9} {'順位相関':>8} {'保存p90ms':>9}")
+    for r in results:
+        print(f"{r['courts']:>5} {r['mode']:<10} {r['games_per_hour']:>7.1f} {r['court_idle_ratio']:>6.0%} "
+              f"{r['games_per_player_min']:>4.1f}-{r['games_per_player_max']:<4.1f} "
+              f"{r['wait_minutes_mean']:>9.1f} {r['wait_minutes_p90']:>9.1f} {r['wait_minutes_max']:>9.1f} "
+              f"{r['rank_correlation']:>8.2f} {r['persistence_ms_p90']:>9.1f}")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="練習会の離散イベントシミュレーション")
+    parser.add_argument("--players", type=int, default=24)
+    parser.add_argument("--courts", type=int, nargs="+", default=[2, 3, 4, 5])
+    parser.add_argument("--modes", nargs="+", default=SIMULATION_MODES, choices=SIMULATION_MODES,
+                        help="continuous: 空いたコートにすぐ次の試合 / rounds: 全コート終了ごとに次のラウンド")
+    parser.add_argument("--minutes", type=float, default=120, help="練習会の時間（分）")
+    parser.add_argument("--game-minutes", type=float, default=12, help="1試合の平均時間（分）")
+    parser.add_argument("--game-sd", type=float, default=3, help="1試合の時間の標準偏差（分）")
+    parser.add_argument("--skill-spread", type=float, default=150,
+                        help="隠れた実力の標準偏差（Eloのポイント換算）")
+    parser.add_argument("--no-skill-matching", action="store_true")
+    parser.add_argument("--repeats", type=int, default=3, help="条件ごとの繰り返し回数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="結果を書き出す JSON ファイル")
+    args = parser.parse_args(argv)
+    
+    results = run_simulations(args.players, args.courts, args.modes, args.minutes, args.game_minutes,
+                              args.game_sd, args.skill_spread, not args.no_skill_matching,
+                              args.repeats, args.seed)
+    print(f"{args.players}人 / {args.minutes:.0f}分 / 1試合平均{args.game_minutes:.0f}分")
+    print_results(results)
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n結果を保存しました: {args.output}")
+
+if __name__ == "__main__":
+    main()
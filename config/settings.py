@@ -1,14 +1,66 @@
+import os
+
 # デフォルト値
 DEFAULT_COURT_COUNT = 2
 DEFAULT_SKILL_MATCHING_ENABLED = True
 ELO_K_FACTOR = 32
 INITIAL_SKILL_POINTS = 50.0
 
+# リーグモード: セッションを閉じるたびに過去のペア・対戦履歴の重みに掛ける減衰率
+LEAGUE_HISTORY_DECAY = 0.7
+
+# 試合形式
+MATCH_FORMATS = {
+    "open": "オープン（バランス）",
+    "americano": "アメリカーノ",
+    "mexicano": "メキシカーノ",
+    "king_of_court": "キング・オブ・ザ・コート",
+}
+
+# 試合生成の方式（utils/scheduler_strategies.py に登録された名前）と1回の生成にかける時間の上限
+DEFAULT_SCHEDULER_STRATEGY = "greedy"
+SCHEDULER_TIME_BUDGET_MS = 300
+
 # 制約値
 MIN_PLAYERS_FOR_MATCH = 4
 MAX_COURTS = 10
 MAX_MATCHES_PER_GENERATION = 10
 MIN_MATCHES_PER_GENERATION = 1
 
-# データファイルパス
-DATA_FILE_PATH = "data/pickle_pair_data.json" 
\ No newline at end of file
+# 大規模イベントモードの制約値
+LARGE_EVENT_MAX_COURTS = 50
+LARGE_EVENT_MAX_MATCHES_PER_GENERATION = 500
+
+# 大規模イベントモードのレイテンシ目標（ミリ秒）
+# 250人・30コート・300試合の生成を想定（benchmarks/large_event_benchmark.py で検証）
+LARGE_EVENT_LATENCY_BUDGET_MS = {
+    "generate": 250,  # 試合生成
+    "save": 300,      # 生成した試合の保存（1回の書き込み）
+    "load": 150,      # 試合一覧の読み込み
+    "render": 50,     # 試合一覧HTMLの組み立て
+}
+
+# 結果記録や休憩の変更のたびに、次の試合生成をバックグラウンドで先読みする
+LOOKAHEAD_ENABLED = True
+
+# 「複数案から選ぶ」で提示する組み合わせ案の数
+SCHEDULE_ALTERNATIVES_COUNT = 3
+
+# この件数を超える試合は、カードではなく一覧表で表示する
+COMPACT_MATCH_LIST_THRESHOLD = 12
+
+# 参加者・ランキング・試合履歴の一覧を、1ページあたりこの件数ずつ表示する
+LIST_PAGE_SIZE = 50
+
+# スコア入力・休憩の切り替え・参加者の追加はその部分だけを再実行し、
+# 最後の操作からこの秒数が経ったら、古くなった他の表示をまとめて描画し直す
+STALE_VIEW_REFRESH_DELAY_SEC = 3
+
+# 選択中のタブだけを描画する（False にすると、従来どおり毎回すべてのタブを描画する）
+LAZY_TAB_RENDERING = True
+
+# データファイルパス（環境変数 PICKLEPAIR_DATA_FILE で変更可能）
+DATA_FILE_PATH = os.environ.get("PICKLEPAIR_DATA_FILE", "data/pickle_pair_data.json")
+
+# プレイヤー数 + 試合数がこの件数を超えると、データファイルをインデントなしで書き出す
+COMPACT_DATA_FILE_THRESHOLD = 1000 
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class SchedulingConstraints(BaseModel):
+    """試合組み合わせの条件"""
+    # 常にペアにする2人（プレイヤーIDの組）
+    fixed_pairs: List[List[str]] = Field(default_factory=list)
+    # ペアにしない2人（プレイヤーIDの組）
+    avoid_pairs: List[List[str]] = Field(default_factory=list)
+    # ミックスダブルス（各チームを男女1人ずつにする）
+    mixed_doubles: bool = False
+    # 同じグループタグのプレイヤー同士をペアにしない
+    separate_groups: bool = False
+
+    @property
+    def is_empty(self) -> bool:
+        """条件が1つも設定されていないか"""
+        return not (self.fixed_pairs or self.avoid_pairs or self.mixed_doubles or self.separate_groups)
+
+    def to_dict(self) -> dict:
+        """辞書形式に変換"""
+        return self.model_dump()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SchedulingConstraints":
+        """辞書から作成"""
+        return cls(**data)
@@ -1,9 +1,9 @@
-from pydantic import BaseModel
+from models.tracked import TrackedModel
 from typing import List, Optional
 from datetime import datetime
 import uuid
 
-class Match(BaseModel):
+class Match(TrackedModel):
     id: str
     match_index: int
     court_number: int
@@ -1,20 +1,28 @@
-from pydantic import BaseModel
+from models.tracked import TrackedModel
 from typing import Optional
 from datetime import datetime
 import uuid
 
-class Player(BaseModel):
+class Player(TrackedModel):
     id: str
     name: str
     skill_points: float = 50.0
     created_at: str
     
+    # 組み合わせ条件で参照する属性（任意）
+    gender: Optional[str] = None  # "M" / "F"
+    group_tag: Optional[str] = None
+    
     # セッション固有の属性（計算される）
     player_number: Optional[int] = None
     matches_played: int = 0
     wins: int = 0
     is_participating_today: bool = False
     is_resting: bool = False
+    
+    # 通算の成績（セッションの統計をリセットしても残る）
+    total_matches: int = 0
+    total_wins: int = 0
 
     @classmethod
     def create_new(cls, name: str) -> "Player":
@@ -38,6 +46,13 @@ class Player(BaseModel):
             return 0.0
         return self.wins / self.matches_played
 
+    @property
+    def total_win_rate(self) -> float:
+        """通算の勝率を計算"""
+        if self.total_matches == 0:
+            return 0.0
+        return self.total_wins / self.total_matches
+
     def to_dict(self) -> dict:
         """辞書形式に変換"""
         return self.model_dump()
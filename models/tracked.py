@@ -0,0 +1,31 @@
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, Set
+
+class TrackedModel(BaseModel):
+    """フィールドの変更を記録するモデル
+
+    読み込み・作成直後は未変更の状態で、値が変わったフィールド名だけを記録する。
+    サービスは変更のあったレコードだけを保存し、保存後に mark_clean で記録を消す。
+    """
+
+    _changed_fields: Set[str] = PrivateAttr(default_factory=set)
+
+    def __setattr__(self, name: str, value: Any):
+        # 試合生成中は頻繁に呼ばれるため、プライベート属性は __getattr__ を経由せずに参照する
+        if name in self.__pydantic_fields__ and getattr(self, name) != value:
+            self.__pydantic_private__["_changed_fields"].add(name)
+        super().__setattr__(name, value)
+
+    @property
+    def is_dirty(self) -> bool:
+        """保存後に変更されたフィールドがあるか"""
+        return bool(self._changed_fields)
+
+    @property
+    def changed_fields(self) -> Set[str]:
+        """変更されたフィールド名"""
+        return set(self._changed_fields)
+
+    def mark_clean(self):
+        """保存済みとして変更の記録を消す"""
+        self._changed_fields.clear()
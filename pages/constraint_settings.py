@@ -0,0 +1,124 @@
+import streamlit as st
+from services.player_service import PlayerService
+from utils import cache
+from services.constraint_service import ConstraintService
+
+GENDER_OPTIONS = {"未設定": None, "男性": "M", "女性": "F"}
+
+def show_constraint_settings():
+    """組み合わせ条件の設定ページを表示"""
+    st.title("🧩 組み合わせ条件")
+    st.caption("試合生成時に守る条件を設定します。条件を満たせない4人組は生成されません。")
+    
+    player_service = PlayerService()
+    constraint_service = ConstraintService()
+    
+    players = cache.get_all_players()
+    if len(players) < 2:
+        st.info("条件を設定するには2人以上のプレイヤーを登録してください。")
+        return
+    
+    constraints = constraint_service.get_constraints()
+    player_names = {p.id: p.name for p in players}
+    
+    # 全体の条件
+    st.subheader("⚙️ 全体の条件")
+    with st.form("constraint_flags_form"):
+        mixed_doubles = st.checkbox(
+            "👫 ミックスダブルス（各チームを男女1人ずつにする）",
+            value=constraints.mixed_doubles,
+            help="性別が未設定のプレイヤーは誰とでもペアになります"
+        )
+        separate_groups = st.checkbox(
+            "🏷️ 同じグループのプレイヤー同士をペアにしない",
+            value=constraints.separate_groups,
+            help="下の「プレイヤー属性」で設定したグループを参照します"
+        )
+        if st.form_submit_button("💾 保存", use_container_width=True):
+            constraints.mixed_doubles = mixed_doubles
+            constraints.separate_groups = separate_groups
+            if constraint_service.save_constraints(constraints):
+                st.success("条件を保存しました")
+                st.rerun()
+            else:
+                st.error("保存に失敗しました")
+    
+    st.divider()
+    
+    # ペア条件
+    fixed_tab, avoid_tab = st.tabs(["🤝 固定ペア", "🚫 ペア禁止"])
+    with fixed_tab:
+        st.write("同じ試合に出るときは必ず同じチームになり、できるだけ一緒に出場します。")
+        show_pair_editor(constraint_service, "fixed_pairs", constraints.fixed_pairs, player_names)
+    with avoid_tab:
+        st.write("同じチームにはしません（対戦相手になることはあります）。")
+        show_pair_editor(constraint_service, "avoid_pairs", constraints.avoid_pairs, player_names)
+    
+    st.divider()
+    
+    # プレイヤー属性
+    st.subheader("👤 プレイヤー属性")
+    with st.form("player_attributes_form"):
+        edited = {}
+        for player in players:
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                st.write(f"**{player.name}**")
+            with col2:
+                gender_labels = list(GENDER_OPTIONS.keys())
+                current_label = next(label for label, value in GENDER_OPTIONS.items()
+                                     if value == player.gender)
+                gender_label = st.selectbox(
+                    "性別", gender_labels,
+                    index=gender_labels.index(current_label),
+                    key=f"gender_{player.id}",
+                    label_visibility="collapsed"
+                )
+            with col3:
+                group_tag = st.text_input(
+                    "グループ", value=player.group_tag or "",
+                    placeholder="グループ",
+                    key=f"group_{player.id}",
+                    label_visibility="collapsed"
+                )
+            edited[player.id] = (GENDER_OPTIONS[gender_label], group_tag.strip() or None)
+        
+        if st.form_submit_button("💾 属性を保存", use_container_width=True):
+            # 変更のあったプレイヤーだけを1回の書き込みで保存
+            for player in players:
+                player.gender, player.group_tag = edited[player.id]
+            updated_count = sum(1 for p in players if p.is_dirty)
+            if not player_service.update_players(players):
+                st.error("❌ 属性の保存に失敗しました")
+                return
+            st.success(f"{updated_count}人の属性を更新しました")
+            if updated_count:
+                st.rerun()
+
+def show_pair_editor(constraint_service: ConstraintService, kind: str, pairs, player_names):
+    """固定ペア・ペア禁止の一覧と追加フォームを表示"""
+    for pair in pairs:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            names = [player_names.get(pid, "（削除済み）") for pid in pair]
+            st.write(f"{names[0]} & {names[1]}")
+        with col2:
+            if st.button("🗑️ 削除", key=f"remove_{kind}_{'_'.join(pair)}"):
+                constraint_service.remove_pair(kind, pair)
+                st.rerun()
+    
+    player_ids = list(player_names.keys())
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        player_a = st.selectbox("1人目", player_ids, format_func=lambda pid: player_names[pid],
+                                key=f"{kind}_player_a")
+    with col2:
+        player_b = st.selectbox("2人目", player_ids, index=1, format_func=lambda pid: player_names[pid],
+                                key=f"{kind}_player_b")
+    with col3:
+        st.write("")
+        if st.button("➕ 追加", key=f"add_{kind}", use_container_width=True):
+            if constraint_service.add_pair(kind, player_a, player_b):
+                st.rerun()
+            else:
+                st.error("追加できません（同じ人・登録済みの組・固定ペアの重複）")
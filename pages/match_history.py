@@ -1,6 +1,8 @@
 import streamlit as st
 from services.match_service import MatchService
 from services.player_service import PlayerService
+from utils import cache
+from utils.pagination import paginate
 import pandas as pd
 
 def show_match_history():
@@ -11,8 +13,8 @@ def show_match_history():
     player_service = PlayerService()
     
     # 試合履歴を取得
-    matches = match_service.get_all_matches()
-    players = player_service.get_all_players()
+    matches = cache.get_all_matches()
+    players = cache.get_all_players()
     
     if not matches:
         st.info("まだ試合履歴がありません。")
@@ -31,9 +33,9 @@ def show_match_history():
     # 試合履歴をテーブル形式で表示
     st.subheader("完了済み試合")
     
-    # データフレーム用のデータを準備
+    # データフレーム用のデータを準備（表示中のページの分だけ）
     history_data = []
-    for match in completed_matches:
+    for match in paginate(completed_matches, key="match_history_page"):
         team1_names = [player_name_map.get(pid, "不明") for pid in match.team1_player_ids]
         team2_names = [player_name_map.get(pid, "不明") for pid in match.team2_player_ids]
         
@@ -145,60 +147,27 @@ def show_match_history():
     # 詳細な個人成績は別のセクションで表示
     st.subheader("👤 個人成績サマリー")
     
-    # 参加プレイヤーの成績を計算
-    player_stats = {}
-    for match in completed_matches:
-        for player_id in match.team1_player_ids + match.team2_player_ids:
-            if player_id not in player_stats:
-                player_stats[player_id] = {
-                    "name": player_name_map.get(player_id, "不明"),
-                    "matches": 0,
-                    "wins": 0,
-                    "points_scored": 0,
-                    "points_conceded": 0
-                }
-            
-            player_stats[player_id]["matches"] += 1
-            
-            # 勝敗の記録
-            if match.winner_team == 1 and player_id in match.team1_player_ids:
-                player_stats[player_id]["wins"] += 1
-                player_stats[player_id]["points_scored"] += match.team1_score
-                player_stats[player_id]["points_conceded"] += match.team2_score
-            elif match.winner_team == 2 and player_id in match.team2_player_ids:
-                player_stats[player_id]["wins"] += 1
-                player_stats[player_id]["points_scored"] += match.team2_score
-                player_stats[player_id]["points_conceded"] += match.team1_score
-            else:
-                # 負けた場合
-                if player_id in match.team1_player_ids:
-                    player_stats[player_id]["points_scored"] += match.team1_score
-                    player_stats[player_id]["points_conceded"] += match.team2_score
-                else:
-                    player_stats[player_id]["points_scored"] += match.team2_score
-                    player_stats[player_id]["points_conceded"] += match.team1_score
-    
-    # 成績データフレームを作成
-    if player_stats:
-        stats_data = []
-        for player_id, stats in player_stats.items():
-            win_rate = (stats["wins"] / stats["matches"]) * 100 if stats["matches"] > 0 else 0
-            avg_scored = stats["points_scored"] / stats["matches"] if stats["matches"] > 0 else 0
-            avg_conceded = stats["points_conceded"] / stats["matches"] if stats["matches"] > 0 else 0
-            
-            stats_data.append({
-                "プレイヤー": stats["name"],
-                "試合数": stats["matches"],
-                "勝数": stats["wins"],
-                "勝率": f"{win_rate:.1f}%",
-                "平均得点": f"{avg_scored:.1f}",
-                "平均失点": f"{avg_conceded:.1f}"
-            })
-        
-        stats_df = pd.DataFrame(stats_data)
-        # 勝率でソート
-        stats_df = stats_df.sort_values("勝率", ascending=False)
-        st.dataframe(stats_df, use_container_width=True, hide_index=True)
+    # 参加プレイヤーの成績（データが更新されたときだけ集計し直す。勝率は数値のまま並べ替え済み）
+    stats_df = cache.get_player_stats()
+    if not stats_df.empty:
+        stats_df = stats_df[["name", "matches", "wins", "win_rate", "avg_scored", "avg_conceded"]].rename(columns={
+            "name": "プレイヤー",
+            "matches": "試合数",
+            "wins": "勝数",
+            "win_rate": "勝率",
+            "avg_scored": "平均得点",
+            "avg_conceded": "平均失点"
+        })
+        st.dataframe(
+            stats_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "勝率": st.column_config.NumberColumn(format="%.1f%%"),
+                "平均得点": st.column_config.NumberColumn(format="%.1f"),
+                "平均失点": st.column_config.NumberColumn(format="%.1f"),
+            }
+        )
 
 def show_match_history_edit_form(match, player_service, match_service):
     """試合履歴の編集フォーム"""
@@ -206,7 +175,7 @@ def show_match_history_edit_form(match, player_service, match_service):
     st.markdown("### ✏️ 試合結果を編集")
     
     # プレイヤー名の取得
-    all_players = player_service.get_all_players()
+    all_players = cache.get_all_players()
     player_name_map = {p.id: p.name for p in all_players}
     
     team1_names = [player_name_map.get(pid, "不明") for pid in match.team1_player_ids]
@@ -238,10 +207,6 @@ def show_match_history_edit_form(match, player_service, match_service):
             )
             
             if success:
-                # プレイヤー情報も更新
-                for player in all_players:
-                    player_service.update_player(player)
-                
                 # 編集モードを終了
                 st.session_state["editing_match_history"] = None
                 st.success("試合結果を更新しました！")
@@ -265,7 +230,7 @@ def show_match_history_delete_confirmation(match, player_service, match_service)
     
     with col_confirm:
         if st.button("🗑️ 削除する", key=f"history_confirm_delete_{match.id}", use_container_width=True, type="primary"):
-            all_players = player_service.get_all_players()
+            all_players = cache.get_all_players()
             
             # スキルポイントを元に戻す
             match_service.revert_match_result(match, all_players)
@@ -276,12 +241,8 @@ def show_match_history_delete_confirmation(match, player_service, match_service)
             match.is_completed = False
             match.completed_at = None
             
-            # 保存
-            if match_service.save_match(match):
-                # プレイヤー情報も更新
-                for player in all_players:
-                    player_service.update_player(player)
-                
+            # 試合と変更のあったプレイヤーを保存
+            if match_service.save_match(match, all_players):
                 st.session_state["deleting_match_history"] = None
                 st.success("試合結果を削除しました！")
                 st.rerun()
@@ -298,7 +259,7 @@ def show_match_history_details(match, player_service):
     st.divider()
     st.write("**👁️ 試合詳細**")
     
-    all_players = player_service.get_all_players()
+    all_players = cache.get_all_players()
     player_name_map = {p.id: p.name for p in all_players}
     
     # チーム1の詳細
@@ -1,5 +1,6 @@
 import streamlit as st
 from services.player_service import PlayerService
+from utils import cache
 
 def show_user_management():
     """ユーザー管理ページを表示"""
@@ -106,7 +107,7 @@ def show_user_management():
                                             duplicate_count += 1
                                             # 既存プレイヤーも自動参加に含める場合
                                             if auto_participate:
-                                                existing_player = next((p for p in player_service.get_all_players() if p.name == name), None)
+                                                existing_player = cache.get_player_by_id(player_service.find_player_id_by_name(name))
                                                 if existing_player and not existing_player.is_participating_today:
                                                     added_players.append(existing_player)
                                         else:
@@ -115,10 +116,8 @@ def show_user_management():
                             
                             # 自動参加機能
                             if auto_participate and added_players:
-                                for player in added_players:
-                                    player_service.set_participation_status(player.id, True)
-                                # 番号を自動割り振り
-                                player_service.assign_player_numbers()
+                                # 参加者に設定し、番号を自動割り振り（1回の書き込み）
+                                player_service.set_participation_bulk([p.id for p in added_players], True)
                             
                             # 結果表示
                             if success_count > 0:
@@ -150,7 +149,7 @@ def show_user_management():
     
     # 既存プレイヤーの管理
     st.subheader("登録プレイヤー一覧")
-    players = player_service.get_all_players()
+    players = cache.get_all_players()
     
     if not players:
         st.info("まだプレイヤーが登録されていません。上記のフォームから追加してください。")
@@ -0,0 +1,51 @@
+from typing import List
+from models.constraints import SchedulingConstraints
+from utils.data_manager import DataManager
+
+class ConstraintService:
+    def __init__(self):
+        self.data_manager = DataManager()
+
+    def get_constraints(self) -> SchedulingConstraints:
+        """組み合わせ条件を取得"""
+        data = self.data_manager.load_data()
+        try:
+            return SchedulingConstraints.from_dict(data.get("constraints", {}))
+        except Exception as e:
+            print(f"組み合わせ条件の読み込みエラー: {e}")
+            return SchedulingConstraints()
+
+    def save_constraints(self, constraints: SchedulingConstraints) -> bool:
+        """組み合わせ条件を保存"""
+        data = self.data_manager.load_data()
+        data["constraints"] = constraints.to_dict()
+        return self.data_manager.save_data(data)
+
+    def add_pair(self, kind: str, player_id_a: str, player_id_b: str) -> bool:
+        """固定ペア（kind="fixed_pairs"）またはペア禁止（kind="avoid_pairs"）を追加"""
+        if player_id_a == player_id_b:
+            return False
+        
+        constraints = self.get_constraints()
+        pair = sorted([player_id_a, player_id_b])
+        if any(sorted(p) == pair for p in constraints.fixed_pairs + constraints.avoid_pairs):
+            return False  # 同じ2人の条件は1つだけ
+        
+        if kind == "fixed_pairs":
+            # 1人が持てる固定ペアは1組まで
+            fixed_ids = {pid for p in constraints.fixed_pairs for pid in p}
+            if player_id_a in fixed_ids or player_id_b in fixed_ids:
+                return False
+        
+        getattr(constraints, kind).append(pair)
+        return self.save_constraints(constraints)
+
+    def remove_pair(self, kind: str, pair: List[str]) -> bool:
+        """固定ペアまたはペア禁止を削除"""
+        constraints = self.get_constraints()
+        pairs = getattr(constraints, kind)
+        remaining = [p for p in pairs if sorted(p) != sorted(pair)]
+        if len(remaining) == len(pairs):
+            return False
+        setattr(constraints, kind, remaining)
+        return self.save_constraints(constraints)
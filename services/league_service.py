@@ -0,0 +1,33 @@
+from utils.data_manager import DataManager
+from utils.league_history import LeagueHistory
+from config.settings import LEAGUE_HISTORY_DECAY
+
+class LeagueService:
+    def __init__(self):
+        self.data_manager = DataManager()
+
+    def is_enabled(self) -> bool:
+        """リーグモードが有効か"""
+        data = self.data_manager.load_data()
+        return bool(data.get("league", {}).get("enabled", False))
+
+    def set_enabled(self, enabled: bool) -> bool:
+        """リーグモードの有効・無効を設定"""
+        data = self.data_manager.load_data()
+        data.setdefault("league", {})["enabled"] = enabled
+        return self.data_manager.save_data(data)
+
+    def get_history(self) -> LeagueHistory:
+        """リーグ履歴を取得"""
+        data = self.data_manager.load_data()
+        try:
+            return LeagueHistory.from_dict(data.get("league", {}).get("history", {}), LEAGUE_HISTORY_DECAY)
+        except Exception as e:
+            print(f"リーグ履歴の読み込みエラー: {e}")
+            return LeagueHistory(LEAGUE_HISTORY_DECAY)
+
+    def reset_history(self) -> bool:
+        """リーグ履歴を消去（新しいシーズンの開始）"""
+        data = self.data_manager.load_data()
+        data.setdefault("league", {})["history"] = {}
+        return self.data_manager.save_data(data)
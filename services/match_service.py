@@ -1,12 +1,28 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+import itertools
 import math
+import random
+import threading
 from models.match import Match
 from models.player import Player
-from utils.data_manager import DataManager
+from utils.data_manager import DataManager, REVISION_KEY, PLAYERS_REVISION_KEY
 from utils.match_generator import TournamentScheduler
-from config.settings import ELO_K_FACTOR
+from utils.league_history import LeagueHistory
+from utils.format_schedulers import FORMAT_SCHEDULERS, AmericanoScheduler, MexicanoScheduler
+from utils.scheduler_strategies import get_strategy, RandomStrategy
+from utils.standings import StandingsIndex
+from utils.king_of_court import KingOfCourtEngine
+from models.constraints import SchedulingConstraints
+from services.player_service import PlayerService
+from config.settings import ELO_K_FACTOR, LEAGUE_HISTORY_DECAY, SCHEDULER_TIME_BUDGET_MS
 
 class MatchService:
+    # 連続進行モードで空いたコートの試合を作るためのスケジューラの状態（全インスタンスで共有）。
+    # 試合の履歴から集計した状態をデータのバージョンとともに保持し、このプロセスでの結果の記録・
+    # 試合の追加はその場で反映する。他の保存を挟んだ場合は次の生成で集計し直す
+    _next_match_state: Optional[Dict[str, Any]] = None
+    _next_match_state_lock = threading.Lock()
+
     def __init__(self):
         self.data_manager = DataManager()
 
@@ -28,75 +44,322 @@ class MatchService:
         # 簡単のため、すべての試合を返す（実際の実装では日時で分ける）
         return self.get_all_matches()
 
-    def save_match(self, match: Match) -> bool:
-        """試合を保存"""
+    def save_match(self, match: Match, players: Optional[List[Player]] = None) -> bool:
+        """試合を保存（players を渡すと、変更のあったプレイヤーも同じ書き込みで保存）"""
+        changed_players = [p for p in players or [] if p.is_dirty]
         data = self.data_manager.load_data()
+        version = data.get(REVISION_KEY)
+        players_version = data.get(PLAYERS_REVISION_KEY)
         matches_data = data.get("matches", [])
         
         # 既存試合の更新 or 新規追加
         found = False
         for i, match_data in enumerate(matches_data):
             if match_data.get("id") == match.id:
+                if not match.is_dirty and not changed_players:
+                    return True  # 変更がないため書き込まない
+                old_match = Match.from_dict(match_data)
+                self._update_standings(data, old_match, match)
                 matches_data[i] = match.to_dict()
                 found = True
                 break
         
         if not found:
+            old_match = None
+            self._update_standings(data, None, match)
             matches_data.append(match.to_dict())
         
         data["matches"] = matches_data
-        return self.data_manager.save_data(data)
+        PlayerService.apply_player_changes(data, changed_players)
+        self._update_king_of_court(data, old_match, match, players or [])
+        if not self.data_manager.save_data(data):
+            return False
+        PlayerService.update_rankings(data, [p.id for p in changed_players], players_version)
+        if old_match is None and not data.get("king_of_court", {}).get("active"):
+            self._update_next_match_state(version, data.get(REVISION_KEY), added=match,
+                                          completed=match if match.is_completed else None)
+        self._mark_clean([match], changed_players)
+        return True
+
+    @staticmethod
+    def _mark_clean(matches: List[Match], players: List[Player]):
+        """保存できた試合・プレイヤーの変更の記録を消す"""
+        for record in list(matches) + list(players):
+            record.mark_clean()
+
+    def get_standings(self) -> StandingsIndex:
+        """セッションの個人ポイント順位表を取得"""
+        data = self.data_manager.load_data()
+        return StandingsIndex.from_dict(data.get("session_data", {}).get("standings", {}))
+
+    def _update_standings(self, data: Dict[str, Any], old_match: Optional[Match], new_match: Match):
+        """保存する試合の結果の変化分だけ順位表を更新（結果の記録・修正・取り消しに対応）"""
+        old_completed = old_match is not None and old_match.is_completed
+        if not old_completed and not new_match.is_completed:
+            return
+        
+        session_data = data.setdefault("session_data", {})
+        standings = StandingsIndex.from_dict(session_data.get("standings", {}))
+        if old_completed:
+            standings.add_match(old_match, sign=-1)
+        if new_match.is_completed:
+            standings.add_match(new_match)
+        session_data["standings"] = standings.to_dict()
 
-    def save_matches(self, matches: List[Match]) -> bool:
-        """複数の試合を保存"""
+    def save_matches(self, matches: List[Match], match_format: str = "open") -> bool:
+        """複数の試合を保存（アメリカーノではローテーションの位置も同じ書き込みで進める）"""
         data = self.data_manager.load_data()
         
         # 新しい試合を追加
+        data.setdefault("matches", [])
         for match in matches:
             data["matches"].append(match.to_dict())
         
+        if match_format == "americano" and matches:
+            session_data = data.setdefault("session_data", {})
+            players = []
+            for player_data in data.get("players", []):
+                try:
+                    players.append(Player.from_dict(player_data))
+                except Exception as e:
+                    print(f"プレイヤーデータの読み込みエラー: {e}")
+            roster_ids = [p.id for p in AmericanoScheduler.roster_order(players)]
+            session_data["americano_rotation"] = AmericanoScheduler.advance_rotation(
+                session_data.get("americano_rotation"), roster_ids, matches
+            )
+        
         return self.data_manager.save_data(data)
 
     def generate_matches(self, players: List[Player], num_matches: int, 
-                        num_courts: int, skill_matching_enabled: bool) -> List[Match]:
-        """試合を生成"""
+                        num_courts: int, skill_matching_enabled: bool,
+                        seed: Optional[int] = None, match_format: str = "open",
+                        strategy: Optional[str] = None,
+                        time_budget_ms: Optional[float] = SCHEDULER_TIME_BUDGET_MS) -> List[Match]:
+        """試合を生成（seed を指定すると同じ条件で同じ組み合わせを再現）"""
+        matches, _ = self.generate_schedule(players, num_matches, num_courts, skill_matching_enabled,
+                                            seed, match_format, strategy, time_budget_ms)
+        return matches
+
+    def generate_schedule(self, players: List[Player], num_matches: int,
+                          num_courts: int, skill_matching_enabled: bool,
+                          seed: Optional[int] = None, match_format: str = "open",
+                          strategy: Optional[str] = None,
+                          time_budget_ms: Optional[float] = SCHEDULER_TIME_BUDGET_MS
+                          ) -> Tuple[List[Match], Dict[str, float]]:
+        """生成方式（strategy）に従い、時間の上限内で最良の試合と品質指標を生成"""
         try:
-            # 既存の試合履歴を取得
-            existing_matches = self.get_all_matches()
-            
-            # TournamentSchedulerを初期化
-            scheduler = TournamentScheduler(players, skill_matching_enabled)
-            scheduler.update_pair_history(existing_matches)
+            # 既存の試合履歴を反映したスケジューラを初期化
+            scheduler, existing_matches = self._create_scheduler(players, skill_matching_enabled, seed,
+                                                                 match_format)
             
             # 試合生成
-            matches = scheduler.generate_matches(num_matches, num_courts)
+            matches, metrics = get_strategy(strategy).generate(scheduler, num_matches, num_courts,
+                                                               time_budget_ms)
             
-            if not matches:
+            if not matches and scheduler.compiled_constraints.is_active:
+                # ランダム生成では組み合わせ条件を守れないためフォールバックしない
+                print("組み合わせ条件を満たす試合を生成できませんでした。")
+            elif not matches and match_format != "open":
+                # アメリカーノ・メキシカーノの組み方をランダムな組み合わせで置き換えない
+                print("この試合形式では試合を生成できませんでした。")
+            elif not matches:
                 # フォールバック処理
                 print("通常の試合生成に失敗しました。ランダム生成を実行します。")
-                matches = scheduler.generate_fallback_matches(num_matches, num_courts)
+                matches, metrics = RandomStrategy().generate(scheduler, num_matches, num_courts)
             
-            return matches
+            return matches, metrics
             
+        except Exception as e:
+            print(f"試合生成エラー: {e}")
+            return [], {}
+
+    def generate_alternatives(self, players: List[Player], num_matches: int, num_courts: int,
+                              skill_matching_enabled: bool, k: int, seed: Optional[int] = None,
+                              match_format: str = "open") -> List[Tuple[List[Match], Dict[str, float]]]:
+        """評価の良い順に k 件の組み合わせ案を生成（保存はしない）"""
+        try:
+            scheduler, _ = self._create_scheduler(players, skill_matching_enabled, seed, match_format)
+            return scheduler.generate_alternatives(num_matches, num_courts, k)
         except Exception as e:
             print(f"試合生成エラー: {e}")
             return []
 
+    def _create_scheduler(self, players: List[Player], skill_matching_enabled: bool,
+                          seed: Optional[int] = None,
+                          match_format: str = "open",
+                          data: Optional[Dict[str, Any]] = None) -> Tuple[TournamentScheduler, List[Match]]:
+        """保存済みの試合・組み合わせ条件・リーグ履歴を1回の読み込みで反映したスケジューラを作成"""
+        if data is None:
+            data = self.data_manager.load_data()
+        
+        existing_matches = []
+        for match_data in data.get("matches", []):
+            try:
+                existing_matches.append(Match.from_dict(match_data))
+            except Exception as e:
+                print(f"試合データの読み込みエラー: {e}")
+        
+        constraints = SchedulingConstraints.from_dict(data.get("constraints", {}))
+        scheduler_class = FORMAT_SCHEDULERS.get(match_format, TournamentScheduler)
+        extra_args = {}
+        if issubclass(scheduler_class, MexicanoScheduler):
+            extra_args["standings"] = StandingsIndex.from_dict(
+                data.get("session_data", {}).get("standings", {})
+            )
+        elif issubclass(scheduler_class, AmericanoScheduler):
+            extra_args["rotation"] = data.get("session_data", {}).get("americano_rotation")
+        scheduler = scheduler_class(players, skill_matching_enabled, seed=seed,
+                                    constraints=constraints, **extra_args)
+        scheduler.update_pair_history(existing_matches)
+        scheduler.sync_session_state(existing_matches)
+        
+        # リーグモード: 過去セッションの減衰済み履歴も考慮する
+        league = data.get("league", {})
+        if league.get("enabled"):
+            history = LeagueHistory.from_dict(league.get("history", {}), LEAGUE_HISTORY_DECAY)
+            scheduler.add_league_history(history.partner_weights(), history.opponent_weights())
+        
+        return scheduler, existing_matches
+
+    def fill_open_courts(self, players: List[Player], num_courts: int,
+                         skill_matching_enabled: bool, seed: Optional[int] = None) -> List[Match]:
+        """進行中の試合がないコートに次の試合を1つずつ生成（既存の試合はそのまま）"""
+        try:
+            scheduler, existing_matches = self._create_scheduler(players, skill_matching_enabled, seed)
+            players_on_court = self._players_on_court(existing_matches)
+            
+            next_index = max((m.match_index for m in existing_matches), default=0) + 1
+            stream = scheduler.stream_matches(next_index, players_on_court)
+            next(stream)
+            
+            matches = []
+            for court_number in range(1, num_courts + 1):
+                if court_number in players_on_court:
+                    continue
+                match = stream.send(court_number)
+                if match:
+                    matches.append(match)
+            
+            return matches
+        
+        except Exception as e:
+            print(f"次の試合生成エラー: {e}")
+            return []
+
+    @staticmethod
+    def _players_on_court(matches: List[Match]) -> Dict[int, List[str]]:
+        """未完了の試合があるコート -> そのコートの試合に入っているプレイヤー"""
+        players_on_court: Dict[int, List[str]] = {}
+        for match in matches:
+            if not match.is_completed:
+                players_on_court.setdefault(match.court_number, []).extend(
+                    match.team1_player_ids + match.team2_player_ids
+                )
+        return players_on_court
+
+    def generate_next_match(self, players: List[Player], court_number: int,
+                            skill_matching_enabled: bool, seed: Optional[int] = None) -> Optional[Match]:
+        """指定コートが空いたときの次の試合を生成（そのコートに未完了の試合が残っていれば None）
+
+        試合の履歴から集計した状態は共有のものを使い、全試合の読み込み・集計はデータが
+        他で更新された場合だけ行う。
+        """
+        try:
+            with MatchService._next_match_state_lock:
+                state = self._current_next_match_state()
+                scheduler = TournamentScheduler(players, skill_matching_enabled, seed=seed,
+                                                constraints=state["constraints"])
+                scheduler.restore_state(state["scheduler"])
+                players_on_court = state["players_on_court"]
+                next_index = state["next_index"]
+            
+            if court_number in players_on_court:
+                return None  # 次の試合が既に入っている
+            busy_player_ids = {pid for ids in players_on_court.values() for pid in ids}
+            
+            return scheduler.next_match(court_number, next_index, busy_player_ids)
+        
+        except Exception as e:
+            print(f"次の試合生成エラー: {e}")
+            return None
+
+    def _current_next_match_state(self) -> Dict[str, Any]:
+        """空いたコート用の状態を取得（データが更新されていれば集計し直す。ロックを取得して呼ぶ）"""
+        state = MatchService._next_match_state
+        if state is None or state["version"] != DataManager.get_version():
+            data = self.data_manager.load_data()
+            scheduler, existing_matches = self._create_scheduler([], True, data=data)
+            state = {
+                "version": data.get(REVISION_KEY, 0),
+                "constraints": scheduler.constraints,
+                "scheduler": scheduler.snapshot_state(),
+                "players_on_court": self._players_on_court(existing_matches),
+                "next_index": max((m.match_index for m in existing_matches), default=0) + 1,
+            }
+            MatchService._next_match_state = state
+        return state
+
+    @classmethod
+    def _update_next_match_state(cls, version_before_save, version_after_save,
+                                 added: Optional[Match] = None, completed: Optional[Match] = None):
+        """保存した試合の追加・結果を空いたコート用の状態に反映
+
+        状態が保存前のデータから作られている場合だけ更新し、そうでなければ次の生成で集計し直す。
+        """
+        with cls._next_match_state_lock:
+            state = cls._next_match_state
+            if state is None or state["version"] != version_before_save:
+                return
+            history = state["scheduler"]
+            players_on_court = state["players_on_court"]
+            
+            if added is not None:
+                player_ids = added.team1_player_ids + added.team2_player_ids
+                for player_id in player_ids:
+                    history["assigned_counts"][player_id] = history["assigned_counts"].get(player_id, 0) + 1
+                    history["last_match_index"][player_id] = max(
+                        history["last_match_index"].get(player_id, 0), added.match_index
+                    )
+                players_on_court.setdefault(added.court_number, []).extend(player_ids)
+                state["next_index"] = max(state["next_index"], added.match_index + 1)
+            
+            if completed is not None:
+                # update_pair_history と同じ集計（完了した試合のペアと対戦相手）
+                for pair in (tuple(sorted(completed.team1_player_ids)), tuple(sorted(completed.team2_player_ids))):
+                    history["pair_history"][pair] = history["pair_history"].get(pair, 0) + 1
+                for opponent_pair in itertools.product(completed.team1_player_ids, completed.team2_player_ids):
+                    key = tuple(sorted(opponent_pair))
+                    history["opponent_history"][key] = history["opponent_history"].get(key, 0) + 1
+                # コートにいたプレイヤーを待機に戻す
+                on_court = players_on_court.get(completed.court_number, [])
+                for player_id in completed.team1_player_ids + completed.team2_player_ids:
+                    if player_id in on_court:
+                        on_court.remove(player_id)
+                if not on_court:
+                    players_on_court.pop(completed.court_number, None)
+            
+            state["version"] = version_after_save
+
     def record_match_result(self, match_id: str, team1_score: int, team2_score: int, 
                            players: List[Player]) -> bool:
-        """試合結果を記録し、スキルポイントを更新"""
+        """試合結果を記録し、スキルポイントを更新
+
+        結果・変更のあったプレイヤー（通常は出場した4人）・次の対戦（キング・オブ・ザ・コート中）を
+        1回の書き込みで保存する。
+        """
         try:
             # 試合を取得
-            matches = self.get_all_matches()
-            target_match = None
-            for match in matches:
-                if match.id == match_id:
-                    target_match = match
-                    break
-            
-            if not target_match:
+            data = self.data_manager.load_data()
+            version = data.get(REVISION_KEY)
+            players_version = data.get(PLAYERS_REVISION_KEY)
+            matches_data = data.get("matches", [])
+            position = next((i for i, m in enumerate(matches_data) if m.get("id") == match_id), None)
+            if position is None:
                 return False
             
+            old_match = Match.from_dict(matches_data[position])
+            target_match = Match.from_dict(matches_data[position])
+            
             # 試合を完了
             target_match.complete_match(team1_score, team2_score)
             
@@ -106,13 +369,172 @@ class MatchService:
             # スキルポイントを更新
             self._update_skill_points(target_match, players)
             
-            # 試合を保存
-            return self.save_match(target_match)
+            # 試合と変更のあったプレイヤーを保存（次の対戦があれば同じ書き込みで追加）
+            self._update_standings(data, old_match, target_match)
+            matches_data[position] = target_match.to_dict()
+            data["matches"] = matches_data
+            changed_players = [p for p in players if p.is_dirty]
+            PlayerService.apply_player_changes(data, changed_players)
+            self._update_king_of_court(data, old_match, target_match, players)
+            if not self.data_manager.save_data(data):
+                return False
+            PlayerService.update_rankings(data, [p.id for p in changed_players], players_version)
+            if not old_match.is_completed and not data.get("king_of_court", {}).get("active"):
+                self._update_next_match_state(version, data.get(REVISION_KEY), completed=target_match)
+            self._mark_clean([], changed_players)
+            return True
             
         except Exception as e:
             print(f"試合結果記録エラー: {e}")
             return False
 
+    def is_king_of_court_active(self) -> bool:
+        """キング・オブ・ザ・コートが進行中か"""
+        data = self.data_manager.load_data()
+        return bool(data.get("king_of_court", {}).get("active"))
+
+    def start_king_of_court(self, players: List[Player], num_courts: int, move_up: bool = True,
+                            seed: Optional[int] = None) -> List[Match]:
+        """キング・オブ・ザ・コートを開始し、各コートの最初の試合を保存して返す"""
+        try:
+            data = self.data_manager.load_data()
+            matches_data = data.get("matches", [])
+            if any(not m.get("is_completed") for m in matches_data):
+                print("進行中の試合があるため、キング・オブ・ザ・コートを開始できません。")
+                return []
+            
+            # 最初の並びはランダム（以降は結果の順に待機列が進む）
+            player_ids = [p.id for p in players if p.is_participating_today and not p.is_resting]
+            random.Random(seed).shuffle(player_ids)
+            engine = KingOfCourtEngine(move_up=move_up)
+            assignments = engine.start(player_ids, num_courts)
+            if not assignments:
+                return []
+            
+            matches = self._create_king_of_court_matches(matches_data, assignments)
+            data["matches"] = matches_data
+            data["king_of_court"] = {"active": True, **engine.to_dict()}
+            if not self.data_manager.save_data(data):
+                return []
+            return matches
+        
+        except Exception as e:
+            print(f"キング・オブ・ザ・コート開始エラー: {e}")
+            return []
+
+    def stop_king_of_court(self) -> bool:
+        """キング・オブ・ザ・コートを終了（記録済みの試合はそのまま）"""
+        data = self.data_manager.load_data()
+        if data.pop("king_of_court", None) is None:
+            return True
+        return self.data_manager.save_data(data)
+
+    def fill_king_of_court_open_courts(self, players: List[Player]) -> List[Match]:
+        """休憩明けなどで人数がそろった空きコートに試合を入れて保存（保存済みの試合を返す）"""
+        data = self.data_manager.load_data()
+        state = data.get("king_of_court", {})
+        engine = KingOfCourtEngine.from_dict(state)
+        active_ids = {p.id for p in players if p.is_participating_today and not p.is_resting}
+        for player_id in active_ids:
+            engine.add_player(player_id)
+        
+        assignments = engine.fill_open_courts(active_ids.__contains__)
+        if not assignments:
+            return []
+        matches_data = data.get("matches", [])
+        matches = self._create_king_of_court_matches(matches_data, assignments)
+        data["matches"] = matches_data
+        data["king_of_court"] = {**state, **engine.to_dict()}
+        if not self.data_manager.save_data(data):
+            return []
+        return matches
+
+    def _update_king_of_court(self, data: Dict[str, Any], old_match: Optional[Match],
+                              new_match: Match, players: List[Player]):
+        """結果の記録・修正・取り消しに合わせて待機列を進める／戻す（キング・オブ・ザ・コート中のみ）"""
+        if not data.get("king_of_court", {}).get("active"):
+            return
+        if old_match is not None and old_match.is_completed:
+            if not self._undo_king_of_court_advance(data, old_match):
+                return  # 後の結果まで進んでいるため戻せない（待機列はそのまま）
+        if new_match.is_completed:
+            self._advance_king_of_court(data, new_match, players)
+
+    def _advance_king_of_court(self, data: Dict[str, Any], match: Match, players: List[Player]):
+        """結果に応じて待機列を進め、空いたコートの次の試合を data に追加"""
+        state = data["king_of_court"]
+        engine = KingOfCourtEngine.from_dict(state)
+        active_ids = {p.id for p in players if p.is_participating_today and not p.is_resting}
+        is_active = active_ids.__contains__
+        
+        if match.winner_team == 1:
+            winners, losers = match.team1_player_ids, match.team2_player_ids
+        elif match.winner_team == 2:
+            winners, losers = match.team2_player_ids, match.team1_player_ids
+        else:
+            # 引き分けは両ペアとも待機列へ
+            winners, losers = [], match.team1_player_ids + match.team2_player_ids
+        
+        assignments = []
+        teams = engine.on_result(match.court_number, winners, losers, is_active)
+        if teams:
+            assignments.append((match.court_number, teams[0], teams[1]))
+        # 勝者が上がったことで空きコートが埋まる場合もある
+        assignments.extend(engine.fill_open_courts(is_active))
+        
+        created = self._create_king_of_court_matches(data["matches"], assignments)
+        # 結果の取り消しで戻せるよう、この結果の後に組んだ試合を覚えておく
+        # （この試合を組んだ結果は、この試合に結果が入ったことでもう戻せない）
+        advances = {mid: ids for mid, ids in state.get("advances", {}).items() if match.id not in ids}
+        advances[match.id] = [m.id for m in created]
+        data["king_of_court"] = {**state, **engine.to_dict(), "advances": advances}
+
+    def _undo_king_of_court_advance(self, data: Dict[str, Any], match: Match) -> bool:
+        """結果の記録で進めた待機列を戻し、その後に組んだ未完了の試合を data から取り除く
+
+        その後に組んだ試合に結果が入っている、または4人の誰かが別の試合に入っている場合は
+        戻せないため False を返す。
+        """
+        state = data["king_of_court"]
+        if match.id not in state.get("advances", {}):
+            return False
+        created_ids = state["advances"][match.id]
+        follow_ups = [m for m in data.get("matches", []) if m.get("id") in created_ids]
+        if any(m.get("is_completed") for m in follow_ups):
+            return False
+        match_players = set(match.team1_player_ids + match.team2_player_ids)
+        for other in data.get("matches", []):
+            if (not other.get("is_completed") and other.get("id") not in created_ids
+                    and other.get("id") != match.id
+                    and match_players.intersection(other["team1_player_ids"] + other["team2_player_ids"])):
+                return False
+        
+        engine = KingOfCourtEngine.from_dict(state)
+        engine.revert_result(match.court_number, match.team1_player_ids, match.team2_player_ids,
+                             [(m["court_number"], m["team1_player_ids"], m["team2_player_ids"])
+                              for m in follow_ups])
+        data["matches"] = [m for m in data.get("matches", []) if m.get("id") not in created_ids]
+        advances = {mid: ids for mid, ids in state.get("advances", {}).items() if mid != match.id}
+        data["king_of_court"] = {**state, **engine.to_dict(), "advances": advances}
+        return True
+
+    @staticmethod
+    def _create_king_of_court_matches(matches_data: List[Dict[str, Any]],
+                                      assignments: List[Tuple[int, List[str], List[str]]]) -> List[Match]:
+        """コート割り当てから試合を作成し、matches_data に追加"""
+        next_index = max((m.get("match_index", 0) for m in matches_data), default=0) + 1
+        matches = []
+        for offset, (court_number, team1, team2) in enumerate(assignments):
+            match = Match.create_new(
+                match_index=next_index + offset,
+                court_number=court_number,
+                team1_player_ids=team1,
+                team2_player_ids=team2
+            )
+            matches_data.append(match.to_dict())
+            matches.append(match)
+        return matches
+
     def _update_player_stats(self, match: Match, players: List[Player]):
         """プレイヤーの統計を更新"""
         # 勝利チームを判定
@@ -122,11 +544,19 @@ class MatchService:
         for player_id in match.team1_player_ids + match.team2_player_ids:
             player = next((p for p in players if p.id == player_id), None)
             if player:
+                player.matches_played += 1
+                player.total_matches += 1
+                
                 # 勝利数を更新
-                if winner_team == 1 and player_id in match.team1_player_ids:
-                    player.wins += 1
-                elif winner_team == 2 and player_id in match.team2_player_ids:
+                if (winner_team == 1 and player_id in match.team1_player_ids) or \
+                        (winner_team == 2 and player_id in match.team2_player_ids):
                     player.wins += 1
+                    player.total_wins += 1
+
+    @staticmethod
+    def expected_win_probability(team1_skill: float, team2_skill: float) -> float:
+        """Eloレーティングによるチーム1の勝利期待値"""
+        return 1 / (1 + 10 ** ((team2_skill - team1_skill) / 400))
 
     def _update_skill_points(self, match: Match, players: List[Player]):
         """Eloレーティングシステムでスキルポイントを更新"""
@@ -139,7 +569,7 @@ class MatchService:
         team2_avg_skill = sum(p.skill_points for p in team2_players) / len(team2_players)
         
         # 勝利期待値を計算
-        expected_team1 = 1 / (1 + 10 ** ((team2_avg_skill - team1_avg_skill) / 400))
+        expected_team1 = self.expected_win_probability(team1_avg_skill, team2_avg_skill)
         expected_team2 = 1 - expected_team1
         
         # 実際の結果
@@ -166,9 +596,27 @@ class MatchService:
             player.skill_points = max(0, player.skill_points)  # 最小値0
 
     def clear_session_matches(self) -> bool:
-        """セッションの試合をクリア"""
+        """セッションの試合をクリア（リーグモードでは完了した試合をリーグ履歴に加えてから）"""
         data = self.data_manager.load_data()
+        
+        league = data.get("league", {})
+        if league.get("enabled") and data.get("matches"):
+            matches = []
+            for match_data in data["matches"]:
+                try:
+                    matches.append(Match.from_dict(match_data))
+                except Exception as e:
+                    print(f"試合データの読み込みエラー: {e}")
+            history = LeagueHistory.from_dict(league.get("history", {}), LEAGUE_HISTORY_DECAY)
+            history.close_session(matches)
+            league["history"] = history.to_dict()
+            data["league"] = league
+        
         data["matches"] = []
+        session_data = data.setdefault("session_data", {})
+        session_data.pop("standings", None)
+        session_data.pop("americano_rotation", None)
+        data.pop("king_of_court", None)
         return self.data_manager.save_data(data)
 
     def get_match_by_id(self, match_id: str) -> Optional[Match]:
@@ -197,10 +645,25 @@ class MatchService:
             
             # 指定されたIDの試合を削除
             original_length = len(matches_data)
+            deleted = [m for m in matches_data if m.get("id") == match_id]
             matches_data = [m for m in matches_data if m.get("id") != match_id]
             
             if len(matches_data) < original_length:
                 data["matches"] = matches_data
+                # 完了済みの試合なら順位表からも取り除く
+                deleted_match = Match.from_dict(deleted[0])
+                if deleted_match.is_completed:
+                    session_data = data.setdefault("session_data", {})
+                    standings = StandingsIndex.from_dict(session_data.get("standings", {}))
+                    standings.add_match(deleted_match, sign=-1)
+                    session_data["standings"] = standings.to_dict()
+                elif data.get("king_of_court", {}).get("active"):
+                    # キング・オブ・ザ・コート中は4人を待機列の先頭に戻し、コートを空きにする
+                    state = data["king_of_court"]
+                    engine = KingOfCourtEngine.from_dict(state)
+                    engine.release_match(deleted_match.court_number, deleted_match.team1_player_ids,
+                                         deleted_match.team2_player_ids)
+                    data["king_of_court"] = {**state, **engine.to_dict()}
                 return self.data_manager.save_data(data)
             
             return False
@@ -224,7 +687,7 @@ class MatchService:
             team2_avg_skill = sum(p.skill_points for p in team2_players) / len(team2_players)
             
             # 勝利期待値を計算
-            expected_team1 = 1 / (1 + 10 ** ((team2_avg_skill - team1_avg_skill) / 400))
+            expected_team1 = self.expected_win_probability(team1_avg_skill, team2_avg_skill)
             expected_team2 = 1 - expected_team1
             
             # 実際の結果（逆算）
@@ -268,8 +731,11 @@ class MatchService:
         for player_id in match.team1_player_ids + match.team2_player_ids:
             player = next((p for p in players if p.id == player_id), None)
             if player:
+                player.matches_played = max(0, player.matches_played - 1)
+                player.total_matches = max(0, player.total_matches - 1)
+                
                 # 勝利数を元に戻す
-                if winner_team == 1 and player_id in match.team1_player_ids:
+                if (winner_team == 1 and player_id in match.team1_player_ids) or \
+                        (winner_team == 2 and player_id in match.team2_player_ids):
                     player.wins = max(0, player.wins - 1)
-                elif winner_team == 2 and player_id in match.team2_player_ids:
-                    player.wins = max(0, player.wins - 1) 
\ No newline at end of file
+                    player.total_wins = max(0, player.total_wins - 1) 
\ No newline at end of file
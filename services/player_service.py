@@ -1,8 +1,24 @@
-from typing import List, Optional, Dict, Any
+import threading
+from typing import Callable, List, Optional, Dict, Any
 from models.player import Player
-from utils.data_manager import DataManager
+from utils.data_manager import DataManager, PLAYERS_REVISION_KEY
+from utils.king_of_court import KingOfCourtEngine
+from utils.name_index import NameIndex
+from utils.ranking_index import RankingIndex
 
 class PlayerService:
+    # 名前の索引（全インスタンスで共有）。データファイルが更新されていれば作り直し、
+    # プレイヤーの追加はその場で索引に反映する
+    _name_index: Optional[NameIndex] = None
+    _name_index_version = None
+    _name_index_lock = threading.Lock()
+    
+    # 順位表（全インスタンスで共有）。プレイヤーのレコードが他で更新されていれば作り直し、
+    # このプロセスでの保存で変わったプレイヤーはその場で入れ直す（試合だけの保存では作り直さない）
+    _ranking_index: Optional[RankingIndex] = None
+    _ranking_index_version = None
+    _ranking_index_lock = threading.Lock()
+
     def __init__(self):
         self.data_manager = DataManager()
 
@@ -29,31 +45,104 @@ class PlayerService:
 
     def create_player(self, name: str) -> Player:
         """新しいプレイヤーを作成"""
-        # 名前の重複チェック
-        existing_players = self.get_all_players()
-        if any(p.name == name for p in existing_players):
+        # 名前の重複チェック（全角/半角・ひらがな/カタカナ・大文字/小文字の違いは同じ名前とみなす）
+        if self.find_player_id_by_name(name) is not None:
             raise ValueError(f"プレイヤー名 '{name}' は既に存在します")
         
         player = Player.create_new(name)
-        self.save_player(player)
+        if self.save_player(player):
+            with PlayerService._name_index_lock:
+                index = self._current_name_index()
+                index.add(player.id, player.name)
+                PlayerService._name_index_version = DataManager.get_version()
         return player
 
+    def find_player_id_by_name(self, name: str) -> Optional[str]:
+        """正規化した名前が一致するプレイヤーのIDを取得"""
+        with PlayerService._name_index_lock:
+            return self._current_name_index().find_exact(name)
+
+    def search_players(self, query: str, limit: int = 5,
+                       include: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """名前に query を含むプレイヤーのIDを取得（前方一致を優先し、最大 limit 件）"""
+        with PlayerService._name_index_lock:
+            return self._current_name_index().search(query, limit, include)
+
+    def _current_name_index(self) -> NameIndex:
+        """名前の索引を取得（データファイルが更新されていれば作り直す。ロックを取得して呼ぶ）"""
+        version = DataManager.get_version()
+        if (PlayerService._name_index is None or version is None
+                or version != PlayerService._name_index_version):
+            data = self.data_manager.load_data()
+            PlayerService._name_index = NameIndex(
+                (player_data.get("id"), player_data.get("name", "")) for player_data in data.get("players", [])
+            )
+            PlayerService._name_index_version = version
+        return PlayerService._name_index
+
     def update_player(self, player: Player) -> bool:
         """プレイヤー情報を更新"""
         data = self.data_manager.load_data()
+        players_version = data.get(PLAYERS_REVISION_KEY)
+        if not self.apply_player_changes(data, [player]):
+            return False
+        if not self.data_manager.save_data(data):
+            return False
+        self.update_rankings(data, [player.id], players_version)
+        player.mark_clean()
+        return True
+
+    def update_players(self, players: List[Player]) -> bool:
+        """変更のあったプレイヤーだけを1回の書き込みで保存（変更がなければ書き込まない）"""
+        changed = [p for p in players if p.is_dirty]
+        if not changed:
+            return True
+        
+        data = self.data_manager.load_data()
+        players_version = data.get(PLAYERS_REVISION_KEY)
+        self.apply_player_changes(data, changed)
+        if not self.data_manager.save_data(data):
+            return False
+        self.update_rankings(data, [p.id for p in changed], players_version)
+        for player in changed:
+            player.mark_clean()
+        return True
+
+    @staticmethod
+    def apply_player_changes(data: Dict[str, Any], players: List[Player]) -> int:
+        """読み込み済みのデータにプレイヤーの変更を反映し、反映した件数を返す（保存は呼び出し側）
+
+        変更されたフィールドだけを保存済みのレコードに上書きするため、手元の古い値で
+        他のセッションが同時に更新したフィールドを戻してしまうことはない。
+        """
         players_data = data.get("players", [])
+        positions = {player_data.get("id"): i for i, player_data in enumerate(players_data)}
+        king_of_court = data.get("king_of_court")
+        engine = KingOfCourtEngine.from_dict(king_of_court) if king_of_court else None
         
-        for i, player_data in enumerate(players_data):
-            if player_data.get("id") == player.id:
-                players_data[i] = player.to_dict()
-                data["players"] = players_data
-                return self.data_manager.save_data(data)
+        applied = 0
+        for player in players:
+            position = positions.get(player.id)
+            if position is None:
+                continue
+            players_data[position] = {**players_data[position],
+                                      **player.model_dump(include=player.changed_fields)}
+            applied += 1
+            # キング・オブ・ザ・コート中の途中参加・休憩明けは待機列の最後尾に並べる
+            if engine and player.is_participating_today and not player.is_resting:
+                engine.add_player(player.id)
         
-        return False
+        data["players"] = players_data
+        if applied:
+            DataManager.mark_players_changed(data)
+        if engine:
+            data["king_of_court"] = {**king_of_court, **engine.to_dict()}
+        return applied
 
     def save_player(self, player: Player) -> bool:
         """プレイヤーを保存"""
         data = self.data_manager.load_data()
+        players_version = data.get(PLAYERS_REVISION_KEY)
         players_data = data.get("players", [])
         
         # 既存プレイヤーの更新 or 新規追加
@@ -68,11 +157,16 @@ class PlayerService:
             players_data.append(player.to_dict())
         
         data["players"] = players_data
-        return self.data_manager.save_data(data)
+        DataManager.mark_players_changed(data)
+        if not self.data_manager.save_data(data):
+            return False
+        self.update_rankings(data, [player.id], players_version)
+        return True
 
     def delete_player(self, player_id: str) -> bool:
         """プレイヤーを削除"""
         data = self.data_manager.load_data()
+        players_version = data.get(PLAYERS_REVISION_KEY)
         players_data = data.get("players", [])
         
         original_length = len(players_data)
@@ -80,7 +174,16 @@ class PlayerService:
         
         if len(players_data) < original_length:
             data["players"] = players_data
-            return self.data_manager.save_data(data)
+            DataManager.mark_players_changed(data)
+            # 削除したプレイヤーを含む組み合わせ条件も取り除く
+            constraints = data.get("constraints")
+            if constraints:
+                for kind in ("fixed_pairs", "avoid_pairs"):
+                    constraints[kind] = [p for p in constraints.get(kind, []) if player_id not in p]
+            if not self.data_manager.save_data(data):
+                return False
+            self.update_rankings(data, [player_id], players_version)
+            return True
         
         return False
 
@@ -94,6 +197,36 @@ class PlayerService:
             return self.update_player(player)
         return False
 
+    def set_participation_bulk(self, player_ids: List[str], is_participating: bool) -> bool:
+        """複数のプレイヤーの参加状態をまとめて設定し、番号も振り直す（1回の読み込みと1回の書き込み）"""
+        target_ids = set(player_ids)
+        data = self.data_manager.load_data()
+        players_version = data.get(PLAYERS_REVISION_KEY)
+        
+        changed = []
+        for player_data in data.get("players", []):
+            if player_data.get("id") not in target_ids:
+                continue
+            try:
+                player = Player.from_dict(player_data)
+            except Exception as e:
+                print(f"プレイヤーデータの読み込みエラー: {e}")
+                continue
+            player.is_participating_today = is_participating
+            if not is_participating:
+                player.is_resting = False  # 不参加の場合は休憩も解除
+            if player.is_dirty:
+                changed.append(player)
+        
+        self.apply_player_changes(data, changed)
+        renumbered = self._renumber_participants(data)
+        if not changed and not renumbered:
+            return True
+        if not self.data_manager.save_data(data):
+            return False
+        self.update_rankings(data, [p.id for p in changed] + renumbered, players_version)
+        return True
+
     def set_resting_status(self, player_id: str, is_resting: bool) -> bool:
         """休憩状態を設定"""
         player = self.get_player_by_id(player_id)
@@ -119,30 +252,92 @@ class PlayerService:
             player.matches_played = 0
             player.wins = 0
             player.player_number = None
-            self.update_player(player)
-        return True
+        return self.update_players(players)
 
     def assign_player_numbers(self) -> bool:
-        """参加者に番号を振る"""
-        participating_players = self.get_participating_players()
+        """参加者に番号を振る（番号が変わらない場合は書き込まない）"""
+        data = self.data_manager.load_data()
+        players_version = data.get(PLAYERS_REVISION_KEY)
+        renumbered = self._renumber_participants(data)
+        if not renumbered:
+            return True
+        if not self.data_manager.save_data(data):
+            return False
+        self.update_rankings(data, renumbered, players_version)
+        return True
+
+    @staticmethod
+    def _renumber_participants(data: Dict[str, Any]) -> List[str]:
+        """読み込み済みのデータで参加者に番号を振り、番号が変わったプレイヤーのIDを返す（保存は呼び出し側）"""
+        participating_data = [p for p in data.get("players", []) if p.get("is_participating_today")]
         
         # 名前順でソートして番号を振る（一貫性を保つため）
-        participating_players.sort(key=lambda p: p.name)
+        participating_data.sort(key=lambda p: p.get("name", ""))
         
-        for i, player in enumerate(participating_players, 1):
-            player.player_number = i
-            self.update_player(player)
-        return True
+        renumbered = []
+        for i, player_data in enumerate(participating_data, 1):
+            if player_data.get("player_number") != i:
+                player_data["player_number"] = i
+                renumbered.append(player_data.get("id"))
+        if renumbered:
+            DataManager.mark_players_changed(data)
+        return renumbered
 
     def get_ranking_by_winrate(self) -> List[Player]:
         """勝率でランキングを取得"""
-        players = self.get_participating_players()
-        # 勝率順でソート（勝率同じ場合は試合数が多い順）
-        players.sort(key=lambda p: (p.win_rate, p.matches_played), reverse=True)
-        return players
+        return self.get_ranking("winrate")
 
     def get_ranking_by_skill(self) -> List[Player]:
         """スキルポイントでランキングを取得"""
-        players = self.get_participating_players()
-        players.sort(key=lambda p: p.skill_points, reverse=True)
-        return players 
\ No newline at end of file
+        return self.get_ranking("skill")
+
+    def get_ranking(self, kind: str, scope: str = "today", start: int = 0,
+                    stop: Optional[int] = None) -> List[Player]:
+        """順位順のプレイヤーを取得（kind: winrate / skill、scope: today=本日の参加者 / all=全登録者の通算）"""
+        with PlayerService._ranking_index_lock:
+            return self._current_ranking_index().top(kind, scope, start, stop)
+
+    def get_ranking_count(self, kind: str, scope: str = "today") -> int:
+        """順位表の人数を取得"""
+        with PlayerService._ranking_index_lock:
+            return self._current_ranking_index().count(kind, scope)
+
+    def get_rank(self, player_id: str, kind: str, scope: str = "today") -> Optional[int]:
+        """プレイヤーの順位を取得（順位表にいなければ None）"""
+        with PlayerService._ranking_index_lock:
+            return self._current_ranking_index().rank_of(player_id, kind, scope)
+
+    @classmethod
+    def update_rankings(cls, data: Dict[str, Any], player_ids: List[str],
+                        players_version_before_save) -> None:
+        """保存したプレイヤーのレコードを順位表に反映
+
+        data は保存に成功したデータ（保存した版番号が入っている）、players_version_before_save は
+        それを読み込んだ時点のプレイヤーの版番号。順位表がその版から作られていれば、保存した
+        レコード（他のフィールドも最新のもの）から該当プレイヤーだけを入れ直し、そうでなければ
+        （他の保存を挟んだ場合）次の参照で作り直す。
+        """
+        with cls._ranking_index_lock:
+            if cls._ranking_index is None or cls._ranking_index_version != players_version_before_save:
+                return
+            records = {player_data.get("id"): player_data for player_data in data.get("players", [])}
+            try:
+                for player_id in player_ids:
+                    if player_id in records:
+                        cls._ranking_index.update(Player.from_dict(records[player_id]))
+                    else:
+                        cls._ranking_index.remove(player_id)
+            except Exception as e:
+                print(f"順位表の更新エラー: {e}")
+                cls._ranking_index = None
+                return
+            cls._ranking_index_version = data.get(PLAYERS_REVISION_KEY)
+
+    def _current_ranking_index(self) -> RankingIndex:
+        """順位表を取得（プレイヤーのレコードが更新されていれば作り直す。ロックを取得して呼ぶ）"""
+        version = DataManager.get_players_version()
+        if (PlayerService._ranking_index is None or version is None
+                or version != PlayerService._ranking_index_version):
+            PlayerService._ranking_index = RankingIndex(self.get_all_players())
+            PlayerService._ranking_index_version = version
+        return PlayerService._ranking_index
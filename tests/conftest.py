@@ -0,0 +1,26 @@
+import pytest
+import utils.data_manager as data_manager
+from models.player import Player
+from services.match_service import MatchService
+from services.player_service import PlayerService
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    """一時ディレクトリのデータファイルを使う"""
+    path = tmp_path / "data.json"
+    monkeypatch.setattr(data_manager, "DATA_FILE_PATH", str(path))
+    # 共有の索引は前のテストのデータから作られているため作り直させる
+    monkeypatch.setattr(PlayerService, "_name_index", None)
+    monkeypatch.setattr(PlayerService, "_ranking_index", None)
+    monkeypatch.setattr(MatchService, "_next_match_state", None)
+    return path
+
+
+def make_players(count, participating=True):
+    """p00, p01, ... の ID を持つプレイヤーを作成"""
+    return [
+        Player(id=f"p{i:02d}", name=f"プレイヤー{i}", created_at="2024-01-01T00:00:00",
+               is_participating_today=participating)
+        for i in range(count)
+    ]
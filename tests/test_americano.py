@@ -0,0 +1,44 @@
+from services.match_service import MatchService
+from services.player_service import PlayerService
+from utils.data_manager import DataManager
+from tests.conftest import make_players
+
+
+def generate_round(service, num_courts):
+    players = PlayerService().get_active_players()
+    matches = service.generate_matches(players, num_courts, num_courts, True, match_format="americano")
+    assert service.save_matches(matches, "americano")
+    return matches
+
+
+def pairs_of(matches):
+    return [frozenset(team) for m in matches for team in (m.team1_player_ids, m.team2_player_ids)]
+
+
+def test_rotation_continues_from_saved_position(data_file):
+    DataManager.save_data({"players": [p.to_dict() for p in make_players(8)], "matches": []})
+    service = MatchService()
+    
+    # コート数を変えながら1ラウンドずつ生成しても、同じペアは一巡するまで組まれない
+    pairs = []
+    for round_number, num_courts in enumerate([2, 1, 2, 2, 1, 2, 2]):
+        pairs += pairs_of(generate_round(service, num_courts))
+        rotation = DataManager.load_data()["session_data"]["americano_rotation"]
+        assert rotation["rounds_played"] == round_number + 1
+    assert len(pairs) == len(set(pairs))
+
+
+def test_roster_change_restarts_rotation(data_file):
+    DataManager.save_data({"players": [p.to_dict() for p in make_players(9)], "matches": []})
+    service = MatchService()
+    generate_round(service, 2)
+    generate_round(service, 2)
+    
+    assert PlayerService().set_resting_status("p08", True)
+    generate_round(service, 2)
+    rotation = DataManager.load_data()["session_data"]["americano_rotation"]
+    assert rotation == {"rounds_played": 1, "roster": [f"p{i:02d}" for i in range(8)]}
+    
+    # 試合をクリアすると最初から
+    assert service.clear_session_matches()
+    assert "americano_rotation" not in DataManager.load_data()["session_data"]
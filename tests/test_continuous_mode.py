@@ -0,0 +1,44 @@
+from services.match_service import MatchService
+from utils.data_manager import DataManager
+from tests.conftest import make_players
+
+
+def fresh_next_match(service, players, court_number, seed):
+    """共有の状態を使わずに集計し直した場合の次の試合（比較用）"""
+    saved = MatchService._next_match_state
+    MatchService._next_match_state = None
+    try:
+        return service.generate_next_match(players, court_number, True, seed=seed)
+    finally:
+        MatchService._next_match_state = saved
+
+
+def test_next_match_state_follows_results_without_recount(data_file):
+    players = make_players(10)
+    DataManager.save_data({"players": [p.to_dict() for p in players], "matches": []})
+    service = MatchService()
+    assert service.save_matches(service.fill_open_courts(players, 2, True, seed=1))
+    
+    state = None
+    for step in range(8):
+        match = next(m for m in service.get_all_matches() if not m.is_completed)
+        assert service.record_match_result(match.id, 21, 10 + step, players)
+        
+        # 結果を記録したコートにだけ次の試合が入る
+        expected = fresh_next_match(service, players, match.court_number, step)
+        next_match = service.generate_next_match(players, match.court_number, True, seed=step)
+        assert next_match is not None
+        assert (next_match.team1_player_ids, next_match.team2_player_ids, next_match.match_index) == \
+            (expected.team1_player_ids, expected.team2_player_ids, expected.match_index)
+        assert service.generate_next_match(players, 3 - match.court_number, True) is None
+        assert service.save_match(next_match)
+        
+        # 自分の保存は差分で反映され、全試合を集計し直していない
+        if state is not None:
+            assert MatchService._next_match_state is state
+        state = MatchService._next_match_state
+    
+    # 他の保存（試合の削除）を挟むと集計し直す
+    assert service.delete_match(next_match.id)
+    assert service.generate_next_match(players, next_match.court_number, True) is not None
+    assert MatchService._next_match_state is not state
@@ -0,0 +1,28 @@
+import json
+from utils.data_manager import DataManager
+
+
+def test_version_increases_with_every_save(data_file):
+    data = {"players": [], "matches": []}
+    versions = []
+    for _ in range(3):
+        # 同じ内容・同じサイズの保存でも版番号は変わる
+        assert DataManager.save_data(dict(data))
+        versions.append(DataManager.get_version())
+    assert versions == [1, 2, 3]
+
+
+def test_save_continues_from_stored_revision(data_file):
+    assert DataManager.save_data({"players": []})
+    stale = DataManager.load_data()
+    assert DataManager.save_data(DataManager.load_data())
+    # 古い読み込み結果を保存しても版番号は戻らず、保存した版が呼び出し側に返る
+    assert DataManager.save_data(stale)
+    assert stale["revision"] == DataManager.get_version() == 3
+
+
+def test_file_without_revision(data_file):
+    data_file.write_text(json.dumps({"players": [], "matches": []}), encoding="utf-8")
+    assert DataManager.get_version() == 0
+    assert DataManager.save_data(DataManager.load_data())
+    assert DataManager.get_version() == 1
@@ -0,0 +1,145 @@
+from services.match_service import MatchService
+from utils.data_manager import DataManager
+from utils.king_of_court import KingOfCourtEngine
+from tests.conftest import make_players
+
+
+def always_active(player_id):
+    return True
+
+
+def test_start_fills_courts_from_queue_in_order():
+    engine = KingOfCourtEngine()
+    assignments = engine.start([f"p{i}" for i in range(10)], 2)
+    assert assignments == [(1, ["p0", "p1"], ["p2", "p3"]), (2, ["p4", "p5"], ["p6", "p7"])]
+    assert list(engine.queue) == ["p8", "p9"]
+
+
+def test_winner_stays_and_loser_goes_to_back_of_queue():
+    engine = KingOfCourtEngine()
+    engine.start([f"p{i}" for i in range(10)], 2)
+    teams = engine.on_result(1, ["p0", "p1"], ["p2", "p3"], always_active)
+    assert teams == (["p0", "p1"], ["p8", "p9"])
+    assert list(engine.queue) == ["p2", "p3"]
+
+
+def test_winner_moves_up_to_challengers_of_court_above():
+    engine = KingOfCourtEngine(move_up=True)
+    engine.start([f"p{i}" for i in range(12)], 2)
+    teams = engine.on_result(2, ["p4", "p5"], ["p6", "p7"], always_active)
+    assert list(engine.challengers[1]) == [["p4", "p5"]]
+    assert teams == (["p8", "p9"], ["p10", "p11"])
+    assert list(engine.queue) == ["p6", "p7"]
+
+
+def test_court_borrows_backlog_from_neighbouring_court():
+    # 10人・2コート: コート2の勝者がコート1の挑戦者列に溜まり、待機列は2人だけになる
+    engine = KingOfCourtEngine(move_up=True)
+    engine.start([f"p{i:02d}" for i in range(10)], 2)
+    assert engine.on_result(2, ["p04", "p05"], ["p06", "p07"], always_active) == (
+        ["p08", "p09"], ["p06", "p07"]
+    )
+    teams = engine.on_result(2, ["p08", "p09"], ["p06", "p07"], always_active)
+    
+    # 待機列の2人と、コート1に上がるはずだったペアでコート2を埋める（コートは空かない）
+    assert teams == (["p06", "p07"], ["p04", "p05"])
+    assert list(engine.challengers[1]) == [["p08", "p09"]]
+    assert not engine.open_courts
+
+
+def test_no_court_left_idle_while_four_players_wait():
+    engine = KingOfCourtEngine(move_up=True)
+    engine.start([f"p{i:02d}" for i in range(10)], 2)
+    on_court = {1: (["p00", "p01"], ["p02", "p03"]), 2: (["p04", "p05"], ["p06", "p07"])}
+    for step in range(40):
+        court = 1 + step % 2
+        team1, team2 = on_court[court]
+        winners, losers = (team1, team2) if step % 3 else (team2, team1)
+        teams = engine.on_result(court, winners, losers, always_active)
+        assert teams is not None
+        on_court[court] = teams
+        waiting = len(engine.queue) + sum(2 * len(t) for t in engine.challengers.values())
+        assert waiting == 2
+        assert not engine.open_courts
+
+
+def test_release_match_returns_players_to_front_and_reopens_court():
+    engine = KingOfCourtEngine()
+    engine.start([f"p{i}" for i in range(10)], 2)
+    engine.release_match(2, ["p4", "p5"], ["p6", "p7"])
+    assert list(engine.queue) == ["p4", "p5", "p6", "p7", "p8", "p9"]
+    assert list(engine.open_courts) == [2]
+    assert engine.fill_open_courts(always_active) == [(2, ["p4", "p5"], ["p6", "p7"])]
+
+
+def test_revert_result_restores_queue():
+    engine = KingOfCourtEngine()
+    engine.start([f"p{i}" for i in range(10)], 2)
+    before = engine.to_dict()
+    teams = engine.on_result(1, ["p0", "p1"], ["p2", "p3"], always_active)
+    engine.revert_result(1, ["p0", "p1"], ["p2", "p3"], [(1, teams[0], teams[1])])
+    assert engine.to_dict() == before
+
+
+def _start_session(data_file, num_players=10, num_courts=2):
+    players = make_players(num_players)
+    DataManager.save_data({"players": [p.to_dict() for p in players], "matches": []})
+    service = MatchService()
+    matches = service.start_king_of_court(players, num_courts, seed=1)
+    assert len(matches) == num_courts
+    return service, players, matches
+
+
+def _incomplete(service):
+    return [m for m in service.get_all_matches() if not m.is_completed]
+
+
+def test_deleted_match_players_play_again(data_file):
+    service, players, matches = _start_session(data_file)
+    court2 = next(m for m in matches if m.court_number == 2)
+    
+    assert service.delete_match(court2.id)
+    refilled = service.fill_king_of_court_open_courts(players)
+    
+    assert len(refilled) == 1 and refilled[0].court_number == 2
+    assert set(refilled[0].team1_player_ids + refilled[0].team2_player_ids) == set(
+        court2.team1_player_ids + court2.team2_player_ids
+    )
+
+
+def test_reverting_result_removes_follow_up_match(data_file):
+    service, players, matches = _start_session(data_file)
+    court1 = next(m for m in matches if m.court_number == 1)
+    state_before = DataManager.load_data()["king_of_court"]
+    
+    assert service.record_match_result(court1.id, 21, 10, players)
+    assert len(_incomplete(service)) == 2
+    
+    # 結果の削除: 統計を戻してから未完了に戻して保存
+    match = service.get_match_by_id(court1.id)
+    service.revert_match_result(match, players)
+    match.team1_score = match.team2_score = 0
+    match.is_completed = False
+    match.completed_at = None
+    assert service.save_match(match, players)
+    
+    incomplete = _incomplete(service)
+    assert sorted(m.id for m in incomplete) == sorted(m.id for m in matches)
+    state_after = DataManager.load_data()["king_of_court"]
+    assert state_after["queue"] == state_before["queue"]
+    assert state_after["open_courts"] == []
+
+
+def test_editing_result_reapplies_new_winner(data_file):
+    service, players, matches = _start_session(data_file)
+    court1 = next(m for m in matches if m.court_number == 1)
+    assert service.record_match_result(court1.id, 21, 10, players)
+    
+    # 勝敗を逆にする修正: 前の結果で組んだ試合は取り消され、新しい勝者で組み直される
+    service.revert_match_result(service.get_match_by_id(court1.id), players)
+    assert service.record_match_result(court1.id, 10, 21, players)
+    
+    next_on_court1 = [m for m in _incomplete(service) if m.court_number == 1]
+    assert len(next_on_court1) == 1
+    assert next_on_court1[0].team1_player_ids == court1.team2_player_ids
+    assert len(_incomplete(service)) == 2
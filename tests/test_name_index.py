@@ -0,0 +1,69 @@
+from services.player_service import PlayerService
+from utils.data_manager import DataManager
+from utils.name_index import NameIndex, normalize_name
+import pytest
+
+
+def test_normalize_folds_width_case_kana_and_spaces():
+    assert normalize_name("ＴＡＮＡＫＡ　Taro") == "tanakataro"
+    assert normalize_name("タナカ") == normalize_name("たなか") == "たなか"
+    assert normalize_name("ﾀﾅｶ") == "たなか"  # 半角カナ
+    assert normalize_name("山田 太郎") == "山田太郎"
+
+
+def make_index():
+    return NameIndex([
+        ("1", "田中 太郎"), ("2", "タナカ ハナコ"), ("3", "たなべ"),
+        ("4", "Suzuki"), ("5", "中田"), ("6", "ＳＵＺＵＫＩ Ｊｒ"),
+    ])
+
+
+def test_find_exact_ignores_width_and_kana_differences():
+    index = make_index()
+    assert index.find_exact("たなかはなこ") == "2"
+    assert index.find_exact("suzuki") == "4"
+    assert index.find_exact("田中") is None
+
+
+def test_search_puts_prefix_matches_first_in_name_order():
+    index = make_index()
+    assert index.search("ﾀﾅ") == ["2", "3"]
+    assert index.search("suzuki") == ["4", "6"]
+    # 前方一致（田中太郎）の後に部分一致（中田 は「中」を含む）
+    assert index.search("中") == ["5", "1"]
+
+
+def test_search_infix_longer_than_gram_size():
+    index = make_index()
+    assert index.search("かはなこ") == ["2"]
+    assert index.search("zukijr") == ["6"]
+    assert index.search("zukix") == []
+
+
+def test_search_limit_and_include_filter():
+    index = make_index()
+    assert index.search("た", limit=1) == ["2"]
+    assert index.search("た", include=lambda pid: pid != "2") == ["3"]
+    assert index.search("  ") == []
+
+
+def test_remove_and_rename_update_every_lookup():
+    index = make_index()
+    index.remove("4")
+    assert index.find_exact("suzuki") is None
+    assert index.search("suz") == ["6"]
+    
+    index.add("3", "佐藤")
+    assert index.search("たなべ") == []
+    assert index.find_exact("佐藤") == "3"
+    assert len(index) == 5
+
+
+def test_create_player_rejects_folded_duplicate(data_file):
+    DataManager.save_data({"players": [], "matches": []})
+    service = PlayerService()
+    created = service.create_player("タナカ")
+    
+    with pytest.raises(ValueError):
+        service.create_player("ﾀﾅｶ")
+    assert service.search_players("たな") == [created.id]
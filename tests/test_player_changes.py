@@ -0,0 +1,19 @@
+from services.player_service import PlayerService
+from utils.data_manager import DataManager
+from tests.conftest import make_players
+
+
+def test_only_changed_fields_are_written(data_file):
+    DataManager.save_data({"players": [p.to_dict() for p in make_players(2)], "matches": []})
+    service = PlayerService()
+    stale = service.get_player_by_id("p00")
+    
+    # 別のセッションが休憩に切り替えた後、古い読み込み結果でスキルポイントだけを変更して保存
+    assert service.set_resting_status("p00", True)
+    stale.skill_points = 70.0
+    assert service.update_players([stale])
+    
+    saved = service.get_player_by_id("p00")
+    assert saved.skill_points == 70.0
+    assert saved.is_resting
+    assert not stale.is_dirty
@@ -0,0 +1,56 @@
+import random
+from utils.player_queue import FairPlayerQueue
+
+
+def make_queue(states):
+    queue = FairPlayerQueue(random.Random(0))
+    for player_id, (matches_played, last_match_index) in states.items():
+        queue.push(player_id, matches_played, last_match_index=last_match_index)
+    return queue
+
+
+def test_fewest_matches_first_then_longest_wait():
+    queue = make_queue({"a": (2, 1), "b": (1, 5), "c": (1, 2), "d": (0, 9)})
+    assert [queue.pop() for _ in range(4)] == ["d", "c", "b", "a"]
+    assert queue.pop() is None
+
+
+def test_player_who_sat_out_goes_before_player_who_just_played():
+    queue = make_queue({pid: (0, 0) for pid in "abcde"})
+    played = queue.pop_many(4)
+    sat_out = queue.pop()
+    queue.record_played(played, 1)
+    queue.requeue(sat_out)
+    queue.next_round()
+    
+    assert queue.pop() == sat_out
+    assert queue.rounds_sat_out(played[0]) == 0
+
+
+def test_everyone_plays_before_anyone_plays_twice():
+    queue = make_queue({f"p{i}": (0, 0) for i in range(10)})
+    counts = dict.fromkeys(queue._entries, 0)
+    for match_index in range(1, 11):
+        group = queue.pop_many(4)
+        for player_id in group:
+            counts[player_id] += 1
+        queue.record_played(group, match_index)
+        queue.next_round()
+        assert max(counts.values()) - min(counts.values()) <= 1
+
+
+def test_removed_player_is_skipped_and_requeue_keeps_priority():
+    queue = make_queue({"a": (0, 0), "b": (1, 0), "c": (2, 0)})
+    queue.remove("a")
+    assert "a" not in queue and len(queue) == 2
+    assert queue.peek() == "b"
+    
+    assert queue.pop() == "b"
+    queue.requeue("b")
+    assert queue.pop() == "b"
+
+
+def test_pop_many_takes_nobody_when_short():
+    queue = make_queue({"a": (0, 0), "b": (0, 0), "c": (0, 0)})
+    assert queue.pop_many(4) == []
+    assert len(queue) == 3
@@ -0,0 +1,127 @@
+import random
+from services.match_service import MatchService
+from services.player_service import PlayerService
+from utils.data_manager import DataManager
+from utils.ranking_index import RANKING_KEYS, RankingIndex
+from tests.conftest import make_players
+
+
+def full_sort(players, scope, kind):
+    """全員を並べ替えた順位（比較用）"""
+    key_func = RANKING_KEYS[(scope, kind)]
+    targets = [p for p in players if scope == "all" or p.is_participating_today]
+    return [p.id for p in sorted(targets, key=lambda p: (key_func(p), p.id))]
+
+
+def random_players(seed, count=30):
+    rng = random.Random(seed)
+    players = make_players(count)
+    for player in players:
+        player.skill_points = rng.choice([40.0, 50.0, 60.0, rng.uniform(0, 100)])
+        player.matches_played = rng.randint(0, 6)
+        player.wins = rng.randint(0, player.matches_played)
+        player.total_matches = player.matches_played + rng.randint(0, 10)
+        player.total_wins = player.wins + rng.randint(0, player.total_matches - player.matches_played)
+        player.is_participating_today = rng.random() < 0.7
+    return players
+
+
+def test_top_and_rank_match_full_sort_after_updates():
+    rng = random.Random(1)
+    players = random_players(1)
+    index = RankingIndex(players)
+    
+    for _ in range(200):
+        player = rng.choice(players)
+        player.skill_points += rng.uniform(-10, 10)
+        player.matches_played += 1
+        player.wins += rng.random() < 0.5
+        player.is_participating_today = rng.random() < 0.8
+        index.update(player)
+    
+    for scope, kind in RANKING_KEYS:
+        expected = full_sort(players, scope, kind)
+        assert [p.id for p in index.top(kind, scope)] == expected
+        assert [p.id for p in index.top(kind, scope, 5, 10)] == expected[5:10]
+        assert index.count(kind, scope) == len(expected)
+
+
+def test_rank_of_ties_and_absent_players():
+    players = make_players(4)
+    for player, skill in zip(players, [70.0, 50.0, 50.0, 30.0]):
+        player.skill_points = skill
+    players[3].is_participating_today = False
+    index = RankingIndex(players)
+    
+    assert [index.rank_of(p.id, "skill") for p in players[:3]] == [1, 2, 2]
+    assert index.rank_of("p03", "skill") is None
+    assert index.rank_of("p03", "skill", "all") == 4
+
+
+def test_ranking_follows_record_edit_and_delete_without_rebuild(data_file):
+    players = make_players(8)
+    DataManager.save_data({"players": [p.to_dict() for p in players], "matches": []})
+    match_service = MatchService()
+    player_service = PlayerService()
+    matches = match_service.generate_matches(players, 2, 2, True, seed=5)
+    match_service.save_matches(matches)
+    players = player_service.get_all_players()
+    assert player_service.get_ranking_count("winrate") == 8
+    index = PlayerService._ranking_index
+    
+    def check():
+        saved = player_service.get_all_players()
+        for scope, kind in RANKING_KEYS:
+            expected = full_sort(saved, scope, kind)
+            assert [p.id for p in player_service.get_ranking(kind, scope)] == expected
+            assert [p.id for p in player_service.get_ranking(kind, scope, 0, 3)] == expected[:3]
+        # 保存のたびに差分更新され、作り直されていない
+        assert PlayerService._ranking_index is index
+    
+    assert match_service.record_match_result(matches[0].id, 21, 10, players)
+    assert match_service.record_match_result(matches[1].id, 8, 21, players)
+    check()
+    
+    # 結果の修正（勝敗を逆に）
+    match_service.revert_match_result(match_service.get_match_by_id(matches[0].id), players)
+    assert match_service.record_match_result(matches[0].id, 10, 21, players)
+    check()
+    
+    # 結果の削除（未完了に戻す）
+    match = match_service.get_match_by_id(matches[1].id)
+    match_service.revert_match_result(match, players)
+    match.team1_score = match.team2_score = 0
+    match.is_completed = False
+    match.completed_at = None
+    assert match_service.save_match(match, players)
+    check()
+    # 勝者2人の次（勝率0%どうしは試合数の多い方が上）
+    loser = matches[0].team1_player_ids[0]
+    assert player_service.get_rank(loser, "winrate") == 3
+
+
+def test_non_ranking_writes_keep_index_and_stale_fields_are_not_restored(data_file):
+    players = make_players(8)
+    DataManager.save_data({"players": [p.to_dict() for p in players], "matches": []})
+    match_service = MatchService()
+    player_service = PlayerService()
+    matches = match_service.generate_matches(players, 2, 2, True, seed=7)
+    assert player_service.get_ranking_count("skill") == 8
+    index = PlayerService._ranking_index
+    
+    # 試合だけの保存・休憩・参加状態・番号の変更では作り直さない
+    match_service.save_matches(matches)
+    assert player_service.set_resting_status("p07", True)
+    assert player_service.set_participation_bulk(["p06"], False)
+    assert player_service.assign_player_numbers()
+    assert player_service.get_ranking_count("skill") == 7
+    assert PlayerService._ranking_index is index
+    
+    # 手元の古いオブジェクト（p06 は参加中のまま）で結果を記録しても、保存済みの参加状態が使われる
+    target = next(m for m in matches if "p06" in m.team1_player_ids + m.team2_player_ids)
+    assert match_service.record_match_result(target.id, 21, 15, players)
+    saved = player_service.get_all_players()
+    for scope, kind in RANKING_KEYS:
+        assert [p.id for p in player_service.get_ranking(kind, scope)] == full_sort(saved, scope, kind)
+    assert player_service.get_rank("p06", "skill") is None
+    assert PlayerService._ranking_index is index
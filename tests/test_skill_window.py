@@ -0,0 +1,52 @@
+import itertools
+from utils.skill_window import find_balanced_foursomes, window_team_gap
+from tests.conftest import make_players
+
+
+def players_with_skills(skills):
+    players = make_players(len(skills))
+    for player, skill in zip(players, skills):
+        player.skill_points = skill
+    return players
+
+
+def best_split_gap(group):
+    """4人の全チーム分けの中で最小のチーム平均差"""
+    gaps = []
+    for team1 in itertools.combinations(group, 2):
+        team2 = [p for p in group if p not in team1]
+        gaps.append(abs(sum(p.skill_points for p in team1) - sum(p.skill_points for p in team2)) / 2)
+    return min(gaps)
+
+
+def test_window_gap_matches_best_split():
+    group = players_with_skills([10, 20, 35, 70])
+    assert window_team_gap(group) == best_split_gap(group) == 12.5
+
+
+def test_groups_are_contiguous_in_skill_order():
+    players = players_with_skills([80, 10, 50, 20, 70, 30, 60, 40])
+    groups = find_balanced_foursomes(players, 2)
+    assert [[p.skill_points for p in g] for g in groups] == [[10, 20, 30, 40], [50, 60, 70, 80]]
+
+
+def test_skips_outlier_when_neighbouring_window_is_more_balanced():
+    players = players_with_skills([0, 48, 50, 52, 54])
+    groups = find_balanced_foursomes(players, 1)
+    assert [p.skill_points for p in groups[0]] == [48, 50, 52, 54]
+
+
+def test_required_players_are_always_included():
+    players = players_with_skills([0, 48, 50, 52, 54])
+    groups = find_balanced_foursomes(players, 1, required_ids={"p00"})
+    assert "p00" in {p.id for p in groups[0]}
+    
+    # 必須のプレイヤーが離れていて連続したウィンドウに収まらない場合
+    players = players_with_skills([0, 10, 20, 30, 40, 50, 60, 100])
+    groups = find_balanced_foursomes(players, 1, required_ids={"p00", "p07"})
+    assert {"p00", "p07"} <= {p.id for p in groups[0]}
+
+
+def test_not_enough_players():
+    assert find_balanced_foursomes(players_with_skills([1, 2, 3]), 1) == []
+    assert find_balanced_foursomes(players_with_skills([1, 2, 3, 4]), 0) == []
@@ -0,0 +1,88 @@
+import random
+import numpy as np
+import pytest
+from models.constraints import SchedulingConstraints
+from utils.match_generator import TournamentScheduler
+from utils.split_evaluator import BatchSplitEvaluator, INFEASIBLE_COST, SPLIT_PATTERNS
+from tests.conftest import make_players
+
+
+def random_setup(seed, num_players=10):
+    rng = random.Random(seed)
+    players = make_players(num_players)
+    for player in players:
+        player.skill_points = rng.uniform(0, 100)
+        player.gender = rng.choice(["M", "F"])
+    ids = [p.id for p in players]
+    pair_history = {}
+    for _ in range(20):
+        pair = tuple(sorted(rng.sample(ids, 2)))
+        pair_history[pair] = pair_history.get(pair, 0) + 1
+    quads = [rng.sample(range(num_players), 4) for _ in range(50)]
+    return players, pair_history, np.array(quads)
+
+
+def scalar_costs(scheduler, players, quad):
+    """TournamentScheduler._evaluate_team_split で3パターンを1つずつ評価"""
+    costs = []
+    for pattern in SPLIT_PATTERNS:
+        a, b, c, d = (players[quad[i]] for i in pattern)
+        costs.append(scheduler._evaluate_team_split([a, b], [c, d]))
+    return costs
+
+
+@pytest.mark.parametrize("skill_matching", [True, False])
+@pytest.mark.parametrize("constraints", [
+    None,
+    SchedulingConstraints(fixed_pairs=[["p00", "p01"]], avoid_pairs=[["p02", "p03"]], mixed_doubles=True),
+])
+def test_batch_costs_match_scalar_scorer(skill_matching, constraints):
+    for seed in range(5):
+        players, pair_history, quads = random_setup(seed)
+        scheduler = TournamentScheduler(players, skill_matching, seed=seed, constraints=constraints)
+        scheduler.pair_history = dict(pair_history)
+        evaluator = BatchSplitEvaluator(players, pair_history, skill_matching, constraints=constraints)
+        
+        batch = evaluator.pattern_costs(quads)
+        for k, quad in enumerate(quads):
+            for cost, expected in zip(batch[k], scalar_costs(scheduler, players, quad)):
+                if expected >= INFEASIBLE_COST:
+                    assert cost >= INFEASIBLE_COST
+                else:
+                    assert cost == pytest.approx(expected)
+
+
+def test_best_pattern_and_split_ids():
+    players = make_players(4)
+    for player, skill in zip(players, [10, 20, 30, 40]):
+        player.skill_points = skill
+    evaluator = BatchSplitEvaluator(players, {})
+    quads = evaluator.indices_for([players])
+    
+    patterns, costs = evaluator.evaluate(quads)
+    assert costs[0] == 0
+    assert evaluator.split_ids(quads[0], patterns[0]) == (["p00", "p03"], ["p01", "p02"])
+
+
+def test_record_match_updates_partner_history():
+    players = make_players(4)
+    for player in players:
+        player.skill_points = 50
+    evaluator = BatchSplitEvaluator(players, {}, skill_matching_enabled=False)
+    quads = evaluator.indices_for([players])
+    
+    evaluator.record_match(["p00", "p01"], ["p02", "p03"])
+    costs = evaluator.pattern_costs(quads)[0]
+    assert list(costs) == [2, 0, 0]
+
+
+def test_regroup_pair_keeps_fixed_pair_in_one_foursome():
+    players = make_players(8)
+    for i, player in enumerate(players):
+        player.skill_points = i * 10
+    constraints = SchedulingConstraints(fixed_pairs=[["p00", "p07"]])
+    evaluator = BatchSplitEvaluator(players, {}, constraints=constraints)
+    
+    first, second = evaluator.regroup_pair(players[:4], players[4:])
+    assert any({"p00", "p07"} <= {p.id for p in group} for group in (first, second))
+    assert sorted(p.id for p in first + second) == sorted(p.id for p in players)
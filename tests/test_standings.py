@@ -0,0 +1,82 @@
+from models.match import Match
+from services.match_service import MatchService
+from utils.data_manager import DataManager
+from utils.standings import StandingsIndex
+from tests.conftest import make_players
+
+
+def completed_match(team1, team2, score1, score2, match_index=1):
+    match = Match.create_new(match_index, 1, team1, team2)
+    match.complete_match(score1, score2)
+    return match
+
+
+def recomputed(matches):
+    """全試合を集計し直した順位表（比較用）"""
+    points = {}
+    for match in matches:
+        for player_id in match.team1_player_ids:
+            points[player_id] = points.get(player_id, 0) + match.team1_score
+        for player_id in match.team2_player_ids:
+            points[player_id] = points.get(player_id, 0) + match.team2_score
+    return sorted(points.items(), key=lambda item: (-item[1], item[0]))
+
+
+def test_add_match_keeps_ranked_order():
+    standings = StandingsIndex()
+    matches = [
+        completed_match(["a", "b"], ["c", "d"], 21, 15),
+        completed_match(["a", "c"], ["b", "e"], 10, 21, 2),
+    ]
+    for match in matches:
+        standings.add_match(match)
+    
+    assert list(zip(standings.ranked_ids(), (standings.points[p] for p in standings.ranked_ids()))) == \
+        recomputed(matches)
+    assert standings.ranked_ids()[0] == "b"
+
+
+def test_rank_of_gives_tied_players_the_same_rank():
+    standings = StandingsIndex()
+    standings.add_match(completed_match(["a", "b"], ["c", "d"], 21, 15))
+    assert standings.rank_of("a") == standings.rank_of("b") == 1
+    assert standings.rank_of("c") == 3
+    assert standings.rank_of("x") is None
+
+
+def test_revert_and_round_trip():
+    standings = StandingsIndex()
+    first = completed_match(["a", "b"], ["c", "d"], 21, 15)
+    second = completed_match(["a", "c"], ["b", "d"], 5, 21, 2)
+    standings.add_match(first)
+    standings.add_match(second)
+    standings.add_match(second, sign=-1)
+    
+    restored = StandingsIndex.from_dict(standings.to_dict())
+    assert restored.ranked_ids() == standings.ranked_ids()
+    assert restored.points == {"a": 21, "b": 21, "c": 15, "d": 15}
+
+
+def test_saved_standings_follow_record_edit_and_delete(data_file):
+    players = make_players(8)
+    DataManager.save_data({"players": [p.to_dict() for p in players], "matches": []})
+    service = MatchService()
+    matches = service.generate_matches(players, 2, 2, True, seed=3)
+    service.save_matches(matches)
+    
+    for match, (score1, score2) in zip(matches, [(21, 10), (15, 21)]):
+        assert service.record_match_result(match.id, score1, score2, players)
+    # 結果の修正
+    service.revert_match_result(service.get_match_by_id(matches[0].id), players)
+    assert service.record_match_result(matches[0].id, 11, 21, players)
+    # 完了済みの試合の削除
+    assert service.delete_match(matches[1].id)
+    
+    standings = service.get_standings()
+    expected = recomputed(service.get_completed_matches())
+    assert [(pid, standings.points[pid]) for pid in standings.ranked_ids() if standings.points[pid]] == \
+        [item for item in expected if item[1]]
+    
+    # 統計は完了した試合の分だけ（生成時の割り当て数は保存されない）
+    stored = DataManager.load_data()["players"]
+    assert [p["matches_played"] for p in stored] == [1] * 8
@@ -0,0 +1,105 @@
+import functools
+import time
+from typing import Any, Callable, List, Optional
+import pandas as pd
+import streamlit as st
+from streamlit import runtime
+from models.player import Player
+from models.match import Match
+from utils.data_manager import DataManager
+from utils.session_view import SessionView
+from utils.player_stats import build_player_stats
+from services.player_service import PlayerService
+from services.match_service import MatchService
+
+def version_cached(func: Callable[..., Any]) -> Callable[..., Any]:
+    """データファイルのバージョンをキーにした読み込みキャッシュ
+
+    func は先頭の引数にバージョンを受け取る。呼び出しのたびにバージョン（ファイル先頭の版番号のみ）を確認し、
+    どこかで保存が行われていれば次の呼び出しで読み直す。結果は st.cache_data により
+    ブラウザのセッションをまたいで共有され、呼び出し側には複製が返るため変更しても共有分には影響しない。
+    Streamlit の実行環境がない場合（ベンチマーク・先読みスレッドなど）はキャッシュせずに読み込む。
+    """
+    cached = st.cache_data(max_entries=4, show_spinner=False)(func)
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        version = DataManager.get_version()
+        if version is None or not runtime.exists():
+            return func(version, *args)
+        return cached(version, *args)
+    
+    return wrapper
+
+@version_cached
+def _load_players(version) -> List[Player]:
+    """全プレイヤーを読み込む"""
+    return PlayerService().get_all_players()
+
+@version_cached
+def _load_matches(version) -> List[Match]:
+    """全試合を読み込む"""
+    return MatchService().get_all_matches()
+
+@version_cached
+def _load_session_view(version) -> SessionView:
+    """プレイヤーと試合を1回の読み込みで表示用データにまとめる"""
+    return SessionView.from_data(DataManager.load_data())
+
+@version_cached
+def _load_player_stats(version) -> pd.DataFrame:
+    """完了済みの試合からプレイヤーごとの成績表を作る"""
+    data = DataManager.load_data()
+    player_name_map = {p.get("id"): p.get("name", "不明") for p in data.get("players", [])}
+    return build_player_stats(data.get("matches", []), player_name_map)
+
+def get_player_stats() -> pd.DataFrame:
+    """プレイヤーごとの成績表を取得（キャッシュ経由。勝率の高い順）"""
+    return _load_player_stats()
+
+def get_session_view() -> SessionView:
+    """描画1回分の表示用データを取得（キャッシュ経由）"""
+    return _load_session_view()
+
+def get_all_players() -> List[Player]:
+    """すべてのプレイヤーを取得（キャッシュ経由）"""
+    return _load_players()
+
+def get_participating_players() -> List[Player]:
+    """本日参加中のプレイヤーを取得（キャッシュ経由）"""
+    return [p for p in _load_players() if p.is_participating_today]
+
+def get_active_players() -> List[Player]:
+    """参加中かつ非休憩のプレイヤーを取得（キャッシュ経由）"""
+    return [p for p in _load_players() if p.is_participating_today and not p.is_resting]
+
+def get_all_matches() -> List[Match]:
+    """すべての試合を取得（キャッシュ経由）"""
+    return _load_matches()
+
+def get_current_session_matches() -> List[Match]:
+    """現在のセッションの試合を取得（キャッシュ経由）"""
+    return _load_matches()
+
+def get_player_by_id(player_id: str) -> Optional[Player]:
+    """IDでプレイヤーを取得（キャッシュ経由）"""
+    return next((p for p in _load_players() if p.id == player_id), None)
+
+# 画面全体を最後に描画したときのデータファイルのバージョン
+RENDERED_VERSION_KEY = "rendered_data_version"
+
+def remember_rendered_version():
+    """画面全体を描画し直すので、描画に使うデータのバージョンを記録"""
+    st.session_state[RENDERED_VERSION_KEY] = DataManager.get_version()
+
+def views_outdated(delay_sec: float) -> bool:
+    """最後に画面全体を描画した後にデータが保存され、その保存から delay_sec 以上経っていれば True
+
+    バージョンはデータファイル（全セッションで共有）から取るため、他の端末での保存も検出する。
+    確認は版番号の読み出しのみで、データが変わっていなければ何も読み込まない。
+    """
+    version = DataManager.get_version()
+    if version is None or version == st.session_state.get(RENDERED_VERSION_KEY):
+        return False
+    saved_at = DataManager.get_modified_time_ns()
+    return saved_at is None or time.time_ns() - saved_at >= delay_sec * 1_000_000_000
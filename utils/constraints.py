@@ -0,0 +1,112 @@
+import numpy as np
+from typing import List, Optional, Tuple
+from models.player import Player
+from models.constraints import SchedulingConstraints
+
+class CompiledConstraints:
+    """組み合わせ条件をプレイヤーの密なインデックス上のビットセットに変換したもの
+
+    各プレイヤーについて「ペアにできない相手」のビットマスクと固定ペアの相手を持つため、
+    探索中の判定はすべて O(1) のビット演算で済む。
+    """
+
+    def __init__(self, constraints: Optional[SchedulingConstraints], players: List[Player]):
+        constraints = constraints or SchedulingConstraints()
+        self.player_ids = [p.id for p in players]
+        self.index = {player_id: i for i, player_id in enumerate(self.player_ids)}
+        n = len(players)
+        
+        # 固定ペアの相手（いない場合は -1）
+        self.partner_of: List[int] = [-1] * n
+        # ペアにできない相手のビットマスク
+        self.forbidden_masks: List[int] = [0] * n
+        
+        for pair in constraints.fixed_pairs:
+            indices = self._indices(pair)
+            if indices:
+                a, b = indices
+                self.partner_of[a] = b
+                self.partner_of[b] = a
+        
+        for pair in constraints.avoid_pairs:
+            indices = self._indices(pair)
+            if indices:
+                a, b = indices
+                self.forbidden_masks[a] |= 1 << b
+                self.forbidden_masks[b] |= 1 << a
+        
+        if constraints.mixed_doubles:
+            # 同性どうしはペアにしない（性別未設定のプレイヤーは誰とでも組める）
+            for gender in ("M", "F"):
+                mask = 0
+                for i, player in enumerate(players):
+                    if player.gender == gender:
+                        mask |= 1 << i
+                for i, player in enumerate(players):
+                    if player.gender == gender:
+                        self.forbidden_masks[i] |= mask & ~(1 << i)
+        
+        if constraints.separate_groups:
+            group_masks = {}
+            for i, player in enumerate(players):
+                if player.group_tag:
+                    group_masks[player.group_tag] = group_masks.get(player.group_tag, 0) | (1 << i)
+            for i, player in enumerate(players):
+                if player.group_tag:
+                    self.forbidden_masks[i] |= group_masks[player.group_tag] & ~(1 << i)
+        
+        self.is_active = (any(p >= 0 for p in self.partner_of) or
+                          any(mask for mask in self.forbidden_masks))
+
+    def _indices(self, pair: List[str]) -> Optional[Tuple[int, int]]:
+        """IDの組をインデックスの組に変換（対象外のプレイヤーを含む場合は None）"""
+        if len(pair) != 2:
+            return None
+        a = self.index.get(pair[0])
+        b = self.index.get(pair[1])
+        if a is None or b is None or a == b:
+            return None
+        return a, b
+
+    def fixed_partner_id(self, player_id: str) -> Optional[str]:
+        """固定ペアの相手のIDを取得"""
+        i = self.index.get(player_id)
+        if i is None or self.partner_of[i] < 0:
+            return None
+        return self.player_ids[self.partner_of[i]]
+
+    def can_partner(self, a: int, b: int) -> bool:
+        """2人がペアになれるか"""
+        return not (self.forbidden_masks[a] >> b) & 1
+
+    def split_allowed(self, a: int, b: int, c: int, d: int) -> bool:
+        """チーム (a, b) vs (c, d) が条件を満たすか"""
+        if not self.is_active:
+            return True
+        if not self.can_partner(a, b) or not self.can_partner(c, d):
+            return False
+        
+        # 固定ペアが同じ試合にいる場合は同じチームでなければならない
+        quad_mask = (1 << a) | (1 << b) | (1 << c) | (1 << d)
+        for player, teammate in ((a, b), (b, a), (c, d), (d, c)):
+            partner = self.partner_of[player]
+            if partner >= 0 and (quad_mask >> partner) & 1 and partner != teammate:
+                return False
+        return True
+
+    def forbidden_matrix(self) -> np.ndarray:
+        """ペアにできない組み合わせの (n, n) 真偽値行列（一括評価用）"""
+        n = len(self.forbidden_masks)
+        matrix = np.zeros((n, n), dtype=bool)
+        for a, mask in enumerate(self.forbidden_masks):
+            b = 0
+            while mask:
+                if mask & 1:
+                    matrix[a, b] = True
+                mask >>= 1
+                b += 1
+        return matrix
+
+    def partner_array(self) -> np.ndarray:
+        """固定ペアの相手のインデックス配列（一括評価用、いない場合は -1）"""
+        return np.array(self.partner_of, dtype=int)
@@ -1,11 +1,24 @@
 import json
 import os
+import re
 import tempfile
 import shutil
-from typing import Dict, Any
-from config.settings import DATA_FILE_PATH
+import threading
+from typing import Dict, Any, Optional, Tuple
+from config.settings import DATA_FILE_PATH, COMPACT_DATA_FILE_THRESHOLD
+
+# データファイルの先頭に書き込む版番号（保存のたびに1ずつ増える）
+REVISION_KEY = "revision"
+# プレイヤーのレコードを最後に変更した保存の版番号（試合だけの保存では変わらない）
+PLAYERS_REVISION_KEY = "players_revision"
+# 版番号はファイルの先頭に置くため、先頭の数バイトだけを読めば取り出せる
+_REVISION_PATTERN = re.compile(rb'^\{\s*"revision":\s*(\d+)(?:,\s*"players_revision":\s*(\d+))?')
+_REVISION_HEAD_BYTES = 128
 
 class DataManager:
+    # 版番号の読み出しから置き換えまでを直列にし、同じ番号が2回使われないようにする
+    _save_lock = threading.Lock()
+
     @staticmethod
     def load_data() -> Dict[str, Any]:
         """データファイルを読み込む。ファイルが存在しない場合は空のデータ構造を返す"""
@@ -69,24 +82,41 @@ class DataManager:
             if data_dir:  # パスにディレクトリが含まれている場合のみ
                 os.makedirs(data_dir, exist_ok=True)
             
-            # 一時ファイルに書き込み
-            temp_dir = data_dir if data_dir else '.'
-            with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', 
-                                           dir=temp_dir, 
-                                           delete=False) as temp_file:
-                json.dump(data, temp_file, ensure_ascii=False, indent=2)
-                temp_filename = temp_file.name
+            # 大量データはインデントなしで書き出す（C実装のエンコーダが使われ高速）
+            record_count = len(data.get("players", [])) + len(data.get("matches", []))
+            indent = None if record_count > COMPACT_DATA_FILE_THRESHOLD else 2
             
-            # バックアップを作成（既存ファイルがある場合）
-            if os.path.exists(DATA_FILE_PATH):
-                backup_file = DATA_FILE_PATH + ".backup"
-                try:
-                    shutil.copy2(DATA_FILE_PATH, backup_file)
-                except Exception as backup_error:
-                    print(f"バックアップ作成に失敗: {backup_error}")
+            with DataManager._save_lock:
+                # 版番号は保存済みのファイルの続きから（読み込み後に他の保存を挟んでも重複しない）
+                revision = (DataManager.get_version() or 0) + 1
+                # プレイヤーを変更した保存（版番号を外したデータ）はこの保存の版番号を付ける
+                players_revision = data.get(PLAYERS_REVISION_KEY) or revision
+                content = {REVISION_KEY: revision, PLAYERS_REVISION_KEY: players_revision,
+                           **{key: value for key, value in data.items()
+                              if key not in (REVISION_KEY, PLAYERS_REVISION_KEY)}}
+                
+                # 一時ファイルに書き込み
+                temp_dir = data_dir if data_dir else '.'
+                with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', 
+                                               dir=temp_dir, 
+                                               delete=False) as temp_file:
+                    temp_file.write(json.dumps(content, ensure_ascii=False, indent=indent))
+                    temp_filename = temp_file.name
+                
+                # バックアップを作成（既存ファイルがある場合）
+                if os.path.exists(DATA_FILE_PATH):
+                    backup_file = DATA_FILE_PATH + ".backup"
+                    try:
+                        shutil.copy2(DATA_FILE_PATH, backup_file)
+                    except Exception as backup_error:
+                        print(f"バックアップ作成に失敗: {backup_error}")
+                
+                # 一時ファイルを本ファイルに移動（アトミック操作）
+                shutil.move(temp_filename, DATA_FILE_PATH)
             
-            # 一時ファイルを本ファイルに移動（アトミック操作）
-            shutil.move(temp_filename, DATA_FILE_PATH)
+            # 呼び出し側が保存した版を参照できるようにする
+            data[REVISION_KEY] = revision
+            data[PLAYERS_REVISION_KEY] = players_revision
             print(f"データを正常に保存しました: {DATA_FILE_PATH}")
             return True
             
@@ -112,6 +142,51 @@ class DataManager:
                 pass
             return False
 
+    @staticmethod
+    def get_version() -> Optional[int]:
+        """データファイルのバージョン（保存のたびに増える版番号）を取得。ファイルがない場合は None
+
+        ファイルの先頭だけを読むため、データ量に関係なく軽い。
+        版番号のない古いファイルは 0（次の保存から番号が付く）。
+        """
+        header = DataManager._read_header()
+        return header[0] if header else None
+
+    @staticmethod
+    def get_players_version() -> Optional[int]:
+        """プレイヤーのレコードのバージョンを取得。ファイルがない場合は None
+
+        試合・組み合わせ条件などだけの保存では変わらないため、プレイヤーだけから作る索引の鍵に使う。
+        """
+        header = DataManager._read_header()
+        return header[1] if header else None
+
+    @staticmethod
+    def mark_players_changed(data: Dict[str, Any]):
+        """読み込み済みのデータのプレイヤーを変更したことを記録（保存時に新しい版番号が付く）"""
+        data.pop(PLAYERS_REVISION_KEY, None)
+
+    @staticmethod
+    def _read_header() -> Optional[Tuple[int, int]]:
+        """ファイル先頭の (版番号, プレイヤーの版番号)。ファイルがない場合は None"""
+        try:
+            with open(DATA_FILE_PATH, 'rb') as f:
+                head = f.read(_REVISION_HEAD_BYTES)
+        except OSError:
+            return None
+        match = _REVISION_PATTERN.match(head)
+        if not match:
+            return (0, 0)
+        return (int(match.group(1)), int(match.group(2) or 0))
+
+    @staticmethod
+    def get_modified_time_ns() -> Optional[int]:
+        """データファイルを最後に保存した時刻（ナノ秒）。ファイルがない場合は None"""
+        try:
+            return os.stat(DATA_FILE_PATH).st_mtime_ns
+        except OSError:
+            return None
+
     @staticmethod
     def backup_data() -> bool:
         """現在のデータファイルのバックアップを作成"""
@@ -0,0 +1,210 @@
+import heapq
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from models.player import Player
+from models.match import Match
+from utils.match_generator import TournamentScheduler
+from utils.schedule_metrics import assign_rounds
+from utils.standings import StandingsIndex
+
+class AmericanoScheduler(TournamentScheduler):
+    """アメリカーノ（固定ローテーション）
+
+    円順列方式（1人を固定し残りを回転）でラウンドごとのペアを決め、
+    参加者全員が一巡するまで同じペアが組まれないようにする。
+    隣り合うペアどうしが対戦し、コートに入りきらないペアはそのラウンドを休む。
+    ペアはローテーションで決まるため、組み合わせ条件（固定ペア・ミックスダブルスなど）には対応しない。
+    ローテーションの位置と名簿はセッションデータに保存したもの（rotation）から続け、
+    参加・休憩の変更で名簿が変わった場合は新しい名簿で最初のラウンドからやり直す。
+    """
+
+    RANDOMIZED = False
+    SUPPORTS_CONSTRAINTS = False
+
+    def __init__(self, players: List[Player], *args,
+                 rotation: Optional[Dict[str, Any]] = None, **kwargs):
+        super().__init__(players, *args, **kwargs)
+        rotation = rotation or {}
+        # これまでに行ったラウンド数（ローテーションの位置）と、そのときの名簿（プレイヤーIDの並び）
+        self.rounds_played = rotation.get("rounds_played", 0)
+        self.rotation_roster: List[str] = list(rotation.get("roster", []))
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """ローテーションの位置も含めて退避"""
+        return {**super().snapshot_state(), "rounds_played": self.rounds_played,
+                "rotation_roster": list(self.rotation_roster)}
+
+    def restore_state(self, state: Dict[str, Any]):
+        """ローテーションの位置も含めて戻す"""
+        super().restore_state(state)
+        self.rounds_played = state["rounds_played"]
+        self.rotation_roster = list(state["rotation_roster"])
+
+    @staticmethod
+    def roster_order(players: Iterable[Player]) -> List[Player]:
+        """ローテーションの名簿（出場できる参加者を番号順、未設定はID順に固定）"""
+        return sorted(
+            (p for p in players if p.is_participating_today and not p.is_resting),
+            key=lambda p: (p.player_number is None, p.player_number or 0, p.id)
+        )
+
+    @staticmethod
+    def advance_rotation(rotation: Optional[Dict[str, Any]], roster_ids: List[str],
+                         matches: List[Match]) -> Dict[str, Any]:
+        """保存する試合の分だけ進めたローテーションの状態（保存用）
+
+        名簿が保存済みのものと違う場合は、生成時と同じく最初のラウンドから数える。
+        """
+        rotation = rotation or {}
+        rounds_played = rotation.get("rounds_played", 0) if rotation.get("roster") == roster_ids else 0
+        ordered = sorted(matches, key=lambda m: m.match_index)
+        rounds = assign_rounds(np.array([m.court_number for m in ordered], dtype=int))
+        if len(rounds):
+            rounds_played += int(rounds.max()) + 1
+        return {"rounds_played": rounds_played, "roster": list(roster_ids)}
+
+    def generate_matches(self, num_matches: int, num_courts: int) -> List[Match]:
+        """ローテーションに従って試合を生成（複数ラウンドをまとめて生成できる）"""
+        if self.compiled_constraints.is_active:
+            print("アメリカーノは組み合わせ条件に対応していないため、試合を生成できません。")
+            return []
+        
+        roster = self.roster_order(self.players)
+        if len(roster) < 4:
+            return []
+        
+        # 名簿が変わるとペアの組み方が変わるため、ローテーションを最初からやり直す
+        roster_ids = [p.id for p in roster]
+        if roster_ids != self.rotation_roster:
+            if self.rotation_roster:
+                print("参加者が変わったため、アメリカーノのローテーションを最初からやり直します。")
+            self.rounds_played = 0
+            self.rotation_roster = roster_ids
+        
+        slots: List[Optional[Player]] = list(roster)
+        if len(slots) % 2 == 1:
+            slots.append(None)  # 奇数の場合は休み枠
+        n = len(slots)
+        
+        matches = []
+        match_index = max(self.last_match_index.values(), default=0) + 1
+        while len(matches) < num_matches:
+            # 先頭を固定し、残りを rounds_played だけ回転
+            shift = self.rounds_played % (n - 1)
+            others = slots[1:]
+            rotated = [slots[0]] + others[len(others) - shift:] + others[:len(others) - shift]
+            pairs = [(rotated[i], rotated[n - 1 - i]) for i in range(n // 2)]
+            pairs = [pair for pair in pairs if pair[0] is not None and pair[1] is not None]
+            
+            # 休むペアがラウンドごとに入れ替わるよう開始位置をずらす
+            start = self.rounds_played % len(pairs)
+            pairs = pairs[start:] + pairs[:start]
+            
+            round_matches = min(num_courts, len(pairs) // 2, num_matches - len(matches))
+            if round_matches == 0:
+                break
+            for court_index in range(round_matches):
+                matches.append(self._create_match(
+                    match_index, court_index + 1, pairs[court_index * 2], pairs[court_index * 2 + 1]
+                ))
+                match_index += 1
+            self.rounds_played += 1
+        
+        return matches
+
+    def _create_match(self, match_index: int, court_number: int,
+                      team1: Sequence[Player], team2: Sequence[Player]) -> Match:
+        """試合を作成し、試合数・待ち時間とペア履歴を更新"""
+        team1_ids = [p.id for p in team1]
+        team2_ids = [p.id for p in team2]
+        for player in list(team1) + list(team2):
+            self.assigned_counts[player.id] = self.assigned_counts.get(player.id, 0) + 1
+            self.last_match_index[player.id] = match_index
+        for pair in (tuple(sorted(team1_ids)), tuple(sorted(team2_ids))):
+            self.pair_history[pair] = self.pair_history.get(pair, 0) + 1
+        return Match.create_new(
+            match_index=match_index,
+            court_number=court_number,
+            team1_player_ids=team1_ids,
+            team2_player_ids=team2_ids
+        )
+
+class MexicanoScheduler(AmericanoScheduler):
+    """メキシカーノ（順位に基づく組み合わせ）
+
+    個人ポイント（自チームの得点の合計）の順位表から、上位から4人ずつを同じコートに入れ、
+    1位と4位 vs 2位と3位 で対戦させる。次のラウンドは結果次第のため、1回の生成は1ラウンドまで。
+    順位表は結果記録のたびに差分更新されたものを受け取り、ここでは並べ替えも試合の再集計もしない。
+    組み合わせ条件を満たすチーム分けがない4人組は、そのラウンドを見送る。
+    """
+    
+    RANDOMIZED = True  # 出場者の選定で同順位を乱数で並べる
+    SUPPORTS_CONSTRAINTS = True
+    
+    # 4人組（順位順）のチーム分け候補。先頭ほど優先（1位&4位 vs 2位&3位 が基本）
+    SPLIT_PREFERENCE = [((0, 3), (1, 2)), ((0, 2), (1, 3)), ((0, 1), (2, 3))]
+
+    def __init__(self, players: List[Player], *args,
+                 standings: Optional[StandingsIndex] = None, **kwargs):
+        super().__init__(players, *args, **kwargs)
+        self.standings = standings if standings is not None else StandingsIndex()
+
+    def generate_matches(self, num_matches: int, num_courts: int) -> List[Match]:
+        """現在の順位から次の1ラウンドを生成"""
+        available_players = [p for p in self.players
+                             if p.is_participating_today and not p.is_resting]
+        num_groups = min(num_courts, num_matches, len(available_players) // 4)
+        if num_groups == 0:
+            return []
+        
+        # 出場者は試合数が少なく、長く待っている順（休みが偏らないように）
+        selected = heapq.nsmallest(
+            num_groups * 4, available_players,
+            key=lambda p: (self.assigned_counts.get(p.id, 0), self.last_match_index.get(p.id, 0),
+                           self.rng.random())
+        )
+        
+        # 順位表の並びから出場者を取り出す（未登録のプレイヤーは0ポイントとして加える）
+        for player in selected:
+            if player.id not in self.standings.points:
+                self.standings.add(player.id, 0)
+        selected_map = {p.id: p for p in selected}
+        ordered = [selected_map[pid] for pid in self.standings.ranked_ids() if pid in selected_map]
+        
+        matches = []
+        match_index = max(self.last_match_index.values(), default=0) + 1
+        for group_index in range(num_groups):
+            group = ordered[group_index * 4:group_index * 4 + 4]
+            split = self._split_group(group)
+            if split is None:
+                continue  # 条件を満たすチーム分けがない
+            matches.append(self._create_match(match_index, len(matches) + 1, *split))
+            match_index += 1
+        if matches:
+            self.rounds_played += 1
+        
+        return matches
+
+    def _split_group(self, group: List[Player]):
+        """順位順の4人を、同じペアの繰り返しを避けつつ 1位&4位 vs 2位&3位 を基本に分ける
+
+        組み合わせ条件を満たす分け方だけを候補にし、1つもなければ None を返す。
+        """
+        def repeats(split):
+            return sum(self.pair_history.get(tuple(sorted((group[a].id, group[b].id))), 0)
+                       for a, b in split)
+        
+        splits = [([group[i] for i in team1], [group[i] for i in team2])
+                  for team1, team2 in self.SPLIT_PREFERENCE]
+        allowed = [k for k, (team1, team2) in enumerate(splits) if self._split_allowed(team1, team2)]
+        if not allowed:
+            return None
+        best = min(allowed, key=lambda k: repeats(self.SPLIT_PREFERENCE[k]))
+        return splits[best]
+
+# 試合形式 -> スケジューラ（キング・オブ・ザ・コートは結果ごとに進めるため一括生成の対象外）
+FORMAT_SCHEDULERS = {
+    "open": TournamentScheduler,
+    "americano": AmericanoScheduler,
+    "mexicano": MexicanoScheduler,
+}
@@ -0,0 +1,183 @@
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+Team = List[str]
+
+class KingOfCourtEngine:
+    """キング・オブ・ザ・コート（チャレンジコート）の進行管理
+
+    コート1が最上位。結果が入るたびに:
+      - 勝ったペアはコートに残る（move_up=True の場合、コート2以下の勝者は1つ上のコートの挑戦者列へ）
+      - 負けたペアは待機列（FIFO）の最後尾へ
+      - 空いた枠は、そのコートの挑戦者列 → 待機列の先頭2人 → 近いコートの挑戦者列 の順で埋める
+        （挑戦者が上のコートに溜まったまま下のコートが空くことはない）
+    操作はすべて deque の両端への出し入れで、結果1件あたり O(コート数)。
+    """
+
+    def __init__(self, queue: Optional[List[str]] = None,
+                 challengers: Optional[Dict[int, List[Team]]] = None,
+                 move_up: bool = True, members: Optional[List[str]] = None,
+                 open_courts: Optional[List[int]] = None):
+        self.queue: Deque[str] = deque(queue or [])
+        self.challengers: Dict[int, Deque[Team]] = {
+            int(court): deque(teams) for court, teams in (challengers or {}).items()
+        }
+        self.move_up = move_up
+        # 進行に参加しているプレイヤー（待機列・挑戦者列・コート上）
+        self.members: Set[str] = set(members or []) | set(self.queue)
+        # 出場できるプレイヤーが足りず空いているコート（空いた順）
+        self.open_courts: Deque[int] = deque(open_courts or [])
+
+    def start(self, player_ids: List[str], num_courts: int) -> List[Tuple[int, Team, Team]]:
+        """待機列を作り、各コートの最初の対戦を決める"""
+        self.queue = deque(player_ids)
+        self.challengers = {}
+        self.members = set(player_ids)
+        self.open_courts = deque()
+        assignments = []
+        for court_number in range(1, num_courts + 1):
+            teams = self.fill_court(court_number, lambda pid: True)
+            if teams:
+                assignments.append((court_number, teams[0], teams[1]))
+        return assignments
+
+    def on_result(self, court_number: int, winners: Team, losers: Team,
+                  is_active: Callable[[str], bool]) -> Optional[Tuple[Team, Team]]:
+        """結果を反映し、そのコートの次の対戦を返す（組めない場合は None でコートは空く）"""
+        # 負けたペアは最後尾へ（引き分けは winners を空にして両ペアとも渡す）
+        self.queue.extend(losers)
+        
+        staying = None
+        if winners and all(is_active(pid) for pid in winners):
+            if court_number > 1 and self.move_up:
+                self.challengers.setdefault(court_number - 1, deque()).append(list(winners))
+            else:
+                staying = list(winners)
+        else:
+            self.queue.extend(winners)
+        
+        return self.fill_court(court_number, is_active, staying)
+
+    def fill_court(self, court_number: int, is_active: Callable[[str], bool],
+                   staying: Optional[Team] = None) -> Optional[Tuple[Team, Team]]:
+        """空いたコートに入る2チームを決める"""
+        teams = [staying] if staying else []
+        while len(teams) < 2:
+            team = (self._pop_challenger(court_number, is_active) or self._pop_pair(is_active)
+                    or self._pop_nearest_challenger(court_number, is_active))
+            if team is None:
+                break
+            teams.append(team)
+        
+        if len(teams) < 2:
+            # 組めなかったチームは列の先頭に戻し、コートは空きとして次の機会を待つ
+            self._return_to_front(*teams)
+            if court_number not in self.open_courts:
+                self.open_courts.append(court_number)
+            return None
+        return teams[0], teams[1]
+
+    def fill_open_courts(self, is_active: Callable[[str], bool]) -> List[Tuple[int, Team, Team]]:
+        """空いているコートを空いた順に埋める"""
+        assignments = []
+        for _ in range(len(self.open_courts)):
+            court_number = self.open_courts.popleft()
+            teams = self.fill_court(court_number, is_active)
+            if teams is None:
+                break  # 埋められなかったコートは fill_court が空きに戻している
+            assignments.append((court_number, teams[0], teams[1]))
+        return assignments
+
+    def add_player(self, player_id: str):
+        """途中参加・休憩明けのプレイヤーを待機列の最後尾に加える"""
+        if player_id not in self.members:
+            self.members.add(player_id)
+            self.queue.append(player_id)
+
+    def release_match(self, court_number: int, team1: Team, team2: Team):
+        """未完了の試合を取り消す: 4人を待機列の先頭に戻し、コートを空きにする"""
+        self.members.update(team1 + team2)
+        self._return_to_front(team1, team2)
+        if court_number not in self.open_courts:
+            self.open_courts.append(court_number)
+
+    def revert_result(self, court_number: int, team1: Team, team2: Team,
+                      follow_ups: List[Tuple[int, Team, Team]]):
+        """on_result で進めた待機列を戻す（結果が取り消され、試合が未完了に戻る）
+
+        follow_ups はその結果の後に組まれた未完了の試合（コート, チーム1, チーム2）で、呼び出し側が
+        取り消す。その出場者は組まれた順に待機列の先頭へ戻し、取り消した試合の4人は列から外す
+        （再びコート上にいるため）。
+        """
+        on_court = set(team1 + team2)
+        returned = [[pid for pid in team if pid not in on_court]
+                    for _, t1, t2 in follow_ups for team in (t1, t2)]
+        
+        self.queue = deque(pid for pid in self.queue if pid not in on_court)
+        for court, teams in self.challengers.items():
+            self.challengers[court] = deque(t for t in teams if not on_court.intersection(t))
+        self._return_to_front(*returned)
+        self.members.update(on_court)
+        
+        # 取り消した試合のコートは再び使用中、後続の試合があった他のコートは空きに戻る
+        for court, _, _ in follow_ups:
+            if court != court_number and court not in self.open_courts:
+                self.open_courts.append(court)
+        if court_number in self.open_courts:
+            self.open_courts.remove(court_number)
+
+    def _pop_challenger(self, court_number: int, is_active: Callable[[str], bool]) -> Optional[Team]:
+        """下のコートから上がってきたペアを取り出す"""
+        challengers = self.challengers.get(court_number)
+        while challengers:
+            team = challengers.popleft()
+            if all(is_active(pid) for pid in team):
+                return team
+            self.queue.extend(team)  # 休憩に入った場合はペアを解いて待機列へ
+        return None
+
+    def _pop_nearest_challenger(self, court_number: int,
+                                is_active: Callable[[str], bool]) -> Optional[Team]:
+        """待機列で足りない場合、近いコートの挑戦者列から1ペアを借りる"""
+        for court in sorted(self.challengers, key=lambda c: (abs(c - court_number), c)):
+            if court != court_number:
+                team = self._pop_challenger(court, is_active)
+                if team:
+                    return team
+        return None
+
+    def _pop_pair(self, is_active: Callable[[str], bool]) -> Optional[Team]:
+        """待機列の先頭から出場可能な2人を取り出す（休憩中・不参加の人は列から外す）"""
+        team = []
+        while self.queue and len(team) < 2:
+            player_id = self.queue.popleft()
+            if is_active(player_id):
+                team.append(player_id)
+            else:
+                self.members.discard(player_id)
+        if len(team) < 2:
+            self.queue.extendleft(reversed(team))
+            return None
+        return team
+
+    def _return_to_front(self, *teams: Optional[Team]):
+        """取り出したチームを待機列の先頭に戻す"""
+        for team in reversed([t for t in teams if t]):
+            self.queue.extendleft(reversed(team))
+
+    def to_dict(self) -> dict:
+        """辞書形式に変換"""
+        return {
+            "queue": list(self.queue),
+            "challengers": {str(court): [list(team) for team in teams]
+                            for court, teams in self.challengers.items() if teams},
+            "move_up": self.move_up,
+            "members": sorted(self.members),
+            "open_courts": list(self.open_courts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "KingOfCourtEngine":
+        """辞書から作成"""
+        return cls(data.get("queue", []), data.get("challengers", {}), data.get("move_up", True),
+                   data.get("members", []), data.get("open_courts", []))
@@ -0,0 +1,113 @@
+import itertools
+import numpy as np
+from typing import List, Dict, Tuple, Optional
+from models.match import Match
+
+# 重みがこの値を下回った組は保存しない（減衰した古い履歴を自然に忘れる）
+MIN_STORED_WEIGHT = 0.01
+
+class LeagueHistory:
+    """セッションをまたいだペア・対戦相手の履歴（指数減衰つき）
+
+    プレイヤーを密なインデックスに割り当て、ペア回数と対戦回数を (n, n) の対称行列で持つ。
+    セッションを閉じるたびに既存の重みへ減衰率を掛けてから今回の試合を加えるため、
+    更新コストは O(プレイヤー数² + 今回の試合数) で、過去の全試合を読み直す必要がない。
+    """
+
+    def __init__(self, decay: float, player_ids: Optional[List[str]] = None,
+                 partner: Optional[np.ndarray] = None, opponent: Optional[np.ndarray] = None,
+                 sessions: int = 0):
+        self.decay = decay
+        self.player_ids: List[str] = list(player_ids or [])
+        self.index = {player_id: i for i, player_id in enumerate(self.player_ids)}
+        n = len(self.player_ids)
+        self.partner = partner if partner is not None else np.zeros((n, n), dtype=float)
+        self.opponent = opponent if opponent is not None else np.zeros((n, n), dtype=float)
+        self.sessions = sessions
+
+    def _ensure_players(self, player_ids: List[str]):
+        """未登録のプレイヤーを行列に追加"""
+        new_ids = [pid for pid in dict.fromkeys(player_ids) if pid not in self.index]
+        if not new_ids:
+            return
+        for player_id in new_ids:
+            self.index[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+        n = len(self.player_ids)
+        old = self.partner.shape[0]
+        for name in ("partner", "opponent"):
+            grown = np.zeros((n, n), dtype=float)
+            grown[:old, :old] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def close_session(self, matches: List[Match]):
+        """セッションを閉じる: 既存の履歴を減衰させ、完了した試合を加える"""
+        completed = [m for m in matches if m.is_completed]
+        self._ensure_players([pid for m in completed
+                              for pid in m.team1_player_ids + m.team2_player_ids])
+        
+        # O(プレイヤー数²) の減衰
+        self.partner *= self.decay
+        self.opponent *= self.decay
+        
+        for match in completed:
+            team1 = [self.index[pid] for pid in match.team1_player_ids]
+            team2 = [self.index[pid] for pid in match.team2_player_ids]
+            for a, b in (team1, team2):
+                self.partner[a, b] += 1
+                self.partner[b, a] += 1
+            for a, b in itertools.product(team1, team2):
+                self.opponent[a, b] += 1
+                self.opponent[b, a] += 1
+        
+        self.sessions += 1
+
+    def _pair_weights(self, matrix: np.ndarray) -> Dict[Tuple[str, str], float]:
+        """行列の非ゼロ要素を (ID, ID) -> 重み の辞書に変換"""
+        rows, cols = np.nonzero(np.triu(matrix, k=1))
+        weights = {}
+        for a, b in zip(rows.tolist(), cols.tolist()):
+            key = tuple(sorted((self.player_ids[a], self.player_ids[b])))
+            weights[key] = float(matrix[a, b])
+        return weights
+
+    def partner_weights(self) -> Dict[Tuple[str, str], float]:
+        """ペア履歴の重み"""
+        return self._pair_weights(self.partner)
+
+    def opponent_weights(self) -> Dict[Tuple[str, str], float]:
+        """対戦相手履歴の重み"""
+        return self._pair_weights(self.opponent)
+
+    def to_dict(self) -> dict:
+        """辞書形式に変換（非ゼロの組だけを [i, j, ペア重み, 対戦重み] で保存）"""
+        partner = np.where(self.partner >= MIN_STORED_WEIGHT, self.partner, 0)
+        opponent = np.where(self.opponent >= MIN_STORED_WEIGHT, self.opponent, 0)
+        rows, cols = np.nonzero(np.triu(partner + opponent, k=1))
+        
+        # 履歴の残っているプレイヤーだけでインデックスを詰め直す
+        used = sorted(set(rows.tolist()) | set(cols.tolist()))
+        remap = {old: new for new, old in enumerate(used)}
+        entries = [
+            [remap[a], remap[b], round(float(partner[a, b]), 4), round(float(opponent[a, b]), 4)]
+            for a, b in zip(rows.tolist(), cols.tolist())
+        ]
+        return {
+            "decay": self.decay,
+            "sessions": self.sessions,
+            "player_ids": [self.player_ids[i] for i in used],
+            "entries": entries,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, default_decay: float) -> "LeagueHistory":
+        """辞書から作成"""
+        player_ids = data.get("player_ids", [])
+        n = len(player_ids)
+        partner = np.zeros((n, n), dtype=float)
+        opponent = np.zeros((n, n), dtype=float)
+        for a, b, partner_weight, opponent_weight in data.get("entries", []):
+            partner[a, b] = partner[b, a] = partner_weight
+            opponent[a, b] = opponent[b, a] = opponent_weight
+        return cls(data.get("decay", default_decay), player_ids, partner, opponent,
+                   data.get("sessions", 0))
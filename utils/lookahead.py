@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Hashable, Optional
+from utils.data_manager import DataManager
+
+class LookaheadPrecomputer:
+    """次のラウンドをバックグラウンドで先読み計算する
+
+    キーにはデータファイルのバージョンと生成条件を含める。結果記録や休憩の切り替えで
+    データが書き換わるとバージョンが変わり、古い先読みは使われなくなる。
+    ワーカーは1つだけで、新しいキーを受け付けると古い計算は破棄される。
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lookahead")
+        self._lock = threading.Lock()
+        self._key: Optional[Hashable] = None
+        self._future: Optional[Future] = None
+
+    def request(self, key: Hashable, compute: Callable[[], Any]):
+        """キーに対する先読みを開始（同じキーの計算が既にあれば何もしない）"""
+        with self._lock:
+            if self._key == key and self._future is not None:
+                return
+            if self._future is not None:
+                self._future.cancel()
+            self._key = key
+            self._future = self._executor.submit(self._run, key, compute)
+
+    def take(self, key: Hashable, timeout: Optional[float] = None) -> Optional[Any]:
+        """キーが一致する先読み結果を取り出す（計算中なら完了を待つ）。使えない場合は None"""
+        with self._lock:
+            if self._key != key or self._future is None:
+                return None
+            future = self._future
+            self._key = None
+            self._future = None
+        
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            print(f"先読み結果の取得エラー: {e}")
+            return None
+
+    @staticmethod
+    def _run(key: Hashable, compute: Callable[[], Any]) -> Optional[Any]:
+        """計算の前後でデータが変わっていないことを確認してから結果を返す"""
+        version = key[0] if isinstance(key, tuple) else key
+        if DataManager.get_version() != version:
+            return None
+        result = compute()
+        if DataManager.get_version() != version:
+            return None
+        return result
+
+_lookahead: Optional[LookaheadPrecomputer] = None
+_lookahead_lock = threading.Lock()
+
+def get_lookahead() -> LookaheadPrecomputer:
+    """プロセス内で共有する先読みワーカーを取得（同時に呼ばれても作るのは1つだけ）"""
+    global _lookahead
+    if _lookahead is None:
+        with _lookahead_lock:
+            if _lookahead is None:
+                _lookahead = LookaheadPrecomputer()
+    return _lookahead
@@ -1,19 +1,45 @@
 import random
+import heapq
 import itertools
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional, Set, Generator
 from models.player import Player
 from models.match import Match
+from models.constraints import SchedulingConstraints
+from utils.constraints import CompiledConstraints
+from utils.player_queue import FairPlayerQueue
+from utils.skill_window import find_balanced_foursomes
+from utils.split_evaluator import BatchSplitEvaluator, INFEASIBLE_COST
+from utils.schedule_metrics import compute_schedule_metrics, schedule_score
 
 class TournamentScheduler:
-    def __init__(self, players: List[Player], skill_matching_enabled: bool = True):
+    # 乱数によって結果が変わるか（変わらない形式では複数回の試行を省く）
+    RANDOMIZED = True
+    # 組み合わせ条件を守って生成できるか（対応しない形式は条件の設定中は生成しない）
+    SUPPORTS_CONSTRAINTS = True
+
+    def __init__(self, players: List[Player], skill_matching_enabled: bool = True,
+                 seed: Optional[int] = None, rng: Optional[random.Random] = None,
+                 constraints: Optional[SchedulingConstraints] = None):
         self.players = players
         self.skill_matching_enabled = skill_matching_enabled
+        # 組み合わせ条件（固定ペア・ペア禁止・ミックスダブルスなど）
+        self.constraints = constraints
+        self.compiled_constraints = CompiledConstraints(constraints, players)
+        # 乱数生成器（seed または rng を指定すると同じ組み合わせを再現できる）
+        self.rng = rng if rng is not None else random.Random(seed)
         # 過去のペア対戦記録（プレイヤーIDの組み合わせ -> 対戦回数）
         self.pair_history: Dict[Tuple[str, str], int] = {}
+        # 過去の対戦相手の記録（プレイヤーIDの組み合わせ -> 対戦回数）
+        self.opponent_history: Dict[Tuple[str, str], int] = {}
+        # 各プレイヤーが最後に出場した試合番号（待ち時間の判定に使用）
+        self.last_match_index: Dict[str, int] = {}
+        # 各プレイヤーに割り当てた試合数（進行中を含む。Player の統計とは別に管理する）
+        self.assigned_counts: Dict[str, int] = {p.id: p.matches_played for p in players}
 
     def update_pair_history(self, matches: List[Match]):
         """過去の試合からペア対戦履歴を更新"""
         self.pair_history.clear()
+        self.opponent_history.clear()
         for match in matches:
             if match.is_completed:
                 # チーム1のペア
@@ -24,6 +50,137 @@ class TournamentScheduler:
                 # ペア対戦回数を記録
                 self.pair_history[team1_pair] = self.pair_history.get(team1_pair, 0) + 1
                 self.pair_history[team2_pair] = self.pair_history.get(team2_pair, 0) + 1
+                
+                # 対戦相手の記録
+                for opponent_pair in itertools.product(match.team1_player_ids, match.team2_player_ids):
+                    key = tuple(sorted(opponent_pair))
+                    self.opponent_history[key] = self.opponent_history.get(key, 0) + 1
+
+    def add_league_history(self, partner_weights: Dict[Tuple[str, str], float],
+                           opponent_weights: Dict[Tuple[str, str], float]):
+        """過去セッションの減衰済みペア・対戦相手履歴を加える（リーグモード）
+
+        update_pair_history の後に呼ぶ。今回のセッションの試合は重み1、
+        過去のセッションは古いほど小さい重みで評価に効く。
+        """
+        for key, weight in partner_weights.items():
+            self.pair_history[key] = self.pair_history.get(key, 0) + weight
+        for key, weight in opponent_weights.items():
+            self.opponent_history[key] = self.opponent_history.get(key, 0) + weight
+
+    def sync_session_state(self, matches: List[Match]):
+        """セッション中の試合（進行中を含む）から各プレイヤーの割り当て試合数を反映
+
+        Player の試合数（完了した試合の統計）は変更しない。
+        """
+        self.assigned_counts = {p.id: 0 for p in self.players}
+        self.last_match_index.clear()
+        for match in matches:
+            for player_id in match.team1_player_ids + match.team2_player_ids:
+                self.assigned_counts[player_id] = self.assigned_counts.get(player_id, 0) + 1
+                self.last_match_index[player_id] = max(
+                    self.last_match_index.get(player_id, 0), match.match_index
+                )
+
+    def next_match(self, court_number: int, match_index: int,
+                   busy_player_ids: Optional[Set[str]] = None) -> Optional[Match]:
+        """空いたコート用に、現在の参加者プールから次の1試合を生成"""
+        busy_player_ids = busy_player_ids or set()
+        
+        # 参加中・非休憩・コート外のプレイヤーのみ（毎回最新の状態を参照）
+        available_players = [p for p in self.players
+                             if p.is_participating_today and not p.is_resting
+                             and p.id not in busy_player_ids]
+        
+        if len(available_players) < 4:
+            return None
+        
+        # 試合数が少なく、長く待っている4人を選択（同条件はランダム）: O(アクティブ人数)
+        priority = lambda p: (self.assigned_counts.get(p.id, 0), self.last_match_index.get(p.id, 0),
+                              self.rng.random())
+        if not self.compiled_constraints.is_active:
+            selected_players = heapq.nsmallest(4, available_players, key=priority)
+            team_split = self._optimize_team_split(selected_players)
+        else:
+            selected_players, team_split = self._select_feasible_match(available_players, priority)
+        if not team_split:
+            return None
+        
+        team1_ids = [p.id for p in team_split[0]]
+        team2_ids = [p.id for p in team_split[1]]
+        
+        match = Match.create_new(
+            match_index=match_index,
+            court_number=court_number,
+            team1_player_ids=team1_ids,
+            team2_player_ids=team2_ids
+        )
+        
+        # 割り当て済みとして試合数とペア履歴を更新（直後の同ペア再選出を避ける）
+        for player in selected_players:
+            self.assigned_counts[player.id] = self.assigned_counts.get(player.id, 0) + 1
+            self.last_match_index[player.id] = match_index
+        for pair in (tuple(sorted(team1_ids)), tuple(sorted(team2_ids))):
+            self.pair_history[pair] = self.pair_history.get(pair, 0) + 1
+        
+        return match
+
+    def _select_feasible_match(self, available_players: List[Player], priority
+                               ) -> Tuple[List[Player], Optional[Tuple[List[Player], List[Player]]]]:
+        """組み合わせ条件を満たす4人とチーム分割を優先度順に探す"""
+        available_map = {p.id: p for p in available_players}
+        
+        # 優先度の高い8人（固定ペアの相手は本人の直後に加える）から4人を選ぶ
+        candidates: List[Player] = []
+        for player in heapq.nsmallest(8, available_players, key=priority):
+            for candidate in (player, available_map.get(
+                    self.compiled_constraints.fixed_partner_id(player.id) or "")):
+                if candidate is not None and candidate not in candidates:
+                    candidates.append(candidate)
+        
+        # 固定ペアの片方だけを選ぶ組み合わせは、他に候補がない場合のみ使う
+        combinations = list(itertools.combinations(candidates[:8], 4))
+        for keep_pairs in (True, False):
+            for selected_players in combinations:
+                if keep_pairs and self._separates_fixed_pair(selected_players, available_map):
+                    continue
+                team_split = self._optimize_team_split(list(selected_players))
+                if team_split and self._evaluate_team_split(*team_split) < INFEASIBLE_COST:
+                    return list(selected_players), team_split
+        return [], None
+
+    def _separates_fixed_pair(self, selected_players, available_map: Dict[str, Player]) -> bool:
+        """出場可能な固定ペアの相手を残して片方だけを選んでいるか"""
+        selected_ids = {p.id for p in selected_players}
+        for player in selected_players:
+            partner_id = self.compiled_constraints.fixed_partner_id(player.id)
+            if partner_id in available_map and partner_id not in selected_ids:
+                return True
+        return False
+
+    def stream_matches(self, start_index: int = 1,
+                       players_on_court: Optional[Dict[int, List[str]]] = None
+                       ) -> Generator[Optional[Match], int, None]:
+        """コートが空くたびに次の試合を返すジェネレータ
+
+        最初に next() で起動し、以降は send(空いたコート番号) で次の試合を受け取る。
+        空いたコートにいたプレイヤーは待機プールに戻る。生成できない場合は None を返す。
+        """
+        on_court: Dict[int, List[str]] = dict(players_on_court or {})
+        match_index = start_index
+        
+        court_number = yield None
+        while True:
+            # 終了したコートのプレイヤーを待機プールに戻す
+            on_court.pop(court_number, None)
+            busy_player_ids = {pid for ids in on_court.values() for pid in ids}
+            
+            match = self.next_match(court_number, match_index, busy_player_ids)
+            if match:
+                on_court[court_number] = match.team1_player_ids + match.team2_player_ids
+                match_index += 1
+            
+            court_number = yield match
 
     def generate_matches(self, num_matches: int, num_courts: int) -> List[Match]:
         """指定された数の試合を生成"""
@@ -34,62 +191,224 @@ class TournamentScheduler:
         if len(available_players) < 4:
             return []  # プレイヤー不足
 
-        # 試合数でソート（少ない順）
-        available_players.sort(key=lambda p: p.matches_played)
+        player_map = {p.id: p for p in available_players}
+        
+        # 試合数・待ち時間で優先度付けしたキュー
+        queue = FairPlayerQueue(self.rng)
+        for player in available_players:
+            queue.push(player.id, self.assigned_counts.get(player.id, 0),
+                       last_match_index=self.last_match_index.get(player.id, 0))
+        
+        # チーム分割はラウンドごとにまとめて評価する
+        evaluator = BatchSplitEvaluator(available_players, self.pair_history,
+                                        self.skill_matching_enabled, self.opponent_history,
+                                        self.constraints)
+        constrained = evaluator.constraints.is_active
         
         matches = []
-        current_match_index = 1
+        # 試合番号は既存の試合の続きから（待ち時間の判定が既存の試合と比較できるように）
+        current_match_index = max(self.last_match_index.values(), default=0) + 1
         
-        for match_num in range(num_matches):
-            court_number = (match_num % num_courts) + 1
+        # 同時に進行する試合（1ラウンド）単位で割り当て、同じプレイヤーが重複しないようにする
+        while len(matches) < num_matches:
+            num_groups = min(num_courts, num_matches - len(matches), len(queue) // 4)
+            if num_groups == 0:
+                break  # プレイヤー不足で終了
             
-            # プレイヤー選定（試合数が少ない順に4人）
-            selected_players = self._select_players_for_match(available_players)
+            # プレイヤー選定（試合数が少なく、長く待っている順）
+            groups = self._select_players_for_round(queue, player_map, num_groups)
+            if constrained:
+                groups = self._keep_fixed_pairs_together(groups, queue, player_map, evaluator.constraints)
+            groups = self._reduce_rematches(groups, evaluator, queue.current_round)
+            if constrained:
+                # 条件違反を解消しやすいよう、組み合わせる相手をずらしてもう一度組み替える
+                groups = self._reduce_rematches(groups, evaluator, queue.current_round + 1)
             
-            if len(selected_players) < 4:
-                break  # プレイヤー不足で終了
+            # チーム分割の最適化（ラウンド内の全4人組を一括評価）
+            quads = evaluator.indices_for(groups)
+            best_patterns, best_costs = evaluator.evaluate(quads)
             
-            # チーム分割の最適化
-            team_split = self._optimize_team_split(selected_players)
+            # 条件を満たす分割がない4人組は見送り、プレイヤーをキューに戻す
+            feasible = [k for k in range(len(groups)) if best_costs[k] < INFEASIBLE_COST]
+            for k in range(len(groups)):
+                if best_costs[k] >= INFEASIBLE_COST:
+                    for player in groups[k]:
+                        queue.requeue(player.id)
+            if not feasible:
+                break  # 条件を満たす組み合わせが作れないため終了
             
-            if team_split:
-                team1_ids = [p.id for p in team_split[0]]
-                team2_ids = [p.id for p in team_split[1]]
+            for court_index, group_index in enumerate(feasible):
+                selected_players = groups[group_index]
+                team1_ids, team2_ids = evaluator.split_ids(quads[group_index], best_patterns[group_index])
                 
                 match = Match.create_new(
                     match_index=current_match_index,
-                    court_number=court_number,
+                    court_number=court_index + 1,
                     team1_player_ids=team1_ids,
                     team2_player_ids=team2_ids
                 )
                 matches.append(match)
-                current_match_index += 1
                 
-                # 選ばれたプレイヤーの試合数を更新
+                # 選ばれたプレイヤーの試合数・待ち時間とペア履歴を更新
+                queue.record_played(team1_ids + team2_ids, current_match_index)
+                evaluator.record_match(team1_ids, team2_ids)
+                for pair in (tuple(sorted(team1_ids)), tuple(sorted(team2_ids))):
+                    self.pair_history[pair] = self.pair_history.get(pair, 0) + 1
+                for opponent_pair in itertools.product(team1_ids, team2_ids):
+                    key = tuple(sorted(opponent_pair))
+                    self.opponent_history[key] = self.opponent_history.get(key, 0) + 1
                 for player in selected_players:
-                    player.matches_played += 1
+                    self.assigned_counts[player.id] = self.assigned_counts.get(player.id, 0) + 1
+                
+                current_match_index += 1
+            
+            queue.next_round()
         
         return matches
 
-    def _select_players_for_match(self, available_players: List[Player]) -> List[Player]:
-        """試合用のプレイヤーを選択"""
-        # 試合数が最も少ないプレイヤーから4人を選択
-        min_matches = min(p.matches_played for p in available_players)
-        candidates = [p for p in available_players if p.matches_played == min_matches]
+    def generate_alternatives(self, num_matches: int, num_courts: int, k: int = 3,
+                              attempts: Optional[int] = None) -> List[Tuple[List[Match], Dict[str, float]]]:
+        """評価の良い順に、互いに異なる組み合わせ案を最大 k 件生成
+
+        同じ初期状態（試合数・待ち時間・ペア履歴）から乱数だけを変えて attempts 回生成し、
+        重複を除いて品質指標の評価値（schedule_score）で並べる。
+        スケジューラの状態は呼び出し前に戻るため、採用した案は呼び出し側で保存する。
+        """
+        attempts = attempts or k * 3
+        available_players = [p for p in self.players
+                             if p.is_participating_today and not p.is_resting]
         
-        if len(candidates) >= 4:
-            # 同じ試合数の中からランダムに4人選択
-            return random.sample(candidates, 4)
-        else:
-            # 足りない分は次の試合数レベルから選択
-            selected = candidates.copy()
-            remaining_players = [p for p in available_players if p not in selected]
-            needed = 4 - len(selected)
-            
-            if len(remaining_players) >= needed:
-                selected.extend(remaining_players[:needed])
-            
-            return selected
+        # 生成で更新される状態を退避
+        saved_state = self.snapshot_state()
+        base_rng = self.rng
+        
+        candidates = {}
+        try:
+            for _ in range(attempts):
+                self.rng = random.Random(base_rng.random())
+                matches = self.generate_matches(num_matches, num_courts)
+                
+                if matches:
+                    # コート番号を除いた4人組とチーム分けが同じ案は同一とみなす
+                    signature = tuple(
+                        (frozenset((frozenset(m.team1_player_ids), frozenset(m.team2_player_ids))),
+                         m.match_index)
+                        for m in matches
+                    )
+                    if signature not in candidates:
+                        metrics = compute_schedule_metrics(matches, available_players, num_courts)
+                        candidates[signature] = (matches, metrics)
+                
+                # 状態を戻して次の試行へ
+                self.restore_state(saved_state)
+        finally:
+            self.rng = base_rng
+        
+        ranked = sorted(candidates.values(),
+                        key=lambda item: schedule_score(item[1], self.skill_matching_enabled))
+        return ranked[:k]
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """生成で更新される状態（試合数・待ち時間・ペア履歴）を退避"""
+        return {
+            "assigned_counts": dict(self.assigned_counts),
+            "pair_history": dict(self.pair_history),
+            "opponent_history": dict(self.opponent_history),
+            "last_match_index": dict(self.last_match_index),
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """snapshot_state で退避した状態に戻す"""
+        self.assigned_counts = dict(state["assigned_counts"])
+        self.pair_history = dict(state["pair_history"])
+        self.opponent_history = dict(state["opponent_history"])
+        self.last_match_index = dict(state["last_match_index"])
+
+    def _select_players_for_round(self, queue: FairPlayerQueue, player_map: Dict[str, Player],
+                                  num_groups: int) -> List[List[Player]]:
+        """1ラウンド分の4人組を選択（優先度キューから取り出す: 1人あたり O(log n)）"""
+        core_ids = queue.pop_many(num_groups * 4)
+        
+        if not self.skill_matching_enabled:
+            # 優先度順に4人ずつ
+            return [[player_map[pid] for pid in core_ids[i:i + 4]]
+                    for i in range(0, len(core_ids), 4)]
+        
+        # 境界と同じ優先度のプレイヤーは公平性の面で入れ替え可能なので候補に加える
+        boundary_key = queue.fairness_key(core_ids[-1])
+        extra_ids = []
+        while len(extra_ids) < len(core_ids):
+            next_id = queue.peek()
+            if next_id is None or queue.fairness_key(next_id) != boundary_key:
+                break
+            extra_ids.append(queue.pop())
+        
+        # 境界より優先度の高いプレイヤーは必ず出場させる
+        required_ids = {pid for pid in core_ids if queue.fairness_key(pid) < boundary_key}
+        candidates = [player_map[pid] for pid in core_ids + extra_ids]
+        groups = find_balanced_foursomes(candidates, num_groups, required_ids)
+        
+        # 選ばれなかった候補はそのままの優先度でキューに戻す
+        chosen_ids = {p.id for group in groups for p in group}
+        for pid in core_ids + extra_ids:
+            if pid not in chosen_ids:
+                queue.requeue(pid)
+        
+        return groups
+
+    def _keep_fixed_pairs_together(self, groups: List[List[Player]], queue: FairPlayerQueue,
+                                   player_map: Dict[str, Player],
+                                   constraints: CompiledConstraints) -> List[List[Player]]:
+        """固定ペアの2人が同じ4人組に入るようにメンバーを入れ替える
+
+        相手が別の4人組にいる場合は固定ペアでないメンバーと交換し、
+        相手が待機中の場合は固定ペアでないメンバーと入れ替えて出場させる。
+        """
+        groups = [list(group) for group in groups]
+        location = {p.id: k for k, group in enumerate(groups) for p in group}
+        
+        for k, group in enumerate(groups):
+            for player in list(group):
+                partner_id = constraints.fixed_partner_id(player.id)
+                if partner_id is None or location.get(partner_id) == k:
+                    continue
+                if partner_id not in location and partner_id not in queue:
+                    continue  # 相手が休憩中・不参加
+                
+                # 入れ替え可能なメンバー（固定ペアを持たない人）
+                free_members = [p for p in group
+                                if p.id != player.id and constraints.fixed_partner_id(p.id) is None]
+                if not free_members:
+                    continue
+                replaced = free_members[-1]
+                slot = group.index(replaced)
+                
+                if partner_id in location:
+                    other = groups[location[partner_id]]
+                    other_slot = [p.id for p in other].index(partner_id)
+                    other[other_slot] = replaced
+                    location[replaced.id] = location[partner_id]
+                else:
+                    queue.remove(partner_id)
+                    queue.requeue(replaced.id)
+                    location.pop(replaced.id, None)
+                
+                group[slot] = player_map[partner_id]
+                location[partner_id] = k
+        
+        return groups
+
+    def _reduce_rematches(self, groups: List[List[Player]], evaluator: BatchSplitEvaluator,
+                          round_number: int) -> List[List[Player]]:
+        """隣り合う4人組どうしを組み替えて、同じメンバーとの再戦を減らす
+
+        スキル順で隣接する2組（8人）の中だけで組み替えるため、スキルバランスは大きく崩れない。
+        ラウンドごとに組み合わせる相手をずらし、同じ4人組が固定化しないようにする。
+        """
+        groups = list(groups)
+        for k in range(round_number % 2, len(groups) - 1, 2):
+            groups[k], groups[k + 1] = evaluator.regroup_pair(groups[k], groups[k + 1])
+        return groups
 
     def _optimize_team_split(self, players: List[Player]) -> Tuple[List[Player], List[Player]]:
         """4人のプレイヤーを最適にチーム分割"""
@@ -118,6 +437,9 @@ class TournamentScheduler:
 
     def _evaluate_team_split(self, team1: List[Player], team2: List[Player]) -> float:
         """チーム分割の評価スコアを計算"""
+        if not self._split_allowed(team1, team2):
+            return INFEASIBLE_COST
+        
         if self.skill_matching_enabled:
             # スキルバランスを重視
             team1_skill = sum(p.skill_points for p in team1) / len(team1)
@@ -136,8 +458,25 @@ class TournamentScheduler:
             team2_pair = tuple(sorted([p.id for p in team2]))
             return self.pair_history.get(team1_pair, 0) + self.pair_history.get(team2_pair, 0)
 
-    def generate_fallback_matches(self, num_matches: int, num_courts: int) -> List[Match]:
-        """フォールバック用のランダム試合生成"""
+    def _split_allowed(self, team1: List[Player], team2: List[Player]) -> bool:
+        """チーム分割が組み合わせ条件を満たすか（ビット演算で O(1)）"""
+        compiled = self.compiled_constraints
+        if not compiled.is_active:
+            return True
+        indices = [compiled.index.get(p.id) for p in team1 + team2]
+        if None in indices:
+            return True
+        return compiled.split_allowed(*indices)
+
+    def generate_fallback_matches(self, num_matches: int, num_courts: int,
+                                  rng: Optional[random.Random] = None) -> List[Match]:
+        """フォールバック用のランダム試合生成
+
+        ラウンド（同時に進行する試合）ごとに重複なしで選ぶため、同じプレイヤーが
+        複数のコートに入ることはない。試合数の少ないプレイヤーから順に出場する。
+        """
+        rng = rng if rng is not None else self.rng
+        
         available_players = [p for p in self.players 
                            if p.is_participating_today and not p.is_resting]
         
@@ -145,25 +484,33 @@ class TournamentScheduler:
             return []
         
         matches = []
-        current_match_index = 1
+        current_match_index = max(self.last_match_index.values(), default=0) + 1
+        games = {p.id: self.assigned_counts.get(p.id, 0) for p in available_players}
         
-        for match_num in range(num_matches):
-            court_number = (match_num % num_courts) + 1
+        while len(matches) < num_matches:
+            num_groups = min(num_courts, num_matches - len(matches), len(available_players) // 4)
+            if num_groups <= 0:
+                break  # コートがない場合（コート数0）
             
-            # ランダムに4人選択
-            selected = random.sample(available_players, 4)
-            random.shuffle(selected)
+            # 試合数の少ない順（同数ならランダム）にラウンドの出場者を選び、並びをシャッフル
+            selected = heapq.nsmallest(num_groups * 4, available_players,
+                                       key=lambda p: (games[p.id], rng.random()))
+            rng.shuffle(selected)
             
-            team1_ids = [selected[0].id, selected[1].id]
-            team2_ids = [selected[2].id, selected[3].id]
-            
-            match = Match.create_new(
-                match_index=current_match_index,
-                court_number=court_number,
-                team1_player_ids=team1_ids,
-                team2_player_ids=team2_ids
-            )
-            matches.append(match)
-            current_match_index += 1
+            for court_index in range(num_groups):
+                group = selected[court_index * 4:court_index * 4 + 4]
+                team1_ids = [group[0].id, group[1].id]
+                team2_ids = [group[2].id, group[3].id]
+                
+                match = Match.create_new(
+                    match_index=current_match_index,
+                    court_number=court_index + 1,
+                    team1_player_ids=team1_ids,
+                    team2_player_ids=team2_ids
+                )
+                matches.append(match)
+                for player_id in team1_ids + team2_ids:
+                    games[player_id] += 1
+                current_match_index += 1
         
         return matches 
\ No newline at end of file
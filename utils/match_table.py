@@ -0,0 +1,57 @@
+import html
+from typing import List, Dict, Optional
+from models.match import Match
+
+def format_player_numbers(player_ids: List[str], player_number_map: Dict[str, Optional[int]]) -> str:
+    """プレイヤーIDのリストを「1番 & 2番」形式に変換（番号未設定は「未」）"""
+    numbers = []
+    for player_id in player_ids:
+        number = player_number_map.get(player_id)
+        numbers.append(f"{number}番" if number is not None else "未番")
+    return " & ".join(numbers)
+
+def build_match_table_html(matches: List[Match], player_number_map: Dict[str, Optional[int]],
+                           show_scores: bool = False) -> str:
+    """試合一覧を1つのHTMLテーブルとして組み立てる（大規模イベント向け）
+
+    試合ごとに要素やウィジェットを作らず、一覧全体を1回の st.markdown で描画できる。
+    """
+    header_cells = ["試合", "コート", "チーム1", "チーム2"]
+    if show_scores:
+        header_cells.insert(3, "スコア")
+    
+    rows = []
+    for match in matches:
+        cells = [
+            f"第{match.match_index}試合",
+            f"コート{match.court_number}",
+            format_player_numbers(match.team1_player_ids, player_number_map),
+            format_player_numbers(match.team2_player_ids, player_number_map),
+        ]
+        if show_scores:
+            cells.insert(3, f"{match.team1_score} - {match.team2_score}")
+        rows.append(cells)
+    
+    return build_table_html(header_cells, rows)
+
+def build_table_html(header_cells: List[str], rows: List[List[str]]) -> str:
+    """見出しと行（セルの文字列のリスト）から1つのHTMLテーブルを組み立てる（セルはエスケープする）"""
+    row_html = []
+    for i, cells in enumerate(rows):
+        bg_color = "#ffffff" if i % 2 == 0 else "#f8f9fa"
+        cell_html = "".join(
+            f'<td style="padding: 6px 8px; border-bottom: 1px solid #ddd;">{html.escape(cell)}</td>'
+            for cell in cells
+        )
+        row_html.append(f'<tr style="background-color: {bg_color};">{cell_html}</tr>')
+    
+    header_html = "".join(
+        f'<th style="padding: 8px; text-align: left; background-color: #f0f2f6;">{cell}</th>'
+        for cell in header_cells
+    )
+    return (
+        '<table style="width: 100%; border-collapse: collapse; border: 1px solid #ddd; font-size: 16px;">'
+        f'<thead><tr>{header_html}</tr></thead>'
+        f'<tbody>{"".join(row_html)}</tbody>'
+        '</table>'
+    )
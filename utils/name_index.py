@@ -0,0 +1,121 @@
+import heapq
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# 部分一致の索引に使う n-gram の最大長（これより長い検索語は n-gram の積集合で絞り込む）
+MAX_GRAM = 3
+
+def normalize_name(name: str) -> str:
+    """検索・重複判定用に名前を正規化
+
+    全角/半角の統一（NFKC）、大文字/小文字の統一、カタカナをひらがなに寄せ、空白を取り除く。
+    """
+    text = unicodedata.normalize("NFKC", name).casefold()
+    chars = []
+    for ch in text:
+        if ch.isspace():
+            continue
+        code = ord(ch)
+        if 0x30A1 <= code <= 0x30F6:  # カタカナ（ァ〜ヶ）→ ひらがな
+            ch = chr(code - 0x60)
+        chars.append(ch)
+    return "".join(chars)
+
+def _grams(text: str) -> Set[str]:
+    """長さ1〜MAX_GRAM の部分文字列"""
+    return {text[i:i + n] for n in range(1, MAX_GRAM + 1) for i in range(len(text) - n + 1)}
+
+class NameIndex:
+    """プレイヤー名の索引
+
+    正規化した名前の昇順リスト（前方一致を bisect で探す）と、長さ1〜3の n-gram → プレイヤーID の
+    転置索引（部分一致の候補を絞る）を持つ。追加・削除はそのプレイヤーの分だけを更新する。
+    """
+
+    def __init__(self, entries: Optional[Iterable[Tuple[str, str]]] = None):
+        # entries は (プレイヤーID, 名前)
+        self.names: Dict[str, str] = {}
+        self._normalized: Dict[str, str] = {}
+        self._by_normalized: Dict[str, Set[str]] = {}
+        self._sorted: List[Tuple[str, str]] = []
+        self._grams: Dict[str, Set[str]] = {}
+        for player_id, name in entries or []:
+            self.add(player_id, name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, player_id: str, name: str):
+        """プレイヤーを追加（登録済みなら名前を更新）"""
+        if player_id in self.names:
+            self.remove(player_id)
+        normalized = normalize_name(name)
+        self.names[player_id] = name
+        self._normalized[player_id] = normalized
+        self._by_normalized.setdefault(normalized, set()).add(player_id)
+        insort(self._sorted, (normalized, player_id))
+        for gram in _grams(normalized):
+            self._grams.setdefault(gram, set()).add(player_id)
+
+    def remove(self, player_id: str):
+        """プレイヤーを取り除く"""
+        if player_id not in self.names:
+            return
+        normalized = self._normalized.pop(player_id)
+        del self.names[player_id]
+        ids = self._by_normalized[normalized]
+        ids.discard(player_id)
+        if not ids:
+            del self._by_normalized[normalized]
+        del self._sorted[bisect_left(self._sorted, (normalized, player_id))]
+        for gram in _grams(normalized):
+            ids = self._grams[gram]
+            ids.discard(player_id)
+            if not ids:
+                del self._grams[gram]
+
+    def find_exact(self, name: str) -> Optional[str]:
+        """正規化した名前が一致するプレイヤーのIDを返す（重複判定用）"""
+        ids = self._by_normalized.get(normalize_name(name))
+        return min(ids) if ids else None
+
+    def _iter_prefix(self, prefix: str) -> Iterator[str]:
+        """正規化した名前が prefix で始まるプレイヤーのID（名前順）"""
+        for i in range(bisect_left(self._sorted, (prefix, "")), len(self._sorted)):
+            normalized, player_id = self._sorted[i]
+            if not normalized.startswith(prefix):
+                break
+            yield player_id
+
+    def search(self, query: str, limit: int = 5,
+               include: Optional[Callable[[str], bool]] = None) -> List[str]:
+        """名前に query を含むプレイヤーのIDを最大 limit 件返す（前方一致を優先し、それぞれ名前順）"""
+        normalized_query = normalize_name(query)
+        if not normalized_query or limit <= 0:
+            return []
+        
+        # 前方一致は名前順のリストから先頭の limit 件だけを取る
+        results = []
+        for player_id in self._iter_prefix(normalized_query):
+            if include is None or include(player_id):
+                results.append(player_id)
+                if len(results) == limit:
+                    return results
+        
+        # 残りは n-gram の索引から部分一致の候補を取る
+        if len(normalized_query) <= MAX_GRAM:
+            candidates = self._grams.get(normalized_query, set())
+        else:
+            # 検索語の3文字ずつの積集合で候補を絞り、最後に部分一致を確かめる
+            grams = [normalized_query[i:i + MAX_GRAM] for i in range(len(normalized_query) - MAX_GRAM + 1)]
+            sets = sorted((self._grams.get(gram, set()) for gram in grams), key=len)
+            candidates = set.intersection(*sets) if sets[0] else set()
+            candidates = {pid for pid in candidates if normalized_query in self._normalized[pid]}
+        
+        infix = (pid for pid in candidates
+                 if not self._normalized[pid].startswith(normalized_query)
+                 and (include is None or include(pid)))
+        return results + heapq.nsmallest(
+            limit - len(results), infix, key=lambda pid: (self._normalized[pid], pid)
+        )
@@ -0,0 +1,32 @@
+import math
+from typing import List, Sequence, TypeVar
+import streamlit as st
+from config.settings import LIST_PAGE_SIZE
+
+T = TypeVar("T")
+
+def page_slice(items: Sequence[T], page: int, page_size: int = LIST_PAGE_SIZE) -> List[T]:
+    """page 番目（0始まり）のページに入る要素を返す"""
+    start = page * page_size
+    return list(items[start:start + page_size])
+
+def paginate(items: Sequence[T], key: str, page_size: int = LIST_PAGE_SIZE) -> List[T]:
+    """一覧を page_size 件ずつに分け、選択中のページの要素だけを返す
+
+    1ページに収まる場合はページ選択を表示しない。選択中のページは st.session_state[key] に保持し、
+    件数が減って範囲外になった場合は先頭ページに戻す。
+    """
+    num_pages = max(1, math.ceil(len(items) / page_size))
+    if num_pages == 1:
+        return list(items)
+    
+    if st.session_state.get(key, 0) >= num_pages:
+        st.session_state[key] = 0
+    
+    page = st.selectbox(
+        "ページ",
+        options=list(range(num_pages)),
+        format_func=lambda p: f"{p * page_size + 1}〜{min((p + 1) * page_size, len(items))}件目（全{len(items)}件）",
+        key=key
+    )
+    return page_slice(items, page, page_size)
@@ -0,0 +1,93 @@
+import heapq
+import itertools
+import random
+from typing import Dict, List, Optional, Tuple
+
+class FairPlayerQueue:
+    """公平なプレイヤー選出のための優先度付きキュー
+
+    優先度は (試合数, 最終出場ラウンド, 最終出場試合番号) の小さい順。
+    最終出場ラウンドが古いほど連続で休んだラウンド数が多いため、
+    試合数が同じなら長く待っているプレイヤーが必ず先に選ばれる。
+    更新は遅延削除方式で、push/pop/update はいずれも O(log n)。
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self._rng = rng if rng is not None else random.Random()
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._state: Dict[str, Tuple[int, int, int]] = {}
+        self._counter = itertools.count()
+        self.current_round = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._entries
+
+    def push(self, player_id: str, matches_played: int,
+             last_round: int = -1, last_match_index: int = 0):
+        """プレイヤーを追加（既に存在する場合は優先度を更新）"""
+        if player_id in self._entries:
+            self.remove(player_id)
+        
+        self._state[player_id] = (matches_played, last_round, last_match_index)
+        # 同じ優先度の中ではランダムに選ばれるようにする
+        entry = [matches_played, last_round, last_match_index, self._rng.random(),
+                 next(self._counter), player_id]
+        self._entries[player_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, player_id: str):
+        """プレイヤーをキューから外す（休憩・離脱時）"""
+        entry = self._entries.pop(player_id, None)
+        if entry is not None:
+            entry[-1] = None  # 無効化（ヒープからは pop 時に捨てる）
+
+    def pop(self) -> Optional[str]:
+        """最も優先度の高いプレイヤーIDを取り出す"""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            player_id = entry[-1]
+            if player_id is not None:
+                del self._entries[player_id]
+                return player_id
+        return None
+
+    def peek(self) -> Optional[str]:
+        """最も優先度の高いプレイヤーIDを取り出さずに返す"""
+        while self._heap and self._heap[0][-1] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][-1] if self._heap else None
+
+    def pop_many(self, count: int) -> List[str]:
+        """優先度の高い順に count 人を取り出す（足りない場合は取り出さない）"""
+        if len(self) < count:
+            return []
+        return [self.pop() for _ in range(count)]
+
+    def record_played(self, player_ids: List[str], match_index: int):
+        """試合に出場したプレイヤーを、更新した優先度でキューに戻す"""
+        for player_id in player_ids:
+            matches_played, _, _ = self._state.get(player_id, (0, -1, 0))
+            self.push(player_id, matches_played + 1, self.current_round, match_index)
+
+    def requeue(self, player_id: str):
+        """取り出したプレイヤーを、優先度を変えずにキューへ戻す"""
+        matches_played, last_round, last_match_index = self._state.get(player_id, (0, -1, 0))
+        self.push(player_id, matches_played, last_round, last_match_index)
+
+    def fairness_key(self, player_id: str) -> Tuple[int, int]:
+        """公平性の判定に使うキー（試合数, 最終出場ラウンド）"""
+        matches_played, last_round, _ = self._state.get(player_id, (0, -1, 0))
+        return (matches_played, last_round)
+
+    def next_round(self):
+        """ラウンドを進める（出場しなかったプレイヤーの待ちラウンド数が1増える）"""
+        self.current_round += 1
+
+    def rounds_sat_out(self, player_id: str) -> int:
+        """直近で連続して休んでいるラウンド数"""
+        _, last_round, _ = self._state.get(player_id, (0, -1, 0))
+        return self.current_round - last_round - 1
@@ -0,0 +1,47 @@
+from itertools import chain
+from typing import Any, Dict, List
+import numpy as np
+import pandas as pd
+
+STATS_COLUMNS = ["player_id", "name", "matches", "wins", "win_rate",
+                 "points_scored", "points_conceded", "avg_scored", "avg_conceded"]
+
+def build_player_stats(matches_data: List[Dict[str, Any]], player_name_map: Dict[str, str]) -> pd.DataFrame:
+    """完了済みの試合からプレイヤーごとの成績表を作る（勝率の高い順、同じ場合は試合数の多い順）
+
+    「1試合×1プレイヤー = 1行」の縦長の表（プレイヤーは factorize した整数コード）を作り、
+    groupby でまとめて集計する。試合ごとのループは列の取り出しだけで、勝率は数値のまま持つ。
+    """
+    completed = [m for m in matches_data if m.get("is_completed")]
+    if not completed:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    
+    team1_ids = [m.get("team1_player_ids", []) for m in completed]
+    team2_ids = [m.get("team2_player_ids", []) for m in completed]
+    team1_score = np.array([m.get("team1_score", 0) for m in completed], dtype=np.int64)
+    team2_score = np.array([m.get("team2_score", 0) for m in completed], dtype=np.int64)
+    team1_size = np.fromiter(map(len, team1_ids), dtype=np.int64, count=len(completed))
+    team2_size = np.fromiter(map(len, team2_ids), dtype=np.int64, count=len(completed))
+    
+    # チーム1の全員 → チーム2の全員 の順に並べ、各行にそのチームの得点・失点を割り当てる
+    player_ids = np.array(list(chain(chain.from_iterable(team1_ids), chain.from_iterable(team2_ids))), dtype=object)
+    codes, unique_ids = pd.factorize(player_ids)
+    scored = np.concatenate([np.repeat(team1_score, team1_size), np.repeat(team2_score, team2_size)])
+    conceded = np.concatenate([np.repeat(team2_score, team1_size), np.repeat(team1_score, team2_size)])
+    long = pd.DataFrame({
+        "player": codes,
+        "matches": 1,
+        "wins": (scored > conceded).astype(np.int64),
+        "points_scored": scored,
+        "points_conceded": conceded,
+    })
+    
+    stats = long.groupby("player").sum()
+    stats["player_id"] = np.asarray(unique_ids)[stats.index.to_numpy()]
+    stats["win_rate"] = stats["wins"] / stats["matches"] * 100
+    stats["avg_scored"] = stats["points_scored"] / stats["matches"]
+    stats["avg_conceded"] = stats["points_conceded"] / stats["matches"]
+    stats["name"] = stats["player_id"].map(player_name_map).fillna("不明")
+    
+    stats = stats.sort_values(["win_rate", "matches"], ascending=False, kind="stable")
+    return stats[STATS_COLUMNS].reset_index(drop=True)
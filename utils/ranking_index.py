@@ -0,0 +1,94 @@
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from models.player import Player
+
+# 順位の基準 -> 並べ替えキー（小さいほど上位）
+RANKING_KEYS: Dict[Tuple[str, str], Callable[[Player], tuple]] = {
+    # 本日の参加者: セッションの勝率（同じ場合は試合数の多い順）・スキルポイント
+    ("today", "winrate"): lambda p: (-p.win_rate, -p.matches_played),
+    ("today", "skill"): lambda p: (-p.skill_points,),
+    # 全登録者: 通算の勝率・スキルポイント
+    ("all", "winrate"): lambda p: (-p.total_win_rate, -p.total_matches),
+    ("all", "skill"): lambda p: (-p.skill_points,),
+}
+
+class SortedRanking:
+    """1つの基準の順位表
+
+    (キー, プレイヤーID) の昇順リストを保持し、成績が変わったプレイヤーの要素だけを
+    bisect で取り除いて入れ直す。上位 k 件の取り出しと、あるプレイヤーの順位の問い合わせに
+    全員の並べ替えは要らない。
+    位置の探索は O(log n) だが、リストへの挿入・削除は後ろの要素をずらすため O(n)。
+    n は登録者数（数百人程度）なので、1回の更新は全員の並べ替え（O(n log n)）より十分軽い。
+    """
+
+    def __init__(self, key_func: Callable[[Player], tuple]):
+        self.key_func = key_func
+        self._keys: Dict[str, tuple] = {}
+        self._entries: List[Tuple[tuple, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def update(self, player: Player):
+        """プレイヤーを追加、または成績の変化を反映（探索 O(log n)、要素の移動 O(n)）"""
+        self.remove(player.id)
+        key = self.key_func(player)
+        self._keys[player.id] = key
+        insort(self._entries, (key, player.id))
+
+    def remove(self, player_id: str):
+        """プレイヤーを取り除く"""
+        key = self._keys.pop(player_id, None)
+        if key is not None:
+            del self._entries[bisect_left(self._entries, (key, player_id))]
+
+    def ids(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """順位順のプレイヤーID（start〜stop 番目）"""
+        return [player_id for _, player_id in self._entries[start:stop]]
+
+    def rank_of(self, player_id: str) -> Optional[int]:
+        """順位（1始まり。成績が同じプレイヤーは同じ順位）。未登録なら None"""
+        key = self._keys.get(player_id)
+        if key is None:
+            return None
+        return bisect_left(self._entries, (key,)) + 1
+
+class RankingIndex:
+    """本日の参加者（today）と全登録者（all）の順位表をまとめて保持"""
+
+    def __init__(self, players: Optional[Iterable[Player]] = None):
+        self.players: Dict[str, Player] = {}
+        self.rankings: Dict[Tuple[str, str], SortedRanking] = {
+            scope_kind: SortedRanking(key_func) for scope_kind, key_func in RANKING_KEYS.items()
+        }
+        for player in players or []:
+            self.update(player)
+
+    def update(self, player: Player):
+        """プレイヤーの成績・参加状態の変化を反映"""
+        self.players[player.id] = player
+        for (scope, _), ranking in self.rankings.items():
+            if scope == "all" or player.is_participating_today:
+                ranking.update(player)
+            else:
+                ranking.remove(player.id)
+
+    def remove(self, player_id: str):
+        """削除されたプレイヤーを取り除く"""
+        self.players.pop(player_id, None)
+        for ranking in self.rankings.values():
+            ranking.remove(player_id)
+
+    def count(self, kind: str, scope: str = "today") -> int:
+        """順位表の人数"""
+        return len(self.rankings[(scope, kind)])
+
+    def top(self, kind: str, scope: str = "today", start: int = 0,
+            stop: Optional[int] = None) -> List[Player]:
+        """順位順のプレイヤー（start〜stop 番目。stop を省略すると最後まで）"""
+        return [self.players[pid] for pid in self.rankings[(scope, kind)].ids(start, stop)]
+
+    def rank_of(self, player_id: str, kind: str, scope: str = "today") -> Optional[int]:
+        """プレイヤーの順位（順位表にいなければ None）"""
+        return self.rankings[(scope, kind)].rank_of(player_id)
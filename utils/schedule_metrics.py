@@ -0,0 +1,129 @@
+import numpy as np
+from typing import List, Dict, Optional
+from models.player import Player
+from models.match import Match
+
+# 組み合わせ案を比較する際の評価の重み（小さいほど良い）
+QUALITY_WEIGHTS = {
+    "games_spread": 5.0,              # 試合数の差 1試合あたり
+    "max_consecutive_sit_outs": 2.0,  # 最大連続休み 1ラウンドあたり
+    "partner_repeats": 1.0,           # 同じペアの重複 1回あたり
+    "opponent_repeats": 0.25,         # 同じ対戦相手の重複 1回あたり
+    "skill_gap_mean": 1.0,            # チーム間の平均スキル差（スキルマッチングON時のみ）
+}
+
+def gini_coefficient(values: np.ndarray) -> float:
+    """ジニ係数（0: 完全に均等, 1に近いほど偏り）"""
+    if len(values) == 0:
+        return 0.0
+    total = values.sum()
+    if total == 0:
+        return 0.0
+    sorted_values = np.sort(values)
+    n = len(sorted_values)
+    ranks = np.arange(1, n + 1)
+    return float((2 * (ranks * sorted_values).sum()) / (n * total) - (n + 1) / n)
+
+def assign_rounds(court_numbers: np.ndarray) -> np.ndarray:
+    """試合番号順のコート番号列からラウンド番号を割り当てる（コート番号が増えなくなったら次のラウンド）"""
+    if len(court_numbers) == 0:
+        return np.empty(0, dtype=int)
+    new_round = np.ones(len(court_numbers), dtype=int)
+    new_round[1:] = court_numbers[1:] <= court_numbers[:-1]
+    new_round[0] = 0
+    return np.cumsum(new_round)
+
+def _count_repeats(first: np.ndarray, second: np.ndarray, num_players: int) -> int:
+    """プレイヤー組（順不同）の重複回数（2回目以降の出現数）"""
+    if len(first) == 0:
+        return 0
+    codes = np.minimum(first, second) * num_players + np.maximum(first, second)
+    _, counts = np.unique(codes, return_counts=True)
+    return int((counts - 1).sum())
+
+def compute_metrics_from_indices(quads: np.ndarray, court_numbers: np.ndarray,
+                                 skills: np.ndarray, num_courts: Optional[int] = None) -> Dict[str, float]:
+    """試合を密なインデックスで表した配列から品質指標を計算
+
+    quads は (M, 4) の配列で、各行が [チーム1, チーム1, チーム2, チーム2] のプレイヤー番号。
+    court_numbers は試合番号順の (M,) 配列。すべて配列演算で計算するため探索ループ内でも使える。
+    """
+    num_players = len(skills)
+    num_matches = len(quads)
+    
+    games = np.bincount(quads.ravel(), minlength=num_players) if num_matches else np.zeros(num_players, dtype=int)
+    
+    # ペア（パートナー）と対戦相手の重複
+    partner_repeats = _count_repeats(
+        np.concatenate([quads[:, 0], quads[:, 2]]),
+        np.concatenate([quads[:, 1], quads[:, 3]]),
+        num_players
+    )
+    opponent_first = np.repeat(quads[:, :2], 2, axis=1).ravel()
+    opponent_second = np.tile(quads[:, 2:], (1, 2)).ravel()
+    opponent_repeats = _count_repeats(opponent_first, opponent_second, num_players)
+    
+    # チーム平均スキル差の分布
+    team_skills = skills[quads] if num_matches else np.zeros((0, 4))
+    skill_gaps = np.abs((team_skills[:, 0] + team_skills[:, 1]) - (team_skills[:, 2] + team_skills[:, 3])) / 2
+    
+    # ラウンドごとの出場状況から最大連続休みを計算
+    rounds = assign_rounds(court_numbers)
+    num_rounds = int(rounds.max()) + 1 if num_matches else 0
+    played = np.zeros((num_rounds, num_players), dtype=bool)
+    if num_matches:
+        played[np.repeat(rounds, 4), quads.ravel()] = True
+    streak = np.zeros(num_players, dtype=int)
+    max_streak = np.zeros(num_players, dtype=int)
+    for round_played in played:
+        streak = np.where(round_played, 0, streak + 1)
+        np.maximum(max_streak, streak, out=max_streak)
+    
+    courts = num_courts or (int(court_numbers.max()) if num_matches else 0)
+    court_slots = num_rounds * courts
+    
+    return {
+        "matches": num_matches,
+        "rounds": num_rounds,
+        "games_min": int(games.min()) if num_players else 0,
+        "games_max": int(games.max()) if num_players else 0,
+        "games_spread": int(games.max() - games.min()) if num_players else 0,
+        "games_gini": gini_coefficient(games.astype(float)),
+        "partner_repeats": partner_repeats,
+        "opponent_repeats": opponent_repeats,
+        "skill_gap_mean": float(skill_gaps.mean()) if num_matches else 0.0,
+        "skill_gap_median": float(np.median(skill_gaps)) if num_matches else 0.0,
+        "skill_gap_p90": float(np.percentile(skill_gaps, 90)) if num_matches else 0.0,
+        "skill_gap_max": float(skill_gaps.max()) if num_matches else 0.0,
+        "max_consecutive_sit_outs": int(max_streak.max()) if num_players else 0,
+        "court_utilization": num_matches / court_slots if court_slots else 0.0,
+    }
+
+def compute_schedule_metrics(matches: List[Match], players: List[Player],
+                             num_courts: Optional[int] = None) -> Dict[str, float]:
+    """試合リストとプレイヤーから組み合わせの品質指標を計算"""
+    index = {p.id: i for i, p in enumerate(players)}
+    skills = np.array([p.skill_points for p in players], dtype=float)
+    
+    # 対象プレイヤー以外を含む試合は除外
+    ordered_matches = sorted(
+        (m for m in matches
+         if all(pid in index for pid in m.team1_player_ids + m.team2_player_ids)),
+        key=lambda m: m.match_index
+    )
+    quads = np.array(
+        [[index[pid] for pid in m.team1_player_ids + m.team2_player_ids] for m in ordered_matches],
+        dtype=int
+    ).reshape(-1, 4)
+    court_numbers = np.array([m.court_number for m in ordered_matches], dtype=int)
+    
+    return compute_metrics_from_indices(quads, court_numbers, skills, num_courts)
+
+def schedule_score(metrics: Dict[str, float], skill_matching_enabled: bool = True) -> float:
+    """品質指標を1つの評価値にまとめる（小さいほど良い）"""
+    score = 0.0
+    for key, weight in QUALITY_WEIGHTS.items():
+        if key == "skill_gap_mean" and not skill_matching_enabled:
+            continue
+        score += metrics.get(key, 0.0) * weight
+    return score
@@ -0,0 +1,115 @@
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+from models.match import Match
+from utils.match_generator import TournamentScheduler
+from utils.schedule_metrics import compute_schedule_metrics, schedule_score
+from config.settings import DEFAULT_SCHEDULER_STRATEGY
+
+ScheduleResult = Tuple[List[Match], Dict[str, float]]
+
+class SchedulerStrategy(ABC):
+    """試合生成の戦略（共通インターフェース）
+
+    generate は time_budget_ms 以内にその時点で最良の組み合わせと品質指標を返す（anytime）。
+    予算が足りなくても最初の1案は必ず返すため、厳しい予算では最も速い生成に近づく。
+    スケジューラの状態は採用した案を生成した後の状態になる。
+    """
+    
+    name = ""
+    label = ""
+
+    @abstractmethod
+    def generate(self, scheduler: TournamentScheduler, num_matches: int, num_courts: int,
+                 time_budget_ms: Optional[float] = None) -> ScheduleResult:
+        """試合と品質指標を生成"""
+
+    @staticmethod
+    def evaluate(scheduler: TournamentScheduler, matches: List[Match], num_courts: int) -> Dict[str, float]:
+        """生成した試合の品質指標"""
+        available_players = [p for p in scheduler.players
+                             if p.is_participating_today and not p.is_resting]
+        return compute_schedule_metrics(matches, available_players, num_courts)
+
+class GreedyStrategy(SchedulerStrategy):
+    """優先度キューとスキルウィンドウによる1回の生成（最速）"""
+    
+    name = "greedy"
+    label = "標準（最速）"
+
+    def generate(self, scheduler: TournamentScheduler, num_matches: int, num_courts: int,
+                 time_budget_ms: Optional[float] = None) -> ScheduleResult:
+        matches = scheduler.generate_matches(num_matches, num_courts)
+        return matches, self.evaluate(scheduler, matches, num_courts)
+
+class MultiStartStrategy(SchedulerStrategy):
+    """乱数を変えて時間の許す限り生成を繰り返し、評価値の最も良い案を採用"""
+    
+    name = "multi_start"
+    label = "複数回試行（時間内で最良）"
+
+    def __init__(self, max_attempts: int = 32):
+        self.max_attempts = max_attempts
+
+    def generate(self, scheduler: TournamentScheduler, num_matches: int, num_courts: int,
+                 time_budget_ms: Optional[float] = None) -> ScheduleResult:
+        started = time.perf_counter()
+        initial_state = scheduler.snapshot_state()
+        base_rng = scheduler.rng
+        
+        best = None  # (評価値, 試合, 指標, 生成後の状態)
+        try:
+            for attempt in range(self.max_attempts):
+                attempt_started = time.perf_counter()
+                scheduler.restore_state(initial_state)
+                scheduler.rng = random.Random(base_rng.random())
+                matches = scheduler.generate_matches(num_matches, num_courts)
+                
+                if matches:
+                    metrics = self.evaluate(scheduler, matches, num_courts)
+                    score = schedule_score(metrics, scheduler.skill_matching_enabled)
+                    if best is None or score < best[0]:
+                        best = (score, matches, metrics, scheduler.snapshot_state())
+                
+                if not scheduler.RANDOMIZED:
+                    break  # 何度生成しても同じ結果になる形式
+                if time_budget_ms is not None:
+                    # 次の1回が予算内に収まりそうにない場合はここで打ち切る
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    attempt_ms = (time.perf_counter() - attempt_started) * 1000
+                    if elapsed_ms + attempt_ms > time_budget_ms:
+                        break
+        finally:
+            scheduler.rng = base_rng
+        
+        if best is None:
+            scheduler.restore_state(initial_state)
+            return [], self.evaluate(scheduler, [], num_courts)
+        scheduler.restore_state(best[3])
+        return best[1], best[2]
+
+class RandomStrategy(SchedulerStrategy):
+    """試合数だけをそろえたランダムな組み合わせ（フォールバック用）"""
+    
+    name = "random"
+    label = "ランダム"
+
+    def generate(self, scheduler: TournamentScheduler, num_matches: int, num_courts: int,
+                 time_budget_ms: Optional[float] = None) -> ScheduleResult:
+        matches = scheduler.generate_fallback_matches(num_matches, num_courts)
+        return matches, self.evaluate(scheduler, matches, num_courts)
+
+SCHEDULER_STRATEGIES: Dict[str, SchedulerStrategy] = {}
+
+def register_strategy(strategy: SchedulerStrategy) -> SchedulerStrategy:
+    """戦略を登録（設定画面・ベンチマークの選択肢になる）"""
+    SCHEDULER_STRATEGIES[strategy.name] = strategy
+    return strategy
+
+def get_strategy(name: Optional[str]) -> SchedulerStrategy:
+    """名前から戦略を取得（未登録の名前は設定の既定の戦略）"""
+    return SCHEDULER_STRATEGIES.get(name) or SCHEDULER_STRATEGIES[DEFAULT_SCHEDULER_STRATEGY]
+
+for _strategy in (GreedyStrategy(), MultiStartStrategy(), RandomStrategy()):
+    register_strategy(_strategy)
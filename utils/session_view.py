@@ -0,0 +1,70 @@
+from typing import List, Dict, Optional
+from models.player import Player
+from models.match import Match
+from models.constraints import SchedulingConstraints
+
+class SessionView:
+    """1回の描画で使う表示用データ
+
+    描画の最初に1回だけ作成し、各タブ・試合カードに渡す。プレイヤーの参照表や
+    進行中・完了済みの振り分けをここで済ませ、カードごとに読み込み・集計し直さないようにする。
+    """
+
+    def __init__(self, players: List[Player], matches: List[Match], league_enabled: bool = False,
+                 constraints_set: bool = False, king_of_court_saved: bool = False):
+        self.players = players
+        self.player_by_id: Dict[str, Player] = {p.id: p for p in players}
+        self.number_by_id: Dict[str, Optional[int]] = {p.id: p.player_number for p in players}
+        self.name_by_id: Dict[str, str] = {p.id: p.name for p in players}
+        self.participating_players = [p for p in players if p.is_participating_today]
+        self.active_players = [p for p in self.participating_players if not p.is_resting]
+        
+        self.matches = matches
+        self.incomplete_matches = [m for m in matches if not m.is_completed]
+        self.completed_matches = [m for m in matches if m.is_completed]
+        
+        # リーグモードの設定（データファイルに保存されている）
+        self.league_enabled = league_enabled
+        # 組み合わせ条件が1つでも設定されているか
+        self.constraints_set = constraints_set
+        # キング・オブ・ザ・コートの状態が保存されているか（他の形式で生成すると消す）
+        self.king_of_court_saved = king_of_court_saved
+
+    @property
+    def resting_count(self) -> int:
+        """休憩中の人数"""
+        return len(self.participating_players) - len(self.active_players)
+
+    @property
+    def numbers_assigned(self) -> bool:
+        """参加者に名前順の番号（1から連番）が振られているか"""
+        ordered = sorted(self.participating_players, key=lambda p: p.name)
+        return all(p.player_number == i for i, p in enumerate(ordered, 1))
+
+    def number_display(self, player_id: str) -> str:
+        """プレイヤー番号の表示（未設定は「未」）"""
+        number = self.number_by_id.get(player_id)
+        return str(number) if number is not None else "未"
+
+    @classmethod
+    def from_data(cls, data: dict) -> "SessionView":
+        """読み込み済みのデータから作成（読み込めないレコードは飛ばす）"""
+        players = []
+        for player_data in data.get("players", []):
+            try:
+                players.append(Player.from_dict(player_data))
+            except Exception as e:
+                print(f"プレイヤーデータの読み込みエラー: {e}")
+        matches = []
+        for match_data in data.get("matches", []):
+            try:
+                matches.append(Match.from_dict(match_data))
+            except Exception as e:
+                print(f"試合データの読み込みエラー: {e}")
+        league_enabled = bool(data.get("league", {}).get("enabled", False))
+        try:
+            constraints_set = not SchedulingConstraints.from_dict(data.get("constraints", {})).is_empty
+        except Exception as e:
+            print(f"組み合わせ条件の読み込みエラー: {e}")
+            constraints_set = False
+        return cls(players, matches, league_enabled, constraints_set, "king_of_court" in data)
@@ -0,0 +1,63 @@
+from typing import List, Optional, Set
+from models.player import Player
+
+def window_team_gap(window: List[Player]) -> float:
+    """スキル順に並んだ4人の、最良チーム分け（最強+最弱 vs 中間2人）でのチーム平均差"""
+    a, b, c, d = (p.skill_points for p in window)
+    return abs((a + d) - (b + c)) / 2
+
+def find_balanced_foursomes(players: List[Player], num_groups: int,
+                            required_ids: Optional[Set[str]] = None) -> List[List[Player]]:
+    """スキル順のスライディングウィンドウで、チーム平均差の小さい4人組を num_groups 個選ぶ
+
+    並べ替えに O(n log n)、探索は O(n)。候補が必要人数より多い場合は、
+    required_ids に含まれないプレイヤーを飛ばすことで隣のウィンドウの方が
+    バランスが良ければそちらを採用する。組み合わせの総当たりは行わない。
+    """
+    required_ids = required_ids or set()
+    
+    needed = num_groups * 4
+    if num_groups <= 0 or len(players) < needed:
+        return []
+    
+    sorted_players = sorted(players, key=lambda p: p.skill_points)
+    slack = len(sorted_players) - needed
+    
+    # 最後の必須プレイヤーの位置（これより手前で打ち切ると必須プレイヤーが漏れる）
+    last_required = max((idx for idx, p in enumerate(sorted_players) if p.id in required_ids),
+                        default=-1)
+    
+    groups: List[List[Player]] = []
+    i = 0
+    while len(groups) < num_groups:
+        window = sorted_players[i:i + 4]
+        remaining_slots = (num_groups - len(groups)) * 4
+        must_shift = last_required >= i + remaining_slots
+        
+        # 余裕があり先頭が必須でなければ、隣のウィンドウの方が良い場合（または必須の
+        # プレイヤーを取り込むために必要な場合）に1人飛ばす
+        if slack > 0 and window[0].id not in required_ids:
+            next_window = sorted_players[i + 1:i + 5]
+            if must_shift or window_team_gap(next_window) < window_team_gap(window):
+                slack -= 1
+                i += 1
+                continue
+        
+        if must_shift:
+            # 連続したウィンドウでは必須プレイヤーを全員入れられない
+            return _fill_required_first(sorted_players, num_groups, required_ids)
+        
+        groups.append(window)
+        i += 4
+    
+    return groups
+
+def _fill_required_first(sorted_players: List[Player], num_groups: int,
+                         required_ids: Set[str]) -> List[List[Player]]:
+    """必須プレイヤーを優先し、残り枠をスキル順に埋めて4人ずつに区切る"""
+    needed = num_groups * 4
+    required = [p for p in sorted_players if p.id in required_ids]
+    optional = [p for p in sorted_players if p.id not in required_ids]
+    chosen = sorted(required + optional[:max(0, needed - len(required))],
+                    key=lambda p: p.skill_points)[:needed]
+    return [chosen[i:i + 4] for i in range(0, needed, 4)]
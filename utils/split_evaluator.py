@@ -0,0 +1,159 @@
+import itertools
+import numpy as np
+from typing import List, Tuple, Dict, Optional
+from models.player import Player
+from models.constraints import SchedulingConstraints
+from utils.constraints import CompiledConstraints
+
+# 4人組内の位置によるチーム分割パターン（前半2人 vs 後半2人）
+#   パターンA: AB vs CD / パターンB: AC vs BD / パターンC: AD vs BC
+SPLIT_PATTERNS = np.array([
+    [0, 1, 2, 3],
+    [0, 2, 1, 3],
+    [0, 3, 1, 2],
+])
+
+# スキルマッチングON時のペア重複の重み（TournamentScheduler._evaluate_team_split と同じ）
+PAIR_REPEAT_WEIGHT = 0.1
+
+# 4人組を組み替える際の、過去に同じ試合で顔を合わせた回数1回あたりの重み（スキルポイント換算）
+REMATCH_WEIGHT = 1.0
+
+# 組み合わせ条件を満たさない分割に加えるコスト（どの実現可能な分割よりも大きい値）
+INFEASIBLE_COST = 1e6
+
+# 8人を4人組2つに分ける35通り（先頭のプレイヤーを含む組を前半とする）
+EIGHT_PLAYER_PARTITIONS = np.array([
+    [[0] + list(first), [i for i in range(1, 8) if i not in first]]
+    for first in itertools.combinations(range(1, 8), 3)
+])
+
+class BatchSplitEvaluator:
+    """多数の4人組候補のチーム分割をまとめて評価する
+
+    プレイヤーを密なインデックスに割り当て、スキルベクトルとペア履歴行列を
+    NumPy 配列で保持する。(N, 4) のインデックス配列を受け取り、N 候補すべての
+    最良分割と評価スコアを一度の配列演算で返す。
+    """
+
+    def __init__(self, players: List[Player], pair_history: Dict[Tuple[str, str], int],
+                 skill_matching_enabled: bool = True,
+                 opponent_history: Optional[Dict[Tuple[str, str], int]] = None,
+                 constraints: Optional[SchedulingConstraints] = None):
+        self.skill_matching_enabled = skill_matching_enabled
+        self.players = list(players)
+        self.player_ids = [p.id for p in players]
+        self.index = {player_id: i for i, player_id in enumerate(self.player_ids)}
+        self.skills = np.array([p.skill_points for p in players], dtype=float)
+        
+        # ペア履歴行列（対称）
+        n = len(players)
+        self.partner_matrix = np.zeros((n, n), dtype=float)
+        for (id_a, id_b), count in pair_history.items():
+            a = self.index.get(id_a)
+            b = self.index.get(id_b)
+            if a is not None and b is not None:
+                self.partner_matrix[a, b] += count
+                self.partner_matrix[b, a] += count
+        
+        # 同じ試合で顔を合わせた回数（パートナー + 対戦相手）
+        self.meet_matrix = self.partner_matrix.copy()
+        for (id_a, id_b), count in (opponent_history or {}).items():
+            a = self.index.get(id_a)
+            b = self.index.get(id_b)
+            if a is not None and b is not None:
+                self.meet_matrix[a, b] += count
+                self.meet_matrix[b, a] += count
+        
+        # 組み合わせ条件（ペア禁止行列と固定ペアの相手）
+        self.constraints = CompiledConstraints(constraints, self.players)
+        self.forbidden_matrix = self.constraints.forbidden_matrix()
+        self.fixed_partners = self.constraints.partner_array()
+
+    def record_match(self, team1_ids: List[str], team2_ids: List[str]):
+        """生成済みの試合を履歴行列に加える（同じ生成内でのペア・対戦の重複を避ける）"""
+        team1 = [self.index[pid] for pid in team1_ids if pid in self.index]
+        team2 = [self.index[pid] for pid in team2_ids if pid in self.index]
+        for team in (team1, team2):
+            if len(team) == 2:
+                self.partner_matrix[team[0], team[1]] += 1
+                self.partner_matrix[team[1], team[0]] += 1
+        members = team1 + team2
+        for a, b in itertools.combinations(members, 2):
+            self.meet_matrix[a, b] += 1
+            self.meet_matrix[b, a] += 1
+
+    def indices_for(self, groups: List[List[Player]]) -> np.ndarray:
+        """4人組のリストを (N, 4) のインデックス配列に変換"""
+        if not groups:
+            return np.empty((0, 4), dtype=int)
+        return np.array([[self.index[p.id] for p in group] for group in groups], dtype=int)
+
+    def pattern_costs(self, quads: np.ndarray) -> np.ndarray:
+        """(N, 4) の候補について、3パターンすべての評価スコア (N, 3) を計算"""
+        ordered = quads[:, SPLIT_PATTERNS]  # (N, 3, 4)
+        
+        partner_counts = (self.partner_matrix[ordered[..., 0], ordered[..., 1]] +
+                          self.partner_matrix[ordered[..., 2], ordered[..., 3]])
+        
+        if not self.skill_matching_enabled:
+            # ペア重複回避を重視
+            costs = partner_counts
+        else:
+            # スキルバランスを主、ペア重複を副とする
+            skills = self.skills[ordered]
+            skill_diff = np.abs((skills[..., 0] + skills[..., 1]) - (skills[..., 2] + skills[..., 3])) / 2
+            costs = skill_diff + partner_counts * PAIR_REPEAT_WEIGHT
+        
+        if self.constraints.is_active:
+            costs = costs + self.infeasible_patterns(quads, ordered) * INFEASIBLE_COST
+        return costs
+
+    def infeasible_patterns(self, quads: np.ndarray, ordered: np.ndarray) -> np.ndarray:
+        """組み合わせ条件を満たさない分割パターン (N, 3) を判定"""
+        forbidden = (self.forbidden_matrix[ordered[..., 0], ordered[..., 1]] |
+                     self.forbidden_matrix[ordered[..., 2], ordered[..., 3]])
+        
+        # 固定ペアの相手が同じ4人組にいるのに、チームメイトになっていない
+        partners = self.fixed_partners[ordered]  # (N, 3, 4)
+        teammates = ordered[..., [1, 0, 3, 2]]
+        in_quad = (partners[..., None] == quads[:, None, None, :]).any(axis=-1)
+        split_pair = (in_quad & (partners != teammates)).any(axis=-1)
+        return forbidden | split_pair
+
+    def evaluate(self, quads: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """N 候補それぞれの最良パターン番号 (N,) と評価スコア (N,) を返す"""
+        if len(quads) == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=float)
+        
+        costs = self.pattern_costs(quads)
+        best_patterns = np.argmin(costs, axis=1)
+        best_costs = costs[np.arange(len(quads)), best_patterns]
+        return best_patterns, best_costs
+
+    def grouping_costs(self, quads: np.ndarray) -> np.ndarray:
+        """4人組の組み方の評価（最良分割のスコア + 過去に顔を合わせた回数のペナルティ）"""
+        _, best_costs = self.evaluate(quads)
+        pairs = quads[:, [[0, 1], [0, 2], [0, 3], [1, 2], [1, 3], [2, 3]]]  # (N, 6, 2)
+        meets = self.meet_matrix[pairs[..., 0], pairs[..., 1]].sum(axis=1)
+        return best_costs + meets * REMATCH_WEIGHT
+
+    def regroup_pair(self, first: List[Player], second: List[Player]) -> Tuple[List[Player], List[Player]]:
+        """2つの4人組（8人）を、35通りの分け方の中で最も評価の良い組み方に組み替える"""
+        block = self.indices_for([first + second])[0]
+        candidates = block[EIGHT_PLAYER_PARTITIONS]  # (35, 2, 4)
+        costs = self.grouping_costs(candidates.reshape(-1, 4)).reshape(-1, 2).sum(axis=1)
+        if self.constraints.is_active:
+            # 固定ペアの2人が別々の4人組に分かれる組み方は選ばない
+            partners = self.fixed_partners[candidates[:, 0]]  # (35, 4)
+            separated = (partners[:, :, None] == candidates[:, 1, None, :]).any(axis=(1, 2))
+            costs = costs + separated * INFEASIBLE_COST
+        best = candidates[int(np.argmin(costs))]
+        return ([self.players[i] for i in best[0]], [self.players[i] for i in best[1]])
+
+    def split_ids(self, quad: np.ndarray, pattern: int) -> Tuple[List[str], List[str]]:
+        """1候補と分割パターンから、チーム1・チーム2のプレイヤーIDを返す"""
+        ordered = quad[SPLIT_PATTERNS[pattern]]
+        team1_ids = [self.player_ids[i] for i in ordered[:2]]
+        team2_ids = [self.player_ids[i] for i in ordered[2:]]
+        return team1_ids, team2_ids
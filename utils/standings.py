@@ -0,0 +1,57 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Iterable, Tuple
+
+class StandingsIndex:
+    """個人ポイントの順位表
+
+    (−ポイント, プレイヤーID) の昇順リストを保持し、結果が入るたびに
+    該当プレイヤーの要素だけを bisect で取り除いて入れ直す。全員の並べ替えや
+    全試合の再集計をせずに、常に順位順の並びを取り出せる。
+    """
+
+    def __init__(self, entries: Optional[Iterable[Tuple[str, float]]] = None):
+        # entries は順位順（ポイントの高い順）で渡す
+        self.points: Dict[str, float] = {}
+        self._keys: List[Tuple[float, str]] = []
+        for player_id, points in entries or []:
+            self.points[player_id] = points
+            self._keys.append((-points, player_id))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, player_id: str, delta: float):
+        """プレイヤーのポイントを加算（未登録なら0点から）: O(log n) の探索"""
+        old = self.points.get(player_id)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, player_id))]
+        new = (old or 0) + delta
+        self.points[player_id] = new
+        insort(self._keys, (-new, player_id))
+
+    def add_match(self, match, sign: int = 1):
+        """試合結果の個人ポイント（自チームの得点）を加算（sign=-1 で取り消し）"""
+        for player_id in match.team1_player_ids:
+            self.add(player_id, sign * match.team1_score)
+        for player_id in match.team2_player_ids:
+            self.add(player_id, sign * match.team2_score)
+
+    def ranked_ids(self) -> List[str]:
+        """順位順のプレイヤーID"""
+        return [player_id for _, player_id in self._keys]
+
+    def rank_of(self, player_id: str) -> Optional[int]:
+        """順位（1始まり）。未登録の場合は None"""
+        points = self.points.get(player_id)
+        if points is None:
+            return None
+        return bisect_left(self._keys, (-points, "")) + 1
+
+    def to_dict(self) -> dict:
+        """辞書形式に変換（順位順の [プレイヤーID, ポイント] のリスト）"""
+        return {"entries": [[player_id, -neg_points] for neg_points, player_id in self._keys]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StandingsIndex":
+        """辞書から作成（保存済みの並び順をそのまま使う）"""
+        return cls((player_id, points) for player_id, points in data.get("entries", []))
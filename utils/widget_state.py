@@ -0,0 +1,22 @@
+import streamlit as st
+from typing import Any
+
+# ウィジェットに渡すキーの接頭辞（値そのものは接頭辞なしのキーに保持する）
+WIDGET_KEY_PREFIX = "_widget_"
+
+def persistent_key(key: str, default: Any) -> str:
+    """描画されない間も値を保つウィジェット用のキーを返す
+
+    Streamlit は描画されなかったウィジェットの状態を破棄するため（遅延描画のタブを切り替えた場合など）、
+    値はウィジェットと結び付かない st.session_state[key] に保持し、描画のたびにウィジェットへ戻す。
+    ウィジェットには返したキーと on_change=store_widget_value, args=(key,) を渡す。
+    """
+    if key not in st.session_state:
+        st.session_state[key] = default
+    widget_key = WIDGET_KEY_PREFIX + key
+    st.session_state[widget_key] = st.session_state[key]
+    return widget_key
+
+def store_widget_value(key: str):
+    """ウィジェットで変更された値を st.session_state[key] に保存（on_change から呼ぶ）"""
+    st.session_state[key] = st.session_state[WIDGET_KEY_PREFIX + key]